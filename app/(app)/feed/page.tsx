@@ -1,6 +1,6 @@
 import { redirect } from "next/navigation";
 import { getSession } from "@/lib/auth";
-import { getUserById, getBillsByCategory, getBillSummary, assembleLink } from "@/lib/supabase";
+import { getUserById, getBillsByCategory, getBillSummary, assembleLink, getUserFeedRecommendations } from "@/lib/supabase";
 import FeedClient from "./FeedClient";
 import { Bill, BillSummary } from "@/types";
 import { config } from "dotenv";
@@ -18,7 +18,11 @@ export default async function FeedPage() {
     redirect("/login");
   }
 
-  const preferredCategories = user.topics || [];
+  const topics = user.topics || [];
+  // Nightly precomputed recommendations (python/src/user_feeds.py) lead the feed when present
+  const recommendedBills = await getUserFeedRecommendations(user.id);
+  const recommendedTitle = "Recommended for You";
+  const preferredCategories = recommendedBills.length > 0 ? [recommendedTitle, ...topics] : topics;
   const allCategoriesList = [
     "Healthcare",
     "Environmentalism",
@@ -48,7 +52,10 @@ export default async function FeedPage() {
   }
   // Fetch bills for preferred categories
   const billsByCategoryPreferred = new Map<string, Bill[]>();
-  for (const category of preferredCategories) {
+  if (recommendedBills.length > 0) {
+    billsByCategoryPreferred.set(recommendedTitle, recommendedBills);
+  }
+  for (const category of topics) {
     const bills = await getBillsByCategory(category);
     billsByCategoryPreferred.set(category, bills);
   }
@@ -6,6 +6,10 @@ import fs from "fs";
 
 const execAsync = promisify(exec);
 
+// Metadata filter parameters forwarded to the Python search (category may repeat)
+const LIST_FILTER_PARAMS: Record<string, string> = { category: "categories", origin: "origin", status: "status" };
+const DATE_FILTER_PARAMS = ["date_from", "date_to"];
+
 export async function GET(request: Request) {
   try {
     const { searchParams } = new URL(request.url);
@@ -18,6 +22,47 @@ export async function GET(request: Request) {
       );
     }
 
+    const serverParams = new URLSearchParams({ q: query });
+    const filters: Record<string, string | string[]> = {};
+    for (const [param, key] of Object.entries(LIST_FILTER_PARAMS)) {
+      const values = searchParams.getAll(param).filter((value) => value.trim() !== "");
+      if (values.length > 0) {
+        filters[key] = values;
+        values.forEach((value) => serverParams.append(param, value));
+      }
+    }
+    for (const param of DATE_FILTER_PARAMS) {
+      const value = searchParams.get(param);
+      if (value && value.trim() !== "") {
+        filters[param] = value;
+        serverParams.append(param, value);
+      }
+    }
+
+    // Prefer the long-lived search server (python src/search_api.py --serve),
+    // which keeps the embedding model and Milvus collection warm between queries
+    const searchServerUrl =
+      process.env.SEARCH_SERVER_URL ||
+      `http://${process.env.SEARCH_SERVER_HOST || "127.0.0.1"}:${process.env.SEARCH_SERVER_PORT || "8765"}`;
+    try {
+      const serverResponse = await fetch(
+        `${searchServerUrl}/search?${serverParams}`,
+        { cache: "no-store", signal: AbortSignal.timeout(30000) }
+      );
+      if (serverResponse.ok) {
+        const results = await serverResponse.json();
+        return NextResponse.json({ results });
+      }
+      if (serverResponse.status === 400) {
+        // Invalid filters would fail the CLI search the same way
+        const { error } = await serverResponse.json();
+        return NextResponse.json({ error }, { status: 400 });
+      }
+      console.log(`Search server returned ${serverResponse.status}, falling back to CLI`);
+    } catch {
+      console.log("Search server not available, falling back to CLI");
+    }
+
     // Path to the Python script
     const pythonScriptPath = path.join(
       process.cwd(),
@@ -67,13 +112,17 @@ export async function GET(request: Request) {
     
     // Escape the query for shell execution
     const escapedQuery = query.replace(/"/g, '\\"').replace(/\$/g, "\\$");
+    // Filters go as one JSON argument inside double quotes
+    const filtersArg = Object.keys(filters).length > 0
+      ? ` --filters "${JSON.stringify(filters).replace(/[\\"$`]/g, "\\$&")}"`
+      : "";
     
     try {
-      console.log(`Executing: ${pythonPath} "${pythonScriptPath}" "${escapedQuery}"`);
+      console.log(`Executing: ${pythonPath} "${pythonScriptPath}"${filtersArg} -- "${escapedQuery}"`);
       console.log(`Working directory: ${pythonSrcDir}`);
       
       const { stdout, stderr } = await execAsync(
-        `"${pythonPath}" "${pythonScriptPath}" "${escapedQuery}"`,
+        `"${pythonPath}" "${pythonScriptPath}"${filtersArg} -- "${escapedQuery}"`,
         {
           cwd: pythonSrcDir,
           env: {
@@ -54,6 +54,24 @@ CREATE TABLE IF NOT EXISTS saved_bills (
   UNIQUE(user_id, bill_id)
 );
 
+-- Precomputed "more like this" neighbours (python/src/similar_bills.py)
+CREATE TABLE IF NOT EXISTS bill_neighbors (
+  bill_id TEXT PRIMARY KEY REFERENCES bills(id) ON DELETE CASCADE,
+  neighbor_ids TEXT[] NOT NULL,
+  scores REAL[] NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Materialized feed recommendations, rebuilt nightly (python/src/user_feeds.py)
+CREATE TABLE IF NOT EXISTS user_feed_recommendations (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  rank INTEGER NOT NULL,
+  bill_id TEXT NOT NULL REFERENCES bills(id) ON DELETE CASCADE,
+  score REAL NOT NULL,
+  generated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (user_id, rank)
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_bills_date ON bills(date DESC);
 CREATE INDEX IF NOT EXISTS idx_bills_status ON bills(status);
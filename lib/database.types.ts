@@ -36,6 +36,11 @@ export interface Database {
         Insert: unknown;
         Update: unknown;
       };
+      user_feed_recommendations: {
+        Row: unknown;
+        Insert: unknown;
+        Update: unknown;
+      };
     };
   };
 }
@@ -269,6 +269,35 @@ export async function getBillsByCategory(category: string, count: number = 15):
   return (data || []) as Bill[];
 }
 
+// Row of user_feed_recommendations with its bill joined in
+type FeedRecommendationRow = {
+  rank: number;
+  bills: Bill | null;
+};
+
+// Precomputed feed recommendations (python/src/user_feeds.py), best first
+export async function getUserFeedRecommendations(userId: string, count: number = 15): Promise<Bill[]> {
+  if (!supabase) {
+    return [];
+  }
+
+  // One read on the (user_id, rank) primary key, with the bills joined in
+  const { data, error } = await supabase
+    .from("user_feed_recommendations")
+    .select("rank, bills (*)")
+    .eq("user_id", userId)
+    .order("rank", { ascending: true })
+    .limit(count);
+
+  if (error) {
+    console.error("Error fetching feed recommendations:", error);
+    return [];
+  }
+  return ((data || []) as unknown as FeedRecommendationRow[])
+    .map((item) => item.bills)
+    .filter((bill): bill is Bill => bill !== null);
+}
+
 //Inserts the bill as endorse by the user, if they are opposing it it will change to endorsing
 export async function userEndorseBill(userId: string, billId: string): Promise<void> {
   if (!supabase) {
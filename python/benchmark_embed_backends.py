@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Parity and speed check of the embedding inference backends against fp32 PyTorch.
+
+Embeds a sample of bill texts with the fp32 model and with each backend (EMBED_BACKEND
+choices), then reports per-text cosine agreement with the fp32 embeddings, top-k neighbour
+overlap within the sample, encode throughput and model size. Use it to pick EMBED_BACKEND
+and EMBED_THREADS.
+"""
+
+import io
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables
+python_dir = Path(__file__).parent
+env_path = python_dir / ".env"
+load_dotenv(dotenv_path=env_path)
+load_dotenv()
+
+sys.path.insert(0, str(python_dir / "src"))
+import numpy as np
+from vectors import (
+    EMBED_BACKENDS,
+    EMBED_ONNX_DIR,
+    EMBED_THREADS,
+    ONNX_OPTIMIZED_FILE,
+    get_embedding_text,
+    get_mock_bills,
+    load_embedding_model,
+)
+
+
+def get_sample_texts(samples: int):
+    """Embedding texts of up to samples bills from the database (mock bills if none)"""
+    from db import get_bills_from_database
+
+    bills = get_bills_from_database(limit=samples, columns="id, title, summary_key, bill_text")
+    if not bills:
+        print("  [WARNING] No bills in the database, using mock bills")
+        bills = get_mock_bills()
+    return [get_embedding_text(bill) for bill in bills]
+
+
+def model_size_mb(model, backend: str) -> float:
+    """Serialized weight size: the ONNX file, or the PyTorch state dict (packed int8 weights included)"""
+    if backend == "onnx":
+        return (Path(EMBED_ONNX_DIR) / ONNX_OPTIMIZED_FILE).stat().st_size / 1e6
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1e6
+
+
+def encode(model, texts, batch_size: int):
+    """Normalized embeddings and the encode time in seconds (after one warm-up batch)"""
+    model.encode(texts[:batch_size], batch_size=batch_size, show_progress_bar=False)
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=False, normalize_embeddings=True)
+    return np.asarray(embeddings, dtype=np.float32), time.perf_counter() - start
+
+
+def neighbor_overlap(reference: np.ndarray, embeddings: np.ndarray, k: int) -> float:
+    """Mean fraction of each text's top-k neighbours (within the sample) shared with fp32"""
+    k = min(k, len(reference) - 1)
+    if k <= 0:
+        return 1.0
+
+    def top_k(matrix):
+        scores = matrix @ matrix.T
+        np.fill_diagonal(scores, -np.inf)
+        return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+    return float(np.mean([
+        len(set(ref_row) & set(row)) / k for ref_row, row in zip(top_k(reference), top_k(embeddings))
+    ]))
+
+
+def main():
+    """Main parity check function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare embedding backends with fp32 PyTorch")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=[backend for backend in EMBED_BACKENDS if backend != "torch"],
+        default=[backend for backend in EMBED_BACKENDS if backend != "torch"],
+        help="Backends to compare with fp32 torch (default: all)",
+    )
+    parser.add_argument("--samples", type=int, default=256, help="Number of bill texts to embed (default: 256)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per encode batch (default: 32)")
+    parser.add_argument("--threads", type=int, default=EMBED_THREADS, help="CPU threads for inference (default: EMBED_THREADS)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per text for the overlap check (default: 10)")
+
+    args = parser.parse_args()
+
+    print("Fetching sample texts...")
+    texts = get_sample_texts(args.samples)
+    print(f"  {len(texts)} texts")
+    print()
+
+    print("Embedding with fp32 torch...")
+    reference_model = load_embedding_model("torch", args.threads)
+    reference, reference_seconds = encode(reference_model, texts, args.batch_size)
+    results = [{
+        "backend": "torch",
+        "texts_per_s": len(texts) / reference_seconds,
+        "speedup": 1.0,
+        "size_mb": model_size_mb(reference_model, "torch"),
+        "mean_cos": 1.0,
+        "min_cos": 1.0,
+        "overlap": 1.0,
+    }]
+    del reference_model
+
+    for backend in args.backends:
+        print(f"Embedding with {backend}...")
+        try:
+            model = load_embedding_model(backend, args.threads)
+            embeddings, seconds = encode(model, texts, args.batch_size)
+        except Exception as e:
+            print(f"  [ERROR] {backend} failed: {e}")
+            continue
+        cosines = (reference * embeddings).sum(axis=1)
+        results.append({
+            "backend": backend,
+            "texts_per_s": len(texts) / seconds,
+            "speedup": reference_seconds / seconds,
+            "size_mb": model_size_mb(model, backend),
+            "mean_cos": float(cosines.mean()),
+            "min_cos": float(cosines.min()),
+            "overlap": neighbor_overlap(reference, embeddings, args.k),
+        })
+        del model
+
+    print()
+    print(f"{'backend':<11} {'texts/s':>8} {'speedup':>8} {'size MB':>8} {'mean cos':>9} {'min cos':>8} {'top-' + str(args.k) + ' overlap':>14}")
+    for result in results:
+        print(
+            f"{result['backend']:<11} {result['texts_per_s']:>8.1f} {result['speedup']:>7.2f}x {result['size_mb']:>8.1f} "
+            f"{result['mean_cos']:>9.4f} {result['min_cos']:>8.4f} {result['overlap']:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark Milvus ANN index profiles on the stored bill embeddings.
+
+Copies every stored vector into a temporary collection per profile, builds the index,
+and reports recall@k against brute-force ground truth, p50/p99 search latency, index
+build time and estimated index memory. Use it to pick MILVUS_INDEX_PROFILE.
+
+Queries are sampled from the stored vectors; each query's own vector is excluded from
+both the ground truth and the ANN results.
+"""
+
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables
+python_dir = Path(__file__).parent
+env_path = python_dir / ".env"
+load_dotenv(dotenv_path=env_path)
+load_dotenv()
+
+sys.path.insert(0, str(python_dir / "src"))
+import numpy as np
+from vectors import (
+    INDEX_PROFILES,
+    MILVUS_COLLECTION_NAME,
+    MILVUS_HNSW_M,
+    MILVUS_PQ_M,
+    NORMALIZED_METRICS,
+    build_index_params,
+    build_search_params,
+    fetch_all_embeddings,
+    get_index_settings,
+    get_milvus_collection,
+)
+
+
+def estimate_index_bytes(index_profile: str, num_rows: int, dim: int) -> int:
+    """Rough in-memory index size (vectors + graph/codes), ignoring IDs and overhead"""
+    if index_profile == "IVF_SQ8":
+        return num_rows * dim
+    if index_profile == "IVF_PQ":
+        return num_rows * MILVUS_PQ_M
+    if index_profile == "HNSW":
+        return num_rows * (dim * 4 + MILVUS_HNSW_M * 2 * 4)
+    return num_rows * dim * 4
+
+
+def brute_force_neighbors(embeddings: np.ndarray, query_rows: np.ndarray, metric_type: str, k: int) -> np.ndarray:
+    """Exact top-k neighbour rows for each query row (excluding the query itself)"""
+    if metric_type == "COSINE":
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    queries = embeddings[query_rows]
+    if metric_type in NORMALIZED_METRICS:
+        scores = queries @ embeddings.T
+    else:
+        # Negative squared L2 distance, so larger is better for every metric
+        scores = -(
+            (queries ** 2).sum(axis=1, keepdims=True)
+            - 2 * queries @ embeddings.T
+            + (embeddings ** 2).sum(axis=1)
+        )
+    scores[np.arange(len(query_rows)), query_rows] = -np.inf
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return top
+
+
+def create_bench_collection(name: str, bill_ids, embeddings: np.ndarray, chunk_size: int = 1000):
+    """Create a bill_id + embedding collection and copy the vectors into it"""
+    from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, utility
+
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+    schema = CollectionSchema(
+        fields=[
+            FieldSchema(name="bill_id", dtype=DataType.VARCHAR, is_primary=True, max_length=100),
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=embeddings.shape[1]),
+        ],
+        description="Temporary index benchmark collection",
+    )
+    collection = Collection(name=name, schema=schema)
+    for start in range(0, len(bill_ids), chunk_size):
+        collection.insert([
+            bill_ids[start:start + chunk_size],
+            embeddings[start:start + chunk_size].tolist(),
+        ])
+    collection.flush()
+    return collection
+
+
+def benchmark_profile(index_profile, bill_ids, embeddings, metric_type, query_rows, ground_truth, k, keep=False):
+    """Build one index profile on a copy of the vectors and measure recall and latency"""
+    from pymilvus import utility
+
+    name = f"{MILVUS_COLLECTION_NAME}_bench_{index_profile.lower()}"
+    collection = create_bench_collection(name, bill_ids, embeddings)
+    try:
+        index_params = build_index_params(index_profile, metric_type, len(bill_ids))
+        build_start = time.perf_counter()
+        collection.create_index(field_name="embedding", index_params=index_params)
+        utility.wait_for_index_building_complete(name)
+        collection.load()
+        build_seconds = time.perf_counter() - build_start
+
+        search_params = build_search_params(index_profile, index_params["params"], metric_type, k + 1)
+        id_to_row = {bill_id: row for row, bill_id in enumerate(bill_ids)}
+        latencies = []
+        hits_found = 0
+        for query_row, truth in zip(query_rows, ground_truth):
+            start = time.perf_counter()
+            results = collection.search(
+                data=[embeddings[query_row].tolist()],
+                anns_field="embedding",
+                param=search_params,
+                limit=k + 1,
+                output_fields=["bill_id"],
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            found = [id_to_row[hit.entity.get("bill_id")] for hit in results[0]]
+            found = [row for row in found if row != query_row][:k]
+            hits_found += len(set(found) & set(truth.tolist()))
+
+        return {
+            "profile": index_profile,
+            "params": index_params["params"],
+            "search": search_params["params"],
+            "recall": hits_found / (len(query_rows) * k),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "build_s": build_seconds,
+            "memory_mb": estimate_index_bytes(index_profile, len(bill_ids), embeddings.shape[1]) / 1e6,
+        }
+    finally:
+        if not keep:
+            utility.drop_collection(name)
+
+
+def main():
+    """Main benchmark function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark Milvus index profiles on stored bill embeddings")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=INDEX_PROFILES,
+        default=list(INDEX_PROFILES),
+        help="Index profiles to benchmark (default: all)",
+    )
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query for recall@k (default: 10)")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries (default: 200)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for query sampling (default: 0)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary benchmark collections")
+
+    args = parser.parse_args()
+
+    print("Loading stored embeddings...")
+    collection = get_milvus_collection()
+    if collection is None:
+        print("Milvus collection not available")
+        sys.exit(1)
+    _, metric_type, _ = get_index_settings(collection)
+    bill_ids, embeddings = fetch_all_embeddings(collection)
+    if len(bill_ids) <= args.k:
+        print(f"Need more than {args.k} stored vectors to benchmark, found {len(bill_ids)}")
+        sys.exit(1)
+    print(f"  {len(bill_ids)} vectors, dim {embeddings.shape[1]}, metric {metric_type}")
+
+    rng = np.random.default_rng(args.seed)
+    query_rows = rng.choice(len(bill_ids), size=min(args.queries, len(bill_ids)), replace=False)
+    print(f"Computing brute-force ground truth for {len(query_rows)} queries...")
+    ground_truth = brute_force_neighbors(embeddings, query_rows, metric_type, args.k)
+    print()
+
+    results = []
+    for index_profile in args.profiles:
+        print(f"Benchmarking {index_profile}...")
+        try:
+            results.append(benchmark_profile(
+                index_profile, bill_ids, embeddings, metric_type, query_rows, ground_truth, args.k, args.keep
+            ))
+        except Exception as e:
+            print(f"  [ERROR] {index_profile} failed: {e}")
+
+    print()
+    print(f"{'profile':<10} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p99 ms':>8} {'build s':>8} {'mem MB':>8}  params / search")
+    for result in results:
+        print(
+            f"{result['profile']:<10} {result['recall']:>10.4f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{result['build_s']:>8.1f} {result['memory_mb']:>8.1f}  {result['params']} / {result['search']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
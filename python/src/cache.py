@@ -0,0 +1,195 @@
+"""
+In-process caches used by the search and classification paths:
+- LRUCache: bounded, thread-safe LRU mapping with optional TTL and hit/miss counters
+- EmbeddingCache: query embeddings keyed by (normalized query, model name), with an
+  optional SQLite file so popular queries survive process restarts
+- LabelScoreCache: raw per-(bill, text hash, label) classifier scores in a SQLite file,
+  so changing the labels or the threshold does not rerun the model for known pairs
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so trivially different queries share cache entries"""
+    return " ".join(query.split()).casefold()
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with optional time-to-live and hit/miss counters"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (marking it recently used), or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (self.ttl_seconds is not None and entry[0] < time.monotonic()):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+class EmbeddingCache:
+    """
+    Query embedding cache: an in-memory LRU in front of an optional SQLite file.
+
+    Embeddings are stored as float32 blobs keyed by (model name, normalized query).
+    """
+
+    def __init__(self, max_size: int = 1024, path: Optional[str] = None):
+        self.memory = LRUCache(max_size)
+        self.disk_hits = 0
+        self._db = None
+        self._db_lock = threading.Lock()
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                    "model TEXT NOT NULL, query TEXT NOT NULL, embedding BLOB NOT NULL, "
+                    "PRIMARY KEY (model, query))"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"  [WARNING] Could not open query embedding cache at {path}: {e}")
+                self._db = None
+
+    def get(self, query: str, model_name: str) -> Optional[List[float]]:
+        """Return the cached embedding for a query, checking memory first, then disk"""
+        key = (model_name, normalize_query(query))
+        embedding = self.memory.get(key)
+        if embedding is not None or self._db is None:
+            return embedding
+
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT embedding FROM query_embeddings WHERE model = ? AND query = ?", key
+            ).fetchone()
+        if row is None:
+            return None
+        embedding = np.frombuffer(row[0], dtype=np.float32).tolist()
+        self.disk_hits += 1
+        self.memory.set(key, embedding)
+        return embedding
+
+    def set(self, query: str, model_name: str, embedding: List[float]):
+        key = (model_name, normalize_query(query))
+        self.memory.set(key, embedding)
+        if self._db is None:
+            return
+        blob = np.asarray(embedding, dtype=np.float32).tobytes()
+        with self._db_lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (model, query, embedding) VALUES (?, ?, ?)",
+                    (*key, blob),
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"  [WARNING] Could not persist query embedding: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["persistent"] = self._db is not None
+        return stats
+
+
+class LabelScoreCache:
+    """
+    Raw classifier scores keyed by (bill_id, text_hash, label) in a SQLite file.
+
+    text_hash identifies the classified text and everything else that affects a score
+    (model, hypothesis template, chunking); a changed bill gets a new hash and misses.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Worker processes share the file, so wait for each other's write locks
+        self._db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS label_scores ("
+            "bill_id TEXT NOT NULL, text_hash TEXT NOT NULL, label TEXT NOT NULL, score REAL NOT NULL, "
+            "PRIMARY KEY (bill_id, text_hash, label))"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def get_scores(self, keys: List[Tuple[str, str]], chunk_size: int = 400) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """Cached {label: score} of each (bill_id, text_hash) key (keys without scores are omitted)"""
+        scores: Dict[Tuple[str, str], Dict[str, float]] = {}
+        bill_ids = sorted({bill_id for bill_id, _ in keys})
+        wanted = set(keys)
+        with self._lock:
+            for chunk_start in range(0, len(bill_ids), chunk_size):
+                chunk = bill_ids[chunk_start:chunk_start + chunk_size]
+                rows = self._db.execute(
+                    f"SELECT bill_id, text_hash, label, score FROM label_scores "
+                    f"WHERE bill_id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for bill_id, text_hash, label, score in rows:
+                    if (bill_id, text_hash) in wanted:
+                        scores.setdefault((bill_id, text_hash), {})[label] = score
+        return scores
+
+    def set_scores(self, rows: List[Tuple[str, str, str, float]]):
+        """Store (bill_id, text_hash, label, score) rows"""
+        if not rows:
+            return
+        with self._lock:
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO label_scores (bill_id, text_hash, label, score) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"  [WARNING] Could not persist label scores: {e}")
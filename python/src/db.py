@@ -0,0 +1,212 @@
+"""
+Shared data access for the Python scripts:
+- A single lazily created Supabase client, reused so every request goes over the
+  same keep-alive HTTP session instead of a new client (and TLS handshake) per call
+- An optional direct PostgreSQL connection pool (psycopg_pool) from DATABASE_URL
+  for bulk reads and writes
+"""
+
+import os
+import threading
+from pathlib import Path
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional
+
+# Load environment variables
+# Look for .env file in the python directory (parent of src)
+python_dir = Path(__file__).parent.parent
+env_path = python_dir / ".env"
+load_dotenv(dotenv_path=env_path)
+# Also try loading from current directory (for backwards compatibility)
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "4"))
+
+# Check if required env vars are set
+if not SUPABASE_URL or SUPABASE_URL == "replace_me":
+    print("!!SUPABASE_URL not configured. Using mock mode.!!")
+    SUPABASE_URL = None
+
+if not SUPABASE_SERVICE_ROLE_KEY or SUPABASE_SERVICE_ROLE_KEY == "replace_me":
+    print("!!SUPABASE_SERVICE_ROLE_KEY not configured. Using mock mode.!!")
+    SUPABASE_SERVICE_ROLE_KEY = None
+
+# .env.example ships a placeholder connection string
+if not DATABASE_URL or "user:pass@host" in DATABASE_URL:
+    DATABASE_URL = None
+
+# Shared clients (lazy loading)
+_supabase_client = None
+_pg_pool = None
+_pg_pool_unavailable = False
+_client_lock = threading.Lock()
+
+
+def get_supabase_client():
+    """
+    Get the shared Supabase client, creating it on first use.
+
+    Returns:
+        Supabase client, or None if Supabase is not configured
+    """
+    global _supabase_client
+    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+        return None
+    if _supabase_client is None:
+        with _client_lock:
+            if _supabase_client is None:
+                from supabase import create_client
+                _supabase_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return _supabase_client
+
+
+def get_pg_pool():
+    """
+    Get the shared PostgreSQL connection pool for DATABASE_URL, creating it on first use.
+
+    Returns:
+        psycopg_pool.ConnectionPool, or None if DATABASE_URL is not set or psycopg_pool
+        is not installed (callers should fall back to the Supabase client)
+    """
+    global _pg_pool, _pg_pool_unavailable
+    if not DATABASE_URL or _pg_pool_unavailable:
+        return None
+    if _pg_pool is None:
+        with _client_lock:
+            if _pg_pool is None and not _pg_pool_unavailable:
+                try:
+                    from psycopg_pool import ConnectionPool
+                    _pg_pool = ConnectionPool(
+                        DATABASE_URL,
+                        min_size=DB_POOL_MIN_SIZE,
+                        max_size=DB_POOL_MAX_SIZE,
+                        open=True,
+                    )
+                except ImportError:
+                    print("  [INFO] psycopg_pool not installed, using Supabase client for database access")
+                    _pg_pool_unavailable = True
+                except Exception as e:
+                    print(f"  [WARNING] Could not open PostgreSQL pool, using Supabase client: {e}")
+                    _pg_pool_unavailable = True
+    return _pg_pool
+
+
+def get_bills_from_database(limit: Optional[int] = None, offset: int = 0, columns: str = "*") -> List[Dict[str, Any]]:
+    """Fetch bills from the database"""
+    supabase = get_supabase_client()
+    if supabase is None:
+        print("  [MOCK] Would fetch bills from database")
+        return []
+
+    try:
+        query = supabase.table("bills").select(columns).order("id")
+
+        if limit:
+            query = query.limit(limit)
+        if offset:
+            query = query.offset(offset)
+
+        result = query.execute()
+        return result.data if result.data else []
+    except Exception as e:
+        print(f"  [ERROR] Failed to fetch bills: {e}")
+        return []
+
+
+def fetch_all_bills(columns: str = "*", offset: int = 0, page_size: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Fetch all bills, starting at offset.
+
+    Uses one query over the PostgreSQL pool when DATABASE_URL is configured,
+    otherwise pages through the Supabase REST API.
+    """
+    pool = get_pg_pool()
+    if pool is not None:
+        try:
+            from psycopg import sql
+            from psycopg.rows import dict_row
+
+            if columns.strip() == "*":
+                select_list = sql.SQL("*")
+            else:
+                select_list = sql.SQL(", ").join(
+                    sql.Identifier(column.strip()) for column in columns.split(",")
+                )
+            query = sql.SQL("SELECT {} FROM bills ORDER BY id OFFSET %s").format(select_list)
+            with pool.connection() as conn:
+                with conn.cursor(row_factory=dict_row) as cur:
+                    cur.execute(query, (offset,))
+                    bills = cur.fetchall()
+            print(f"  Fetched {len(bills)} bills over PostgreSQL")
+            return bills
+        except Exception as e:
+            print(f"  [WARNING] PostgreSQL bill fetch failed, falling back to Supabase: {e}")
+
+    all_bills = []
+    current_offset = offset
+    while True:
+        bills = get_bills_from_database(limit=page_size, offset=current_offset, columns=columns)
+        if not bills:
+            break
+        all_bills.extend(bills)
+        print(f"  Fetched {len(bills)} bills (total: {len(all_bills)})...")
+
+        # If we got fewer than page_size, we've reached the end
+        if len(bills) < page_size:
+            break
+        current_offset += page_size
+    return all_bills
+
+
+def fetch_all_rows(table: str, columns: str, order_by: str = "id", page_size: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Fetch every row of a table (e.g. users, saved_bills).
+
+    Uses one query over the PostgreSQL pool when DATABASE_URL is configured,
+    otherwise pages through the Supabase REST API.
+    """
+    pool = get_pg_pool()
+    if pool is not None:
+        try:
+            from psycopg import sql
+            from psycopg.rows import dict_row
+
+            query = sql.SQL("SELECT {} FROM {} ORDER BY {}").format(
+                sql.SQL(", ").join(sql.Identifier(column.strip()) for column in columns.split(",")),
+                sql.Identifier(table),
+                sql.Identifier(order_by),
+            )
+            with pool.connection() as conn:
+                with conn.cursor(row_factory=dict_row) as cur:
+                    cur.execute(query)
+                    rows = cur.fetchall()
+            print(f"  Fetched {len(rows)} {table} rows over PostgreSQL")
+            return rows
+        except Exception as e:
+            print(f"  [WARNING] PostgreSQL {table} fetch failed, falling back to Supabase: {e}")
+
+    supabase = get_supabase_client()
+    if supabase is None:
+        print(f"  [MOCK] Would fetch {table} from database")
+        return []
+
+    all_rows = []
+    while True:
+        try:
+            result = (
+                supabase.table(table).select(columns).order(order_by)
+                .range(len(all_rows), len(all_rows) + page_size - 1).execute()
+            )
+        except Exception as e:
+            print(f"  [ERROR] Failed to fetch {table}: {e}")
+            break
+        rows = result.data or []
+        all_rows.extend(rows)
+        if len(rows) < page_size:
+            break
+    print(f"  Fetched {len(all_rows)} {table} rows")
+    return all_rows
@@ -0,0 +1,209 @@
+"""
+Embedding-similarity category classifier, a fast alternative to the bart-large-mnli engine:
+- Each of CANDIDATE_LABELS gets a centroid: the embedding of a short label prompt, or the mean
+  stored embedding of exemplar bills already labelled with it
+- The whole corpus is scored in one matrix multiply of the stored bill embeddings (see
+  vectors.py) against the centroids, so no bill text is re-encoded
+- Scores go through the same softmax and threshold_std rule as the BART engine
+  (recommend_categories.select_categories)
+- An agreement report compares the result with the categories the BART engine stored
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from recommend_categories import CANDIDATE_LABELS, select_categories
+
+# Prompt embedded for each label ("{}" is replaced by the label)
+EMBEDDING_LABEL_TEMPLATE = os.getenv("EMBEDDING_LABEL_TEMPLATE", "This bill is about {}.")
+# Labels with fewer exemplar bills than this keep their prompt centroid
+EMBEDDING_EXEMPLAR_MIN_BILLS = int(os.getenv("EMBEDDING_EXEMPLAR_MIN_BILLS", "5"))
+
+
+def load_bill_embeddings(store=None) -> Tuple[List[str], np.ndarray]:
+    """Stored bill embeddings as (bill_ids, normalized float32 matrix)"""
+    from vector_store import get_vector_store, normalize_matrix
+
+    store = store or get_vector_store()
+    bill_ids, matrix = store.fetch_all()
+    return bill_ids, normalize_matrix(np.asarray(matrix, dtype=np.float32))
+
+
+def get_label_centroids(
+    labels: List[str] = CANDIDATE_LABELS,
+    bill_ids: Optional[List[str]] = None,
+    matrix: Optional[np.ndarray] = None,
+    exemplars: Optional[Dict[str, List[str]]] = None,
+) -> np.ndarray:
+    """
+    One normalized centroid per label, in labels order.
+
+    Args:
+        labels: Category labels
+        bill_ids / matrix: Stored bill embeddings (needed for exemplar centroids)
+        exemplars: Optional bill_id -> categories of labelled bills; a label with at least
+            EMBEDDING_EXEMPLAR_MIN_BILLS exemplars uses their mean embedding
+
+    Returns:
+        Array of shape (len(labels), embedding dim)
+    """
+    from vectors import generate_embeddings
+    from vector_store import normalize_matrix
+
+    prompts = [EMBEDDING_LABEL_TEMPLATE.format(label) for label in labels]
+    centroids = np.asarray(generate_embeddings(prompts, normalize=True), dtype=np.float32)
+    if len(centroids) != len(labels):
+        raise RuntimeError("Failed to embed the category label prompts")
+
+    if exemplars and bill_ids is not None and matrix is not None:
+        rows = {bill_id: row for row, bill_id in enumerate(bill_ids)}
+        for i, label in enumerate(labels):
+            members = [rows[bill_id] for bill_id, categories in exemplars.items() if label in (categories or []) and bill_id in rows]
+            if len(members) >= EMBEDDING_EXEMPLAR_MIN_BILLS:
+                centroids[i] = matrix[members].mean(axis=0)
+            else:
+                print(f"  [INFO] {len(members)} exemplar bills for '{label}', using its label prompt")
+    return normalize_matrix(centroids)
+
+
+def classify_embeddings(
+    bill_ids: List[str],
+    matrix: np.ndarray,
+    centroids: np.ndarray,
+    labels: List[str] = CANDIDATE_LABELS,
+    threshold_std: float = 0.8,
+) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Classify stored bill embeddings against label centroids in one matrix multiply.
+
+    Returns:
+        bill_id -> list of (label, score) tuples, thresholded like classify_bill_text
+    """
+    scores = matrix @ centroids.T
+    return {
+        bill_id: select_categories(labels, row_scores.tolist(), threshold_std)
+        for bill_id, row_scores in zip(bill_ids, scores)
+    }
+
+
+def classify_all_by_embedding(
+    threshold_std: float = 0.8,
+    exemplars: Optional[Dict[str, List[str]]] = None,
+    store=None,
+) -> Dict[str, List[Tuple[str, float]]]:
+    """Classify every bill in the vector store (see classify_embeddings)"""
+    bill_ids, matrix = load_bill_embeddings(store)
+    if not bill_ids:
+        print("  No stored embeddings found, run vectors.py first")
+        return {}
+    centroids = get_label_centroids(CANDIDATE_LABELS, bill_ids, matrix, exemplars)
+    return classify_embeddings(bill_ids, matrix, centroids, CANDIDATE_LABELS, threshold_std)
+
+
+def agreement_report(
+    predicted: Dict[str, List[str]],
+    reference: Dict[str, List[str]],
+    labels: List[str] = CANDIDATE_LABELS,
+) -> Dict[str, Any]:
+    """
+    Compare predicted categories with reference (BART) categories over the bills both cover.
+
+    Returns:
+        Dict with bills, exact_match, mean_jaccard, top1_agreement and per_label
+        {label: {"precision", "recall", "f1", "support"}} (the reference is ground truth)
+    """
+    bill_ids = [bill_id for bill_id in predicted if reference.get(bill_id)]
+    counts = {label: {"tp": 0, "fp": 0, "fn": 0} for label in labels}
+    exact = 0
+    jaccard = 0.0
+    top1 = 0
+    for bill_id in bill_ids:
+        pred, ref = set(predicted[bill_id]), set(reference[bill_id])
+        exact += pred == ref
+        jaccard += len(pred & ref) / len(pred | ref)
+        top1 += bool(predicted[bill_id]) and predicted[bill_id][0] in ref
+        for label in labels:
+            if label in pred and label in ref:
+                counts[label]["tp"] += 1
+            elif label in pred:
+                counts[label]["fp"] += 1
+            elif label in ref:
+                counts[label]["fn"] += 1
+
+    per_label = {}
+    for label, c in counts.items():
+        precision = c["tp"] / (c["tp"] + c["fp"]) if c["tp"] + c["fp"] else 0.0
+        recall = c["tp"] / (c["tp"] + c["fn"]) if c["tp"] + c["fn"] else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_label[label] = {"precision": precision, "recall": recall, "f1": f1, "support": c["tp"] + c["fn"]}
+
+    n = max(len(bill_ids), 1)
+    return {
+        "bills": len(bill_ids),
+        "exact_match": exact / n,
+        "mean_jaccard": jaccard / n,
+        "top1_agreement": top1 / n,
+        "per_label": per_label,
+    }
+
+
+def print_agreement_report(report: Dict[str, Any]):
+    """Print an agreement_report result as a table"""
+    print(f"Agreement with BART categories over {report['bills']} bills:")
+    print(f"  Exact match:    {report['exact_match'] * 100:.1f}%")
+    print(f"  Mean Jaccard:   {report['mean_jaccard']:.3f}")
+    print(f"  Top-1 in BART:  {report['top1_agreement'] * 100:.1f}%")
+    print()
+    print(f"  {'Label':<24} {'Precision':>9} {'Recall':>7} {'F1':>6} {'Support':>8}")
+    for label, values in report["per_label"].items():
+        print(
+            f"  {label:<24} {values['precision']:>9.3f} {values['recall']:>7.3f} "
+            f"{values['f1']:>6.3f} {values['support']:>8}"
+        )
+    print()
+
+
+def run_agreement_report(threshold_std: float = 0.8, use_exemplars: bool = False, bart_sample: int = 0):
+    """
+    Classify every stored bill with the embedding engine and compare with the stored
+    (BART) categories, with timings; bart_sample > 0 also times BART on that many bills.
+    """
+    from db import fetch_all_bills
+
+    print("Fetching stored categories...")
+    bills = fetch_all_bills(columns="id, title, summary_key, categories")
+    reference = {bill["id"]: bill.get("categories") or [] for bill in bills}
+    print(f"  {sum(1 for categories in reference.values() if categories)} of {len(bills)} bills have categories")
+    if use_exemplars:
+        print("  [WARNING] Exemplar centroids are built from the same BART labels, so agreement is optimistic")
+
+    start_time = time.perf_counter()
+    results = classify_all_by_embedding(threshold_std, reference if use_exemplars else None)
+    elapsed = time.perf_counter() - start_time
+    if not results:
+        return
+    print(f"Embedding engine: {len(results)} bills in {elapsed:.2f}s ({len(results) / max(elapsed, 1e-9):.0f} bills/sec)")
+    print()
+    print_agreement_report(agreement_report(
+        {bill_id: [label for label, _ in result] for bill_id, result in results.items()}, reference
+    ))
+
+    if bart_sample > 0:
+        from recommend_categories import classify_bill_texts, get_bill_texts, get_classification_text
+
+        sample = [bill for bill in bills if bill["id"] in results][:bart_sample]
+        texts = get_bill_texts([bill["id"] for bill in sample])
+        sample = [{**bill, "bill_text": texts[bill["id"]]} if bill["id"] in texts else bill for bill in sample]
+        print(f"Timing BART on {len(sample)} bills...")
+        start_time = time.perf_counter()
+        classify_bill_texts([get_classification_text(bill, fetch_text=False) for bill in sample], threshold_std)
+        bart_elapsed = time.perf_counter() - start_time
+        print(f"BART engine: {len(sample)} bills in {bart_elapsed:.2f}s ({len(sample) / max(bart_elapsed, 1e-9):.2f} bills/sec)")
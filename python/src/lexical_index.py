@@ -0,0 +1,253 @@
+"""
+Compact BM25 inverted index over bill title, sponsors, summary and bill_text:
+- Built during ingestion (or with `python src/lexical_index.py --build`) and saved as one
+  .npz file: the vocabulary plus CSR postings (term -> doc rows and term frequencies)
+- Searched in-process with NumPy, so keyword queries need no transformer pass
+- Exact bill ID queries ("H.R. 1234", "s567-118") are answered from the bill ID list directly
+"""
+
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from vectors import MILVUS_COLLECTION_NAME, python_dir, bump_collection_version
+
+LEXICAL_INDEX_PATH = os.getenv(
+    "LEXICAL_INDEX_PATH",
+    str(python_dir / ".cache" / f"{MILVUS_COLLECTION_NAME}.lexical.npz"),
+)
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Dotted abbreviations ("H.R.", "U.S.C.") become one token ("hr", "usc")
+ABBREVIATION_PATTERN = re.compile(r"\b(?:[a-z]\.){2,}")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with"
+    .split()
+)
+# Canonical bill IDs: chamber/type prefix, number, optional congress ("hr1234", "sjres5-118")
+BILL_ID_PATTERN = re.compile(r"^(hr|s|hres|sres|hjres|sjres|hconres|sconres)(\d+)(?:-(\d+))?$")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word/number tokens with dotted abbreviations collapsed and stopwords removed"""
+    text = ABBREVIATION_PATTERN.sub(lambda match: match.group(0).replace(".", ""), text.lower())
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def canonical_bill_id(text: str) -> str:
+    """Lowercase bill ID with dots and whitespace removed ("H.R. 1234" -> "hr1234")"""
+    return re.sub(r"[.\s]", "", text.lower())
+
+
+def get_lexical_text(bill: Dict[str, Any], summary_text: Optional[str] = None) -> str:
+    """Text indexed for a bill: title, sponsors, summary and full bill text"""
+    sponsors = " ".join(bill.get("sponsors") or [])
+    return " ".join(part for part in (bill.get("title"), sponsors, summary_text, bill.get("bill_text")) if part)
+
+
+class LexicalIndex:
+    """A loaded BM25 index (see build_lexical_index for the file layout)"""
+
+    def __init__(self, path: str = LEXICAL_INDEX_PATH):
+        with np.load(path) as data:
+            self.bill_ids: List[str] = data["bill_ids"].tolist()
+            terms = data["terms"].tolist()
+            self.indptr = data["indptr"]
+            self.doc_rows = data["doc_rows"]
+            self.term_freqs = data["term_freqs"].astype(np.float32)
+            doc_lengths = data["doc_lengths"].astype(np.float32)
+            self.signature = str(data["signature"])
+        self.path = path
+        self.vocabulary = {term: term_id for term_id, term in enumerate(terms)}
+
+        num_docs = len(self.bill_ids)
+        doc_freqs = np.diff(self.indptr).astype(np.float32)
+        self.idf = np.log(1 + (num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        avg_length = float(doc_lengths.mean()) if num_docs else 1.0
+        self.length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / max(avg_length, 1.0))
+
+        # Canonical ID (without congress) -> [(congress, bill_id)], newest congress first
+        self.ids_by_number: Dict[str, List[Tuple[int, str]]] = {}
+        for bill_id in self.bill_ids:
+            match = BILL_ID_PATTERN.match(canonical_bill_id(bill_id))
+            if match:
+                key = match.group(1) + match.group(2)
+                self.ids_by_number.setdefault(key, []).append((int(match.group(3) or 0), bill_id))
+        for entries in self.ids_by_number.values():
+            entries.sort(reverse=True)
+
+    def lookup_bill_id(self, query: str) -> Optional[List[str]]:
+        """
+        Bill IDs matching a query that is itself a bill ID.
+
+        Returns:
+            Matching bill IDs (newest congress first; possibly empty), or None if the query
+            does not look like a bill ID
+        """
+        match = BILL_ID_PATTERN.match(canonical_bill_id(query))
+        if not match:
+            return None
+        entries = self.ids_by_number.get(match.group(1) + match.group(2), [])
+        if match.group(3):
+            entries = [entry for entry in entries if entry[0] == int(match.group(3))]
+        return [bill_id for _, bill_id in entries]
+
+    def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """BM25 top-k for a query; each result has bill_id and score (best first)"""
+        term_ids = sorted({self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary})
+        if not term_ids or top_k <= 0:
+            return []
+
+        scores = np.zeros(len(self.bill_ids), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            rows = self.doc_rows[start:end]
+            freqs = self.term_freqs[start:end]
+            scores[rows] += self.idf[term_id] * freqs * (BM25_K1 + 1) / (freqs + self.length_norm[rows])
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [{"bill_id": self.bill_ids[row], "score": float(scores[row])} for row in candidates]
+
+
+def build_lexical_index(texts: Dict[str, str], path: str = LEXICAL_INDEX_PATH) -> bool:
+    """
+    Build the BM25 index for bill_id -> text and save it to path.
+
+    The file holds bill_ids, terms, CSR postings (indptr, doc_rows, term_freqs), doc_lengths
+    and a signature of the indexed texts; an index with the same signature is left untouched.
+
+    Returns:
+        True if the index was (re)written
+    """
+    bill_ids = sorted(texts)
+    digest = hashlib.sha256()
+    for bill_id in bill_ids:
+        digest.update(bill_id.encode("utf-8"))
+        digest.update(hashlib.sha256(texts[bill_id].encode("utf-8")).digest())
+    signature = digest.hexdigest()
+
+    if os.path.exists(path):
+        try:
+            with np.load(path) as data:
+                if str(data["signature"]) == signature:
+                    print("  Lexical index is up to date")
+                    return False
+        except (OSError, ValueError, KeyError):
+            pass
+
+    vocabulary: Dict[str, int] = {}
+    term_chunks, freq_chunks, row_chunks = [], [], []
+    doc_lengths = np.zeros(len(bill_ids), dtype=np.int32)
+    for row, bill_id in enumerate(bill_ids):
+        tokens = tokenize(texts[bill_id])
+        doc_lengths[row] = len(tokens)
+        counts = Counter(tokens)
+        term_chunks.append(np.fromiter(
+            (vocabulary.setdefault(term, len(vocabulary)) for term in counts), dtype=np.int32, count=len(counts)
+        ))
+        freq_chunks.append(np.fromiter(counts.values(), dtype=np.int32, count=len(counts)))
+        row_chunks.append(np.full(len(counts), row, dtype=np.int32))
+
+    term_ids = np.concatenate(term_chunks) if term_chunks else np.zeros(0, dtype=np.int32)
+    # Group postings by term; a stable sort keeps each term's doc rows ascending
+    order = np.argsort(term_ids, kind="stable")
+    indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)))
+
+    terms = sorted(vocabulary, key=vocabulary.get)
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                bill_ids=np.array(bill_ids, dtype=str),
+                terms=np.array(terms, dtype=str),
+                indptr=indptr,
+                doc_rows=np.concatenate(row_chunks)[order] if row_chunks else np.zeros(0, dtype=np.int32),
+                term_freqs=np.minimum(np.concatenate(freq_chunks)[order], 65535).astype(np.uint16)
+                if freq_chunks else np.zeros(0, dtype=np.uint16),
+                doc_lengths=doc_lengths,
+                signature=np.array(signature),
+            )
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"  [ERROR] Failed to write lexical index: {e}")
+        return False
+
+    bump_collection_version()
+    print(f"  Lexical index: {len(bill_ids)} bills, {len(vocabulary)} terms, {len(term_ids)} postings")
+    return True
+
+
+# Shared index for the search path, reloaded when the file is rebuilt
+_lexical_index: Optional[LexicalIndex] = None
+_lexical_index_mtime: Optional[float] = None
+_lexical_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """Get the loaded lexical index, or None if it has not been built"""
+    global _lexical_index, _lexical_index_mtime
+    try:
+        mtime = os.path.getmtime(LEXICAL_INDEX_PATH)
+    except OSError:
+        return None
+    with _lexical_index_lock:
+        if _lexical_index is None or mtime != _lexical_index_mtime:
+            try:
+                _lexical_index = LexicalIndex(LEXICAL_INDEX_PATH)
+                _lexical_index_mtime = mtime
+            except (OSError, ValueError, KeyError) as e:
+                print(f"  [ERROR] Failed to load lexical index from {LEXICAL_INDEX_PATH}: {e}")
+                return None
+        return _lexical_index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query the BM25 lexical index over bills")
+    parser.add_argument("--build", action="store_true", help="Fetch all bills and summaries and rebuild the index")
+    parser.add_argument("--query", help="Print the top BM25 matches for a query")
+    parser.add_argument("--top-k", type=int, default=10, help="Number of results for --query (default: 10)")
+
+    args = parser.parse_args()
+
+    if args.build:
+        from db import fetch_all_bills
+        from vectors import get_bill_summaries
+
+        print("Fetching bills and summaries...")
+        bills = fetch_all_bills(columns="id, title, sponsors, bill_text")
+        summaries = get_bill_summaries()
+        build_lexical_index({
+            bill.get("id", "unknown"): get_lexical_text(bill, summaries.get(bill.get("id", "unknown")))
+            for bill in bills
+        })
+
+    if args.query:
+        index = get_lexical_index()
+        if index is None:
+            print("Lexical index not built yet, run with --build")
+            sys.exit(1)
+        matches = index.lookup_bill_id(args.query)
+        if matches is not None:
+            print(f"Bill ID matches: {matches}")
+        for result in index.search(args.query, args.top_k):
+            print(f"{result['score']:8.3f}  {result['bill_id']}")
@@ -2,15 +2,17 @@
 Bill classification script: classifies bills in the database into categories that we have specified.
 
 Provides classification functions and processes all bills in the database to assign categories.
+Two engines are available: zero-shot bart-large-mnli (default) and embedding similarity
+against the stored bill embeddings (--engine embedding, see embedding_classifier.py).
 """
 
+import hashlib
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from typing import List, Dict, Any, Tuple, Optional
 import numpy as np
-from transformers import pipeline
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
@@ -23,17 +25,15 @@ load_dotenv(dotenv_path=env_path)
 # Also try loading from current directory (for backwards compatibility)
 load_dotenv()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-# Check if required env vars are set
-if not SUPABASE_URL or SUPABASE_URL == "replace_me":
-    print("SUPABASE_URL not configured. Using mock mode.")
-    SUPABASE_URL = None
-
-if not SUPABASE_SERVICE_ROLE_KEY or SUPABASE_SERVICE_ROLE_KEY == "replace_me":
-    print("SUPABASE_SERVICE_ROLE_KEY not configured. Using mock mode.")
-    SUPABASE_SERVICE_ROLE_KEY = None
+from db import (
+    SUPABASE_URL,
+    SUPABASE_SERVICE_ROLE_KEY,
+    get_supabase_client,
+    get_pg_pool,
+    get_bills_from_database,
+    fetch_all_bills,
+)
+from cache import LabelScoreCache
 
 # Bill classification categories
 CANDIDATE_LABELS = [
@@ -42,6 +42,13 @@ CANDIDATE_LABELS = [
     'Taxation', 'Civil Rights', 'Criminal Justice', 'Foreign Policy',
 ]
 
+CLASSIFIER_MODEL = "facebook/bart-large-mnli"
+HYPOTHESIS_TEMPLATE = "This example is {}."  # The zero-shot pipeline's default
+
+# Raw per-(bill, text hash, label) scores; with multi_label=True every label is scored
+# independently, so new labels or thresholds reuse the scores of known pairs
+LABEL_SCORE_CACHE_PATH = os.getenv("LABEL_SCORE_CACHE_PATH", str(python_dir / ".cache" / "label_scores.sqlite"))
+
 # Initialize classifier (lazy loading)
 _classifier = None
 
@@ -50,7 +57,9 @@ def get_classifier():
     """Get or initialize the zero-shot classifier"""
     global _classifier
     if _classifier is None:
-        _classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+        # Imported here so the embedding engine does not load transformers' pipeline stack
+        from transformers import pipeline
+        _classifier = pipeline("zero-shot-classification", model=CLASSIFIER_MODEL)
     return _classifier
 
 def softmax(x: np.ndarray) -> np.ndarray:
@@ -61,25 +70,15 @@ def softmax(x: np.ndarray) -> np.ndarray:
     return e_x / e_x.sum(axis=0)
 
 
-def classify_bill_text(text: str, threshold_std: float = 0.8) -> List[Tuple[str, float]]:
+def select_categories(labels: List[str], scores: List[float], threshold_std: float = 0.8) -> List[Tuple[str, float]]:
     """
-    Classify bill text into categories using zero-shot classification.
-    
-    Args:
-        text: The bill text to classify
-        threshold_std: Number of standard deviations above mean to use as threshold (default: 0.8)
-    
+    Apply softmax to raw label scores and keep labels above mean + threshold_std * std.
+
     Returns:
-        List of tuples (label, score) for categories that meet the threshold
+        List of tuples (label, score) for categories that meet the threshold, sorted by score
     """
-    classifier = get_classifier()
-    
-    # Perform classification
-    return_value = classifier(text, CANDIDATE_LABELS, multi_label=True)
-    
     # Get scores and apply softmax
-    scores = np.array(return_value["scores"])
-    softmax_scores = softmax(scores)
+    softmax_scores = softmax(np.array(scores))
     
     # Calculate threshold
     mean_score = np.mean(softmax_scores)
@@ -90,7 +89,7 @@ def classify_bill_text(text: str, threshold_std: float = 0.8) -> List[Tuple[str,
     top_results = []
     for i in range(len(softmax_scores)):
         if softmax_scores[i] >= threshold:
-            top_results.append((return_value['labels'][i], float(softmax_scores[i])))
+            top_results.append((labels[i], float(softmax_scores[i])))
     
     # Sort by score (descending)
     top_results.sort(key=lambda x: x[1], reverse=True)
@@ -98,28 +97,182 @@ def classify_bill_text(text: str, threshold_std: float = 0.8) -> List[Tuple[str,
     return top_results
 
 
-def get_bills_from_database(limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
-    """Fetch bills from the database"""
-    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-        print("  [MOCK] Would fetch bills from database")
-        return []
+def classify_bill_text(text: str, threshold_std: float = 0.8) -> List[Tuple[str, float]]:
+    """
+    Classify bill text into categories using zero-shot classification.
     
-    try:
-        from supabase import create_client, Client
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-        
-        query = supabase.table("bills").select("*")
-        
-        if limit:
-            query = query.limit(limit)
-        if offset:
-            query = query.offset(offset)
-        
-        result = query.execute()
-        return result.data if result.data else []
-    except Exception as e:
-        print(f"  [ERROR] Failed to fetch bills: {e}")
+    Args:
+        text: The bill text to classify
+        threshold_std: Number of standard deviations above mean to use as threshold (default: 0.8)
+    
+    Returns:
+        List of tuples (label, score) for categories that meet the threshold
+    """
+    return classify_bill_texts([text], threshold_std)[0]
+
+
+def split_into_token_windows(text: str, window_tokens: int = 512, overlap_tokens: int = 64, max_windows: int = 8) -> List[str]:
+    """
+    Split text into overlapping windows of the classifier's tokens.
+    
+    Args:
+        text: Text to split
+        window_tokens: Tokens per window (default: 512, well under BART's 1024 with the hypothesis)
+        overlap_tokens: Tokens shared by consecutive windows (default: 64)
+        max_windows: Maximum windows per text. Longer texts keep evenly spaced windows
+            so the whole document is sampled while latency stays bounded (default: 8)
+    
+    Returns:
+        List of window texts (a single window for short texts)
+    """
+    tokenizer = get_classifier().tokenizer
+    token_ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+    if len(token_ids) <= window_tokens:
+        return [text]
+    
+    step = max(window_tokens - overlap_tokens, 1)
+    starts = [0]
+    while starts[-1] + window_tokens < len(token_ids):
+        starts.append(starts[-1] + step)
+    if len(starts) > max_windows:
+        picks = np.linspace(0, len(starts) - 1, max_windows).round().astype(int)
+        starts = [starts[i] for i in picks]
+    
+    return [tokenizer.decode(token_ids[start:start + window_tokens]) for start in starts]
+
+
+def classify_bill_texts(
+    texts: List[str],
+    threshold_std: float = 0.8,
+    batch_size: int = 8,
+    chunk_tokens: Optional[int] = None,
+    max_chunks: int = 8,
+    pooling: str = "max",
+) -> List[List[Tuple[str, float]]]:
+    """
+    Classify many bill texts in one batched zero-shot pipeline call.
+    
+    Args:
+        texts: The bill texts to classify
+        threshold_std: Number of standard deviations above mean to use as threshold (default: 0.8)
+        batch_size: Number of (text window, label) NLI pairs per forward pass (default: 8)
+        chunk_tokens: If set, split long texts into windows of this many tokens, classify every
+            window and pool the per-label scores instead of letting the model truncate the text
+        max_chunks: Maximum windows per text in chunked mode (default: 8)
+        pooling: How window scores are combined per label in chunked mode, "max" or "mean" (default: "max")
+    
+    Returns:
+        One list of (label, score) tuples per input text, with the same thresholding as classify_bill_text
+    """
+    return [
+        select_categories(CANDIDATE_LABELS, scores, threshold_std)
+        for scores in score_bill_texts(texts, CANDIDATE_LABELS, batch_size, chunk_tokens, max_chunks, pooling)
+    ]
+
+
+def score_bill_texts(
+    texts: List[str],
+    labels: List[str] = CANDIDATE_LABELS,
+    batch_size: int = 8,
+    chunk_tokens: Optional[int] = None,
+    max_chunks: int = 8,
+    pooling: str = "max",
+) -> List[List[float]]:
+    """
+    Raw (pooled) entailment score of every label for every text, in labels order.
+    
+    See classify_bill_texts for the batching and chunking options.
+    """
+    if not texts:
         return []
+    if pooling not in ("max", "mean"):
+        raise ValueError(f"Unknown pooling '{pooling}', expected 'max' or 'mean'")
+    
+    classifier = get_classifier()
+    
+    # Split texts into windows, remembering which text each window belongs to
+    if chunk_tokens:
+        windows = []
+        owners = []
+        for i, text in enumerate(texts):
+            for window in split_into_token_windows(text, chunk_tokens, max_windows=max_chunks):
+                windows.append(window)
+                owners.append(i)
+    else:
+        windows = texts
+        owners = list(range(len(texts)))
+    
+    # Perform classification
+    outputs = classifier(
+        windows, labels, hypothesis_template=HYPOTHESIS_TEMPLATE, multi_label=True, batch_size=batch_size
+    )
+    if isinstance(outputs, dict):
+        outputs = [outputs]
+    
+    # Collect raw scores per text in labels order (the pipeline sorts labels by score)
+    window_scores: List[List[List[float]]] = [[] for _ in texts]
+    for owner, output in zip(owners, outputs):
+        label_scores = dict(zip(output["labels"], output["scores"]))
+        window_scores[owner].append([label_scores[label] for label in labels])
+    
+    results = []
+    for scores in window_scores:
+        scores = np.array(scores)
+        pooled = scores.max(axis=0) if pooling == "max" else scores.mean(axis=0)
+        results.append(pooled.tolist())
+    return results
+
+
+def classification_text_hash(text: str, chunk_tokens: Optional[int] = None, max_chunks: int = 8, pooling: str = "max") -> str:
+    """Hash of a text plus everything else that changes its label scores (model, template, chunking)"""
+    chunking = f"{chunk_tokens}:{max_chunks}:{pooling}" if chunk_tokens else "truncate"
+    payload = f"{CLASSIFIER_MODEL}\n{HYPOTHESIS_TEMPLATE}\n{chunking}\n{text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def classify_bill_texts_cached(
+    bill_ids: List[str],
+    texts: List[str],
+    score_cache: LabelScoreCache,
+    threshold_std: float = 0.8,
+    batch_size: int = 8,
+    chunk_tokens: Optional[int] = None,
+    max_chunks: int = 8,
+    pooling: str = "max",
+) -> List[List[Tuple[str, float]]]:
+    """
+    classify_bill_texts with raw label scores read from and written to score_cache.
+    
+    Only (bill, label) pairs missing for the bill's current text hash are run through the
+    model: adding a label costs one hypothesis per bill, and a new threshold_std none.
+    """
+    hashes = [classification_text_hash(text, chunk_tokens, max_chunks, pooling) for text in texts]
+    keys = list(zip(bill_ids, hashes))
+    scores = score_cache.get_scores(keys)
+    
+    # Texts missing the same labels are scored together in one pipeline call
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for i, key in enumerate(keys):
+        missing = tuple(label for label in CANDIDATE_LABELS if label not in scores.get(key, {}))
+        if missing:
+            groups.setdefault(missing, []).append(i)
+    
+    new_rows = []
+    for labels, indices in groups.items():
+        group_scores = score_bill_texts(
+            [texts[i] for i in indices], list(labels), batch_size, chunk_tokens, max_chunks, pooling
+        )
+        for i, label_scores in zip(indices, group_scores):
+            scores.setdefault(keys[i], {}).update(zip(labels, label_scores))
+            new_rows.extend((bill_ids[i], hashes[i], label, score) for label, score in zip(labels, label_scores))
+    score_cache.set_scores(new_rows)
+    total_pairs = len(keys) * len(CANDIDATE_LABELS)
+    print(f"  Label scores: {total_pairs - len(new_rows)} cached, {len(new_rows)} computed")
+    
+    return [
+        select_categories(CANDIDATE_LABELS, [scores[key][label] for label in CANDIDATE_LABELS], threshold_std)
+        for key in keys
+    ]
 
 
 def get_bill_text(bill_id: str) -> Optional[str]:
@@ -128,8 +281,7 @@ def get_bill_text(bill_id: str) -> Optional[str]:
         return None
     
     try:
-        from supabase import create_client, Client
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        supabase = get_supabase_client()
         
         result = supabase.table("bills").select("bill_text").eq("id", bill_id).limit(1).execute()
         
@@ -141,56 +293,136 @@ def get_bill_text(bill_id: str) -> Optional[str]:
         return None
 
 
+def get_bill_texts(bill_ids: List[str], id_chunk_size: int = 100) -> Dict[str, str]:
+    """Fetch bill_text for many bills with chunked `in` filters"""
+    supabase = get_supabase_client()
+    if supabase is None or not bill_ids:
+        return {}
+    
+    texts = {}
+    for chunk_start in range(0, len(bill_ids), id_chunk_size):
+        chunk_ids = bill_ids[chunk_start:chunk_start + id_chunk_size]
+        try:
+            result = supabase.table("bills").select("id, bill_text").in_("id", chunk_ids).execute()
+            for row in result.data or []:
+                if row.get("bill_text"):
+                    texts[row["id"]] = row["bill_text"]
+        except Exception as e:
+            print(f"  [WARNING] Could not fetch bill text for {len(chunk_ids)} bills: {e}")
+    return texts
+
+
 def update_bill_categories(bill_id: str, categories: List[str]) -> bool:
     """Update bill categories in the database"""
-    # if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    #     print(f"  [MOCK] Would update categories for bill {bill_id}: {categories}")
-    #     return True  # Return True in mock mode to allow testing
-    
-    try:
-        from supabase import create_client, Client
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-        
-        print(f"  [DEBUG] Updating bill {bill_id} with categories: {categories}")
-        result = supabase.table("bills").update(
-            {"categories": categories}
-        ).eq("id", bill_id).execute()
-        
-        if result.data:
-            print(f"  [DEBUG] Successfully updated bill {bill_id}")
-            return True
-        else:
-            print(f"  [WARNING] Update returned no data for bill {bill_id}")
-            return False
+    return bill_id in update_bill_categories_bulk({bill_id: categories})
 
-    except Exception as e:
-        print(f"  [ERROR] Failed to update categories for {bill_id}: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+
+def update_bill_categories_bulk(updates: Dict[str, List[str]], chunk_size: int = 1000) -> List[str]:
+    """
+    Write categories for many bills in a few requests.
+    
+    Uses one `UPDATE ... FROM (VALUES ...)` statement per chunk over the PostgreSQL pool when
+    DATABASE_URL is configured. Otherwise bills with identical category lists are grouped and
+    updated with one Supabase `in_` filter per group.
+    
+    Args:
+        updates: Mapping of bill_id -> categories
+        chunk_size: Bills per statement or request (default: 1000)
+    
+    Returns:
+        IDs of the bills that were updated
+    """
+    if not updates:
+        return []
+    
+    bill_ids = list(updates.keys())
+    updated: List[str] = []
+    
+    pool = get_pg_pool()
+    if pool is not None:
+        try:
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    for chunk_start in range(0, len(bill_ids), chunk_size):
+                        chunk_ids = bill_ids[chunk_start:chunk_start + chunk_size]
+                        values = ", ".join(["(%s, %s::text[])"] * len(chunk_ids))
+                        params = [value for bill_id in chunk_ids for value in (bill_id, updates[bill_id])]
+                        cur.execute(
+                            f"UPDATE bills SET categories = v.categories "
+                            f"FROM (VALUES {values}) AS v(id, categories) "
+                            f"WHERE bills.id = v.id RETURNING bills.id",
+                            params,
+                        )
+                        updated.extend(row[0] for row in cur.fetchall())
+            return updated
+        except Exception as e:
+            print(f"  [WARNING] PostgreSQL category update failed, falling back to Supabase: {e}")
+            updated = []
+    
+    supabase = get_supabase_client()
+    if supabase is None:
+        print(f"  [MOCK] Would update categories for {len(updates)} bills")
+        return []
+    
+    # Group bills that share the same category list into one request
+    groups: Dict[Tuple[str, ...], List[str]] = {}
+    for bill_id, categories in updates.items():
+        groups.setdefault(tuple(categories), []).append(bill_id)
+    
+    for categories, group_ids in groups.items():
+        for chunk_start in range(0, len(group_ids), chunk_size):
+            chunk_ids = group_ids[chunk_start:chunk_start + chunk_size]
+            try:
+                result = supabase.table("bills").update(
+                    {"categories": list(categories)}
+                ).in_("id", chunk_ids).execute()
+                updated.extend(row["id"] for row in result.data or [])
+            except Exception as e:
+                print(f"  [ERROR] Failed to update categories for {len(chunk_ids)} bills: {e}")
+    
+    return updated
 
 
-def classify_bill_in_database(bill: Dict[str, Any], threshold_std: float = 0.8) -> bool:
-    """Classify a single bill and update its categories in the database"""
+def get_classification_text(bill: Dict[str, Any], fetch_text: bool = True) -> str:
+    """
+    Text to classify for a bill (bill_text, falling back to title + summary_key).
+    
+    Pass fetch_text=False when bill text was already bulk-fetched (get_bill_texts), so bills
+    without stored text go straight to the fallback instead of one request each.
+    """
     bill_id = bill["id"]
     bill_title = bill.get("title", "")
     
     # Get full bill text (prefer from bill dict, otherwise fetch from database)
     bill_text = bill.get("bill_text")
-    if not bill_text:
+    if not bill_text and fetch_text:
         bill_text = get_bill_text(bill_id)
     
     # Prepare text for classification
     if bill_text:
-        classification_text = bill_text
-    else:
-        # Fallback to title + summary_key if bill_text is not available
-        classification_text = f"{bill_title} {bill.get('summary_key', '')}"
-        print(f"  [WARNING] No bill_text found, using title + summary_key as fallback")
+        return bill_text
+    # Fallback to title + summary_key if bill_text is not available
+    print(f"  [WARNING] No bill_text found for {bill_id}, using title + summary_key as fallback")
+    return f"{bill_title} {bill.get('summary_key', '')}"
+
+
+def classify_bill_in_database(
+    bill: Dict[str, Any],
+    threshold_std: float = 0.8,
+    classification_results: Optional[List[Tuple[str, float]]] = None,
+) -> bool:
+    """
+    Classify a single bill and update its categories in the database.
+    
+    If classification_results is given (e.g. from a batched classify_bill_texts call),
+    the model is not run again and only the database is updated.
+    """
+    bill_id = bill["id"]
     
     # Classify bill
     try:
-        classification_results = classify_bill_text(classification_text, threshold_std)
+        if classification_results is None:
+            classification_results = classify_bill_text(get_classification_text(bill), threshold_std)
         
         # Print each prediction from the AI model
         print(f"AI Model Predictions for {bill_id}:")
@@ -224,34 +456,210 @@ def classify_bill_in_database(bill: Dict[str, Any], threshold_std: float = 0.8)
         return False
 
 
-def classify_all_bills(threshold_std: float = 0.8, limit: Optional[int] = None, offset: int = 0, update_existing: bool = False):
-    """Classify all bills in the database"""
+def load_checkpoint(checkpoint_path: Optional[str]) -> set:
+    """Read the IDs of bills already classified by a previous (possibly interrupted) run"""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def classify_bills(
+    bills: List[Dict[str, Any]],
+    threshold_std: float = 0.8,
+    batch_size: int = 8,
+    pipeline_batch_size: int = 8,
+    chunk_tokens: Optional[int] = None,
+    max_chunks: int = 8,
+    pooling: str = "max",
+    checkpoint_path: Optional[str] = None,
+    write_batch_size: int = 500,
+    score_cache_path: Optional[str] = None,
+) -> Tuple[int, int]:
+    """
+    Classify bills batch by batch and update their categories in the database.
+    
+    batch_size bills are sent to the pipeline per call, which runs pipeline_batch_size
+    (text window, label) NLI pairs per forward pass. Bill text missing from the bill dicts is fetched per batch. Categories are buffered and
+    written write_batch_size bills at a time; IDs of bills written successfully are then
+    appended to checkpoint_path. With score_cache_path, raw label scores are reused from and
+    saved to that LabelScoreCache file (see classify_bill_texts_cached).
+    
+    Returns:
+        Tuple (successful, failed)
+    """
+    successful = 0
+    failed = 0
+    pending: Dict[str, List[str]] = {}
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+    score_cache = LabelScoreCache(score_cache_path) if score_cache_path else None
+    
+    def flush_pending():
+        """Write buffered categories and checkpoint the bills that were updated"""
+        nonlocal successful, failed
+        if not pending:
+            return
+        updated = update_bill_categories_bulk(pending)
+        print(f"Wrote categories for {len(updated)}/{len(pending)} bills")
+        if checkpoint and updated:
+            checkpoint.write("".join(f"{bill_id}\n" for bill_id in updated))
+            checkpoint.flush()
+        successful += len(updated)
+        failed += len(pending) - len(updated)
+        pending.clear()
+    
+    try:
+        for batch_start in range(0, len(bills), batch_size):
+            batch = bills[batch_start:batch_start + batch_size]
+            print(f"[{batch_start + 1}-{batch_start + len(batch)}/{len(bills)}] Classifying batch...")
+            
+            # Load bill text for the whole batch in one request
+            fetched_texts = get_bill_texts([bill["id"] for bill in batch if not bill.get("bill_text")])
+            batch = [
+                {**bill, "bill_text": fetched_texts[bill["id"]]} if bill["id"] in fetched_texts else bill
+                for bill in batch
+            ]
+            
+            try:
+                batch_texts = [get_classification_text(bill, fetch_text=False) for bill in batch]
+                if score_cache is not None:
+                    batch_results = classify_bill_texts_cached(
+                        [bill["id"] for bill in batch],
+                        batch_texts,
+                        score_cache,
+                        threshold_std,
+                        batch_size=pipeline_batch_size,
+                        chunk_tokens=chunk_tokens,
+                        max_chunks=max_chunks,
+                        pooling=pooling,
+                    )
+                else:
+                    batch_results = classify_bill_texts(
+                        batch_texts,
+                        threshold_std,
+                        batch_size=pipeline_batch_size,
+                        chunk_tokens=chunk_tokens,
+                        max_chunks=max_chunks,
+                        pooling=pooling,
+                    )
+            except Exception as e:
+                print(f"  [ERROR] Batch classification failed: {e}")
+                failed += len(batch)
+                continue
+            
+            for bill, classification_results in zip(batch, batch_results):
+                categories = [label for label, score in classification_results]
+                print(f"  {bill['id']}: {', '.join(categories) or 'no categories met the threshold'}")
+                pending[bill["id"]] = categories
+            
+            if len(pending) >= write_batch_size:
+                flush_pending()
+            
+            print()
+        
+        flush_pending()
+    finally:
+        if checkpoint:
+            checkpoint.close()
+    
+    return successful, failed
+
+
+def classify_bills_by_embedding(
+    bills: List[Dict[str, Any]],
+    threshold_std: float = 0.8,
+    exemplars: Optional[Dict[str, List[str]]] = None,
+    checkpoint_path: Optional[str] = None,
+    write_batch_size: int = 500,
+) -> Tuple[int, int]:
+    """
+    Classify bills with the embedding engine (one matrix multiply over the stored embeddings)
+    and update their categories in the database. Bills without a stored embedding fail.
+    
+    Returns:
+        Tuple (successful, failed)
+    """
+    from embedding_classifier import classify_all_by_embedding
+    
+    results = classify_all_by_embedding(threshold_std, exemplars)
+    updates = {}
+    for bill in bills:
+        if bill["id"] in results:
+            categories = [label for label, score in results[bill["id"]]]
+            print(f"  {bill['id']}: {', '.join(categories) or 'no categories met the threshold'}")
+            updates[bill["id"]] = categories
+    missing = len(bills) - len(updates)
+    if missing:
+        print(f"  [WARNING] {missing} bills have no stored embedding, run vectors.py --incremental first")
+    
+    successful = 0
+    bill_ids = list(updates)
+    for chunk_start in range(0, len(bill_ids), write_batch_size):
+        chunk = {bill_id: updates[bill_id] for bill_id in bill_ids[chunk_start:chunk_start + write_batch_size]}
+        updated = update_bill_categories_bulk(chunk)
+        print(f"Wrote categories for {len(updated)}/{len(chunk)} bills")
+        if checkpoint_path and updated:
+            with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+                checkpoint.write("".join(f"{bill_id}\n" for bill_id in updated))
+        successful += len(updated)
+    return successful, len(bills) - successful
+
+
+def _classify_shard(shard_index: int, bills: List[Dict[str, Any]], threads: int, options: Dict[str, Any]) -> Tuple[int, int]:
+    """Worker entry point: classify one shard of bills with this process's own classifier"""
+    import torch
+    torch.set_num_threads(threads)
+    print(f"[worker {shard_index}] Classifying {len(bills)} bills with {threads} threads")
+    return classify_bills(bills, **options)
+
+
+def classify_all_bills(
+    threshold_std: float = 0.8,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    update_existing: bool = False,
+    batch_size: int = 8,
+    pipeline_batch_size: int = 8,
+    chunk_tokens: Optional[int] = None,
+    max_chunks: int = 8,
+    pooling: str = "max",
+    workers: int = 1,
+    checkpoint_path: Optional[str] = None,
+    engine: str = "bart",
+    use_exemplars: bool = False,
+    score_cache_path: Optional[str] = LABEL_SCORE_CACHE_PATH,
+):
+    """
+    Classify all bills in the database, batch_size bills per pipeline call and
+    pipeline_batch_size (text window, label) NLI pairs per forward pass.
+    
+    With engine="embedding", bills are classified against label centroids using their stored
+    embeddings instead (see embedding_classifier.py); use_exemplars builds each centroid from
+    the bills already labelled with it. The batching, chunking and worker options only apply
+    to the BART engine.
+    
+    With chunk_tokens set, long bills are classified window by window (see classify_bill_texts).
+    With workers > 1, bills are sharded across processes that each load their own classifier.
+    Bills listed in checkpoint_path are skipped, and newly classified bills are appended to it,
+    so an interrupted run can be resumed by running the same command again.
+    Raw label scores are cached in score_cache_path (None disables the cache), so rerunning
+    with --update-existing after adding a label or changing threshold_std only runs the
+    model for the missing (bill, label) pairs.
+    """
     print("Starting bill classification...")
     print()
     
     # Fetch bills from database (with pagination if no limit specified)
+    # Bill text is loaded later, batch by batch, and only for bills that need classifying
     print("Fetching bills from database...")
+    columns = "id, title, summary_key, categories"
     
     if limit is not None:
         # If limit is specified, use it directly (for backward compatibility)
-        all_bills = get_bills_from_database(limit=limit, offset=offset)
+        all_bills = get_bills_from_database(limit=limit, offset=offset, columns=columns)
     else:
         # If no limit, fetch all bills with pagination
-        all_bills = []
-        page_size = 1000
-        current_offset = offset
-        
-        while True:
-            bills = get_bills_from_database(limit=page_size, offset=current_offset)
-            if not bills:
-                break
-            all_bills.extend(bills)
-            print(f"  Fetched {len(bills)} bills (total: {len(all_bills)})...")
-            
-            # If we got fewer than page_size, we've reached the end
-            if len(bills) < page_size:
-                break
-            current_offset += page_size
+        all_bills = fetch_all_bills(columns=columns, offset=offset)
     
     if not all_bills:
         print("No bills found in database.")
@@ -260,23 +668,51 @@ def classify_all_bills(threshold_std: float = 0.8, limit: Optional[int] = None,
     print(f"Found {len(all_bills)} bills total")
     print()
     
-    # Process each bill
-    successful = 0
-    failed = 0
-    skipped = 0
+    # Skip bills already classified (categories stored, even an empty list) or finished by a previous run
+    completed_ids = load_checkpoint(checkpoint_path)
+    bills_to_classify = [
+        bill for bill in all_bills
+        if bill["id"] not in completed_ids and (update_existing or bill.get("categories") is None)
+    ]
+    skipped = len(all_bills) - len(bills_to_classify)
+    if skipped:
+        print(f"Skipping {skipped} bills (already categorized or in checkpoint)")
+        print()
     
-    for i, bill in enumerate(all_bills, 1):
-        bill_id = bill["id"]
-        bill_title = bill.get("title", "Unknown")
-                
-        print(f"[{i}/{len(all_bills)}] Classifying: {bill_title} ({bill_id})")
-        
-        if classify_bill_in_database(bill, threshold_std):
-            successful += 1
-        else:
-            failed += 1
+    options = {
+        "threshold_std": threshold_std,
+        "batch_size": batch_size,
+        "pipeline_batch_size": pipeline_batch_size,
+        "chunk_tokens": chunk_tokens,
+        "max_chunks": max_chunks,
+        "pooling": pooling,
+        "checkpoint_path": checkpoint_path,
+        "score_cache_path": score_cache_path,
+    }
+    
+    workers = max(1, min(workers, len(bills_to_classify)))
+    if engine == "embedding":
+        exemplars = {bill["id"]: bill.get("categories") or [] for bill in all_bills} if use_exemplars else None
+        successful, failed = classify_bills_by_embedding(
+            bills_to_classify, threshold_std, exemplars, checkpoint_path=checkpoint_path
+        )
+    elif workers == 1:
+        successful, failed = classify_bills(bills_to_classify, **options)
+    else:
+        import multiprocessing
         
+        # Round-robin shards keep long and short bills spread evenly across workers
+        shards = [bills_to_classify[i::workers] for i in range(workers)]
+        threads = max(1, (os.cpu_count() or workers) // workers)
+        print(f"Classifying with {workers} worker processes...")
         print()
+        with multiprocessing.get_context("spawn").Pool(processes=workers) as pool:
+            results = pool.starmap(
+                _classify_shard,
+                [(i, shard, threads, options) for i, shard in enumerate(shards)],
+            )
+        successful = sum(result[0] for result in results)
+        failed = sum(result[1] for result in results)
     
     # Summary
     print("Classification complete!")
@@ -316,14 +752,95 @@ def main():
         action="store_true",
         help="Update bills that already have categories",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=8,
+        help="Number of bills per batched pipeline call (default: 8)",
+    )
+    parser.add_argument(
+        "--pipeline-batch-size",
+        type=int,
+        default=8,
+        help="Number of (text window, label) NLI pairs per model forward pass (default: 8)",
+    )
+    parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        help="Classify long bills in windows of this many tokens instead of truncating them (e.g. 512)",
+    )
+    parser.add_argument(
+        "--max-chunks",
+        type=int,
+        default=8,
+        help="Maximum windows per bill in chunked mode (default: 8)",
+    )
+    parser.add_argument(
+        "--pooling",
+        choices=["max", "mean"],
+        default="max",
+        help="How window scores are combined per label in chunked mode (default: max)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, each with its own classifier (default: 1)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="File of completed bill IDs; bills listed there are skipped so an interrupted run can resume",
+    )
+    parser.add_argument(
+        "--no-score-cache",
+        action="store_true",
+        help=f"Do not read or write cached label scores ({LABEL_SCORE_CACHE_PATH})",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["bart", "embedding"],
+        default="bart",
+        help="bart: zero-shot bart-large-mnli; embedding: stored bill embeddings vs label centroids (default: bart)",
+    )
+    parser.add_argument(
+        "--exemplars",
+        action="store_true",
+        help="Embedding engine: build label centroids from bills already labelled with each category",
+    )
+    parser.add_argument(
+        "--agreement-report",
+        action="store_true",
+        help="Classify every bill with the embedding engine and compare with the stored BART categories (no writes)",
+    )
+    parser.add_argument(
+        "--bart-sample",
+        type=int,
+        default=0,
+        help="With --agreement-report, also time BART on this many bills",
+    )
 
     args = parser.parse_args()
 
+    if args.agreement_report:
+        from embedding_classifier import run_agreement_report
+        run_agreement_report(args.threshold_std, args.exemplars, args.bart_sample)
+        return
+
     classify_all_bills(
         threshold_std=args.threshold_std,
         limit=args.limit,
         offset=args.offset,
-        update_existing=args.update_existing
+        update_existing=args.update_existing,
+        batch_size=args.batch_size,
+        pipeline_batch_size=args.pipeline_batch_size,
+        chunk_tokens=args.chunk_tokens,
+        max_chunks=args.max_chunks,
+        pooling=args.pooling,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        engine=args.engine,
+        use_exemplars=args.exemplars,
+        score_cache_path=None if args.no_score_cache else LABEL_SCORE_CACHE_PATH,
     )
 
 
@@ -3,36 +3,321 @@
 API wrapper for vector search.
 Accepts query as command line argument and outputs JSON results.
 All debug/info messages are redirected to stderr so only JSON goes to stdout.
+
+Can also run as a long-lived search server (--serve) that keeps the embedding
+model and the loaded vector store (Milvus collection or local matrix) warm between queries.
+The CLI path asks a running server first and falls back to an in-process search
+when no server is reachable.
 """
 
+import os
 import sys
 import json
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEARCH_SERVER_HOST = os.getenv("SEARCH_SERVER_HOST", "127.0.0.1")
+SEARCH_SERVER_PORT = int(os.getenv("SEARCH_SERVER_PORT", "8765"))
+
+DEFAULT_TOP_K = 12
+DEFAULT_METRIC = "COSINE"
+
+# The embedding model and the vector store are shared by all request threads
+_search_lock = threading.Lock()
+
+
+# Query string parameters of GET /search that map to search filters (see vector_search.py)
+FILTER_PARAMS = {"category": "categories", "origin": "origin", "status": "status",
+                 "date_from": "date_from", "date_to": "date_to"}
+
+
+def run_search(query: str, top_k: int = DEFAULT_TOP_K, metric: str = DEFAULT_METRIC, filters=None):
+    """Run search_bills_with_details in this process"""
+    from vector_search import search_bills_with_details
+    with _search_lock:
+        return search_bills_with_details(query, top_k=top_k, metric=metric, filters=filters)
+
+
+def run_search_batch(queries, top_k: int = DEFAULT_TOP_K, metric: str = DEFAULT_METRIC, filters=None):
+    """Run search_bills_with_details_batch in this process"""
+    from vector_search import search_bills_with_details_batch
+    with _search_lock:
+        return search_bills_with_details_batch(queries, top_k=top_k, metric=metric, filters=filters)
+
+
+def run_similar(bill_id: str, k: int = DEFAULT_TOP_K):
+    """Precomputed neighbours of a bill (similar_bills.py), in the same shape as search results"""
+    from similar_bills import similar_bills
+    from vector_search import _format_search_results_without_details
+    return _format_search_results_without_details(similar_bills(bill_id, k))
+
+
+def filters_from_params(params) -> dict:
+    """Search filters from parsed GET parameters (category may repeat)"""
+    filters = {}
+    for param, key in FILTER_PARAMS.items():
+        values = [value for value in params.get(param, []) if value.strip()]
+        if values:
+            filters[key] = values if key in ("categories", "origin", "status") else values[0]
+    return filters
+
+
+def filters_to_params(filters) -> list:
+    """GET parameters for search filters (inverse of filters_from_params)"""
+    names = {key: param for param, key in FILTER_PARAMS.items()}
+    params = []
+    for key, value in (filters or {}).items():
+        if key not in names:
+            raise ValueError(f"Unknown search filter '{key}'")
+        for item in (value if isinstance(value, (list, tuple)) else [value]):
+            params.append((names[key], str(item)))
+    return params
+
+
+def query_server(query: str, top_k: int = DEFAULT_TOP_K, metric: str = DEFAULT_METRIC,
+                 host: str = SEARCH_SERVER_HOST, port: int = SEARCH_SERVER_PORT,
+                 timeout: float = 30.0, filters=None):
+    """
+    Ask a running search server for results.
+
+    Returns:
+        List of results, or None if the server is not reachable
+    """
+    params = urllib.parse.urlencode(
+        [("q", query), ("top_k", top_k), ("metric", metric)] + filters_to_params(filters)
+    )
+    url = f"http://{host}:{port}/search?{params}"
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        if e.code == 400:
+            # Invalid filters are rejected the same way in-process, so report them as such
+            raise ValueError(json.loads(e.read().decode("utf-8")).get("error", "Bad request"))
+        print(f"  [INFO] Search server failed ({e}), searching in-process", file=sys.stderr)
+        return None
+    except (urllib.error.URLError, ConnectionError, TimeoutError, ValueError) as e:
+        print(f"  [INFO] Search server not available ({e}), searching in-process", file=sys.stderr)
+        return None
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles GET /search?q=...&top_k=...&metric=..., GET /similar?bill_id=...&k=...,
+    GET /health, GET /stats and POST /search/batch with a JSON body {"queries": [...], "top_k": ..., "metric": ...}
+
+    Searches can be filtered with category (repeatable), origin, status, date_from and
+    date_to query parameters, or a "filters" object in the batch body.
+    """
+
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(parsed.query)
+
+        if parsed.path == "/health":
+            self._send_json({"status": "ok"})
+            return
+
+        if parsed.path == "/stats":
+            from vector_search import get_cache_stats
+            self._send_json(get_cache_stats())
+            return
+
+        if parsed.path == "/similar":
+            bill_id = params.get("bill_id", [""])[0]
+            if not bill_id.strip():
+                self._send_json({"error": "bill_id is required"}, status=400)
+                return
+            try:
+                k = int(params.get("k", [DEFAULT_TOP_K])[0])
+            except ValueError:
+                self._send_json({"error": "k must be an integer"}, status=400)
+                return
+            if k < 1:
+                self._send_json({"error": "k must be at least 1"}, status=400)
+                return
+            # A dictionary lookup: no model or vector store access, so no search lock
+            self._send_json(run_similar(bill_id, k))
+            return
+
+        if parsed.path != "/search":
+            self._send_json({"error": "Not found"}, status=404)
+            return
+
+        query = params.get("q", [""])[0]
+        if not query.strip():
+            self._send_json([])
+            return
+
+        try:
+            top_k = int(params.get("top_k", [DEFAULT_TOP_K])[0])
+        except ValueError:
+            self._send_json({"error": "top_k must be an integer"}, status=400)
+            return
+        metric = params.get("metric", [DEFAULT_METRIC])[0].upper()
+
+        try:
+            results = run_search(query, top_k=top_k, metric=metric, filters=filters_from_params(params))
+        except ValueError as e:
+            self._send_json({"error": str(e)}, status=400)
+            return
+        except Exception as e:
+            print(f"  [ERROR] Search request failed: {e}", file=sys.stderr)
+            self._send_json({"error": str(e)}, status=500)
+            return
+        self._send_json(results)
+
+    def do_POST(self):
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path != "/search/batch":
+            self._send_json({"error": "Not found"}, status=404)
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            body = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+            queries = [str(query) for query in body.get("queries", [])]
+            top_k = int(body.get("top_k", DEFAULT_TOP_K))
+            metric = str(body.get("metric", DEFAULT_METRIC)).upper()
+            filters = body.get("filters") or {}
+            if not isinstance(filters, dict):
+                raise TypeError("filters must be an object")
+        except (ValueError, TypeError, AttributeError):
+            self._send_json({"error": "Body must be JSON with a 'queries' list and an optional 'filters' object"}, status=400)
+            return
+
+        try:
+            results = run_search_batch(queries, top_k=top_k, metric=metric, filters=filters)
+        except ValueError as e:
+            self._send_json({"error": str(e)}, status=400)
+            return
+        except Exception as e:
+            print(f"  [ERROR] Batch search request failed: {e}", file=sys.stderr)
+            self._send_json({"error": str(e)}, status=500)
+            return
+        self._send_json(results)
+
+    def log_message(self, format, *args):
+        # Keep request logs on stderr like the rest of the package output
+        print(f"  [INFO] {self.address_string()} {format % args}", file=sys.stderr)
+
+
+def serve(host: str = SEARCH_SERVER_HOST, port: int = SEARCH_SERVER_PORT):
+    """Warm up the model and vector store, then serve search requests"""
+    # Route all module prints to stderr, same as the CLI path
+    sys.stdout = sys.stderr
+
+    from vectors import get_embedding_model
+    from vector_store import get_vector_store
+
+    print("Warming up search server...")
+    get_embedding_model()
+    store = get_vector_store()
+    if not store.warm_up():
+        print(f"  [WARNING] {store.name} vector store not available yet, will retry on first search")
+
+    from similar_bills import get_neighbor_graph
+    if get_neighbor_graph() is None:
+        print("  [WARNING] Neighbour graph not built yet, /similar will return no results")
+
+    from vector_search import HYBRID_SEARCH
+    if HYBRID_SEARCH:
+        from lexical_index import get_lexical_index
+        if get_lexical_index() is None:
+            print("  [WARNING] Lexical index not built yet, hybrid search will use vectors only")
+
+    server = ThreadingHTTPServer((host, port), SearchRequestHandler)
+    print(f"Search server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down search server...")
+    finally:
+        server.server_close()
+
 
 def main():
-    if len(sys.argv) < 2:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Search bills and print JSON results")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--serve", action="store_true", help="Run as a long-lived search server")
+    parser.add_argument("--host", default=SEARCH_SERVER_HOST, help="Search server host")
+    parser.add_argument("--port", type=int, default=SEARCH_SERVER_PORT, help="Search server port")
+    parser.add_argument(
+        "--no-server",
+        action="store_true",
+        help="Always search in-process instead of asking a running search server",
+    )
+    parser.add_argument(
+        "--filters",
+        type=json.loads,
+        default=None,
+        help='JSON search filters, e.g. \'{"categories": ["Health"], "date_from": "2023-01-01"}\'',
+    )
+
+    parser.add_argument("--similar", metavar="BILL_ID", help="Print the precomputed neighbours of a bill")
+
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.host, args.port)
+        return
+
+    if args.similar:
+        original_stdout = sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            results = run_similar(args.similar)
+        finally:
+            sys.stdout = original_stdout
+        print(json.dumps(results))
+        return
+
+    if not args.query:
         # Output JSON to stdout
         print(json.dumps([]))
         sys.exit(0)
-    
-    query = sys.argv[1]
-    
-    # Save original stdout
-    original_stdout = sys.stdout
-    
-    # Redirect stdout to stderr for all print statements from imported modules
-    sys.stdout = sys.stderr
-    
-    try:
-        # Import and run search with stdout redirected to stderr
-        from vector_search import search_bills_with_details
-        results = search_bills_with_details(query, top_k=12, metric="COSINE")
-    finally:
-        # Restore original stdout for JSON output
-        sys.stdout = original_stdout
-    
+
+    results = None
+    if not args.no_server:
+        try:
+            results = query_server(args.query, host=args.host, port=args.port, filters=args.filters)
+        except ValueError as e:
+            print(f"  [ERROR] Invalid search filters: {e}", file=sys.stderr)
+            print(json.dumps([]))
+            sys.exit(1)
+
+    if results is None:
+        # Save original stdout
+        original_stdout = sys.stdout
+
+        # Redirect stdout to stderr for all print statements from imported modules
+        sys.stdout = sys.stderr
+
+        try:
+            # Import and run search with stdout redirected to stderr
+            results = run_search(args.query, filters=args.filters)
+        except ValueError as e:
+            print(f"  [ERROR] Invalid search filters: {e}")
+            results = []
+        finally:
+            # Restore original stdout for JSON output
+            sys.stdout = original_stdout
+
     # Output only JSON to stdout
     print(json.dumps(results))
 
 if __name__ == "__main__":
     main()
-
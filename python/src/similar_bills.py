@@ -0,0 +1,371 @@
+"""
+Precomputed "more like this" neighbours of every bill:
+- An offline job reads every stored bill embedding and computes each bill's top-k most
+  similar bills with blocked NumPy matrix multiplication (one block of rows at a time)
+- The neighbour table is saved as one .npz file (and optionally to the bill_neighbors table),
+  so similar_bills(bill_id, k) is a dictionary lookup with no query encoding or vector search
+- Incremental ingests refresh only the rows affected by new, changed and removed bills
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from vectors import MILVUS_COLLECTION_NAME, python_dir
+
+SIMILAR_BILLS_PATH = os.getenv(
+    "SIMILAR_BILLS_PATH",
+    str(python_dir / ".cache" / f"{MILVUS_COLLECTION_NAME}.neighbors.npz"),
+)
+SIMILAR_BILLS_K = int(os.getenv("SIMILAR_BILLS_K", "20"))  # Neighbours stored per bill
+SIMILAR_BILLS_BLOCK_SIZE = int(os.getenv("SIMILAR_BILLS_BLOCK_SIZE", "512"))  # Rows per matmul block
+# Also write refreshed rows to the bill_neighbors table (see db/schema.sql)
+SIMILAR_BILLS_DATABASE = os.getenv("SIMILAR_BILLS_DATABASE", "false").lower() in ("1", "true", "yes")
+# Incremental refreshes touching more than this fraction of bills rebuild the whole graph
+SIMILAR_BILLS_FULL_REBUILD_FRACTION = 0.25
+
+
+def top_k_neighbors(
+    matrix: np.ndarray,
+    k: int,
+    rows: Optional[np.ndarray] = None,
+    block_size: int = SIMILAR_BILLS_BLOCK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k cosine neighbours of rows of a normalized matrix, excluding each row itself.
+
+    Similarities are computed block_size rows at a time, so memory stays at
+    block_size x len(matrix) scores whatever the number of bills.
+
+    Returns:
+        (neighbor rows, scores), each of shape (len(rows), min(k, len(matrix) - 1)), best first
+    """
+    rows = np.arange(len(matrix)) if rows is None else np.asarray(rows, dtype=np.int64)
+    k = max(min(k, len(matrix) - 1), 0)
+    neighbors = np.zeros((len(rows), k), dtype=np.int32)
+    scores = np.zeros((len(rows), k), dtype=np.float32)
+    if k == 0:
+        return neighbors, scores
+
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        sims = matrix[block_rows] @ matrix.T
+        sims[np.arange(len(block_rows)), block_rows] = -np.inf
+        # Unordered top-k per row, then sort just those k
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        neighbors[start:start + len(block_rows)] = np.take_along_axis(top, order, axis=1)
+        scores[start:start + len(block_rows)] = np.take_along_axis(top_scores, order, axis=1)
+    return neighbors, scores
+
+
+class NeighborGraph:
+    """A loaded neighbour table: bill_ids plus (n, k) neighbour rows and scores"""
+
+    def __init__(self, bill_ids: List[str], neighbors: np.ndarray, scores: np.ndarray, k: int):
+        self.bill_ids = bill_ids
+        self.neighbors = neighbors
+        self.scores = scores
+        self.k = k
+        self.rows = {bill_id: row for row, bill_id in enumerate(bill_ids)}
+
+    @classmethod
+    def load(cls, path: str = SIMILAR_BILLS_PATH) -> "NeighborGraph":
+        with np.load(path) as data:
+            return cls(data["bill_ids"].tolist(), data["neighbors"], data["scores"], int(data["k"]))
+
+    def save(self, path: str = SIMILAR_BILLS_PATH) -> bool:
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    bill_ids=np.array(self.bill_ids, dtype=str),
+                    neighbors=self.neighbors,
+                    scores=self.scores,
+                    k=np.array(self.k),
+                )
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            print(f"  [ERROR] Failed to write neighbour graph: {e}")
+            return False
+
+    def lookup(self, bill_id: str, k: int) -> Optional[List[Dict[str, Any]]]:
+        """Top-k neighbours of a bill (best first), or None if the bill is not in the graph"""
+        row = self.rows.get(bill_id)
+        if row is None:
+            return None
+        # A negative k would slice from the end of the row
+        k = max(0, min(k, self.neighbors.shape[1]))
+        return [
+            {"bill_id": self.bill_ids[neighbor], "score": float(score)}
+            for neighbor, score in zip(self.neighbors[row, :k], self.scores[row, :k])
+        ]
+
+    def neighbor_ids(self, bill_id: str) -> List[str]:
+        row = self.rows[bill_id]
+        return [self.bill_ids[neighbor] for neighbor in self.neighbors[row]]
+
+
+def _load_embeddings(store) -> Tuple[List[str], np.ndarray]:
+    """All bill embeddings of a store as (bill_ids, normalized float32 matrix)"""
+    from vector_store import normalize_matrix
+
+    bill_ids, matrix = store.fetch_all()
+    return bill_ids, normalize_matrix(np.asarray(matrix, dtype=np.float32))
+
+
+def build_neighbor_graph(store=None, k: int = SIMILAR_BILLS_K, path: str = SIMILAR_BILLS_PATH) -> Optional[NeighborGraph]:
+    """
+    Compute the top-k neighbours of every bill in the vector store and save them to path.
+
+    Returns:
+        The new graph, or None if there were no embeddings or it could not be saved
+    """
+    from vector_store import get_vector_store
+
+    store = store or get_vector_store()
+    print(f"Reading embeddings from the {store.name} vector store...")
+    bill_ids, matrix = _load_embeddings(store)
+    if not bill_ids:
+        print("  No embeddings found, run vectors.py first")
+        return None
+
+    print(f"  Computing top-{k} neighbours of {len(bill_ids)} bills in blocks of {SIMILAR_BILLS_BLOCK_SIZE}...")
+    neighbors, scores = top_k_neighbors(matrix, k)
+    graph = NeighborGraph(bill_ids, neighbors, scores, k)
+    if not graph.save(path):
+        return None
+    print(f"  Neighbour graph: {len(bill_ids)} bills x {neighbors.shape[1]} neighbours")
+    if SIMILAR_BILLS_DATABASE:
+        save_neighbors_to_database(graph)
+    return graph
+
+
+def refresh_neighbor_graph(
+    changed_ids: List[str],
+    removed_ids: List[str],
+    store=None,
+    k: int = SIMILAR_BILLS_K,
+    path: str = SIMILAR_BILLS_PATH,
+) -> Optional[NeighborGraph]:
+    """
+    Update the saved graph after new/changed bills (changed_ids) and removed bills.
+
+    Rows of changed bills, and rows whose neighbour list contains a changed or removed bill,
+    are recomputed. Every other row keeps its neighbours and only merges in its scores
+    against the changed bills, which is exact: its other candidates' scores did not change.
+    Falls back to a full build when there is no usable graph yet or most rows are affected.
+
+    Returns:
+        The updated graph, or None if it could not be built
+    """
+    from vector_store import get_vector_store
+
+    try:
+        graph = NeighborGraph.load(path)
+    except (OSError, ValueError, KeyError):
+        graph = None
+    if graph is None or graph.k != k:
+        return build_neighbor_graph(store, k, path)
+
+    store = store or get_vector_store()
+    bill_ids, matrix = _load_embeddings(store)
+    if not bill_ids:
+        return None
+    rows = {bill_id: row for row, bill_id in enumerate(bill_ids)}
+    stale = set(changed_ids) | set(removed_ids) | {bill_id for bill_id in bill_ids if bill_id not in graph.rows}
+    dirty_rows = np.array(sorted(rows[bill_id] for bill_id in stale if bill_id in rows), dtype=np.int64)
+    if len(dirty_rows) == 0 and not removed_ids:
+        print("  Neighbour graph is up to date")
+        return graph
+
+    k_eff = max(min(k, len(bill_ids) - 1), 0)
+    recompute = np.zeros(len(bill_ids), dtype=bool)
+    recompute[dirty_rows] = True
+    for row, bill_id in enumerate(bill_ids):
+        if recompute[row]:
+            continue
+        old_neighbors = graph.neighbor_ids(bill_id)
+        # A stale neighbour's score may have dropped, and a short list (few bills) may now grow
+        if len(old_neighbors) != k_eff or any(neighbor in stale for neighbor in old_neighbors):
+            recompute[row] = True
+    if recompute.sum() > SIMILAR_BILLS_FULL_REBUILD_FRACTION * len(bill_ids):
+        print(f"  {int(recompute.sum())} of {len(bill_ids)} neighbour rows affected, rebuilding the graph")
+        return build_neighbor_graph(store, k, path)
+
+    neighbors = np.zeros((len(bill_ids), k_eff), dtype=np.int32)
+    scores = np.zeros((len(bill_ids), k_eff), dtype=np.float32)
+    recompute_rows = np.flatnonzero(recompute)
+    neighbors[recompute_rows], scores[recompute_rows] = top_k_neighbors(matrix, k, recompute_rows)
+
+    # Kept rows: old neighbours (mapped to new rows) merged with the changed bills' scores
+    kept_rows = np.flatnonzero(~recompute)
+    for start in range(0, len(kept_rows), SIMILAR_BILLS_BLOCK_SIZE):
+        block_rows = kept_rows[start:start + SIMILAR_BILLS_BLOCK_SIZE]
+        old = np.array(
+            [[rows[neighbor] for neighbor in graph.neighbor_ids(bill_ids[row])] for row in block_rows],
+            dtype=np.int32,
+        ).reshape(len(block_rows), k_eff)
+        old_scores = np.stack([graph.scores[graph.rows[bill_ids[row]]] for row in block_rows])
+        candidates = np.hstack([old, np.broadcast_to(dirty_rows, (len(block_rows), len(dirty_rows)))])
+        candidate_scores = np.hstack([old_scores, matrix[block_rows] @ matrix[dirty_rows].T])
+        order = np.argsort(-candidate_scores, axis=1)[:, :k_eff]
+        neighbors[block_rows] = np.take_along_axis(candidates, order, axis=1)
+        scores[block_rows] = np.take_along_axis(candidate_scores, order, axis=1)
+
+    updated = NeighborGraph(bill_ids, neighbors, scores, k)
+    if not updated.save(path):
+        return None
+    changed_rows = [
+        bill_id for bill_id in bill_ids
+        if bill_id not in graph.rows or updated.neighbor_ids(bill_id) != graph.neighbor_ids(bill_id)
+    ]
+    print(f"  Neighbour graph: recomputed {len(recompute_rows)} rows, {len(changed_rows)} rows changed")
+    if SIMILAR_BILLS_DATABASE:
+        save_neighbors_to_database(updated, changed_rows)
+    return updated
+
+
+def save_neighbors_to_database(graph: NeighborGraph, bill_ids: Optional[List[str]] = None, chunk_size: int = 500) -> int:
+    """
+    Upsert neighbour rows into the bill_neighbors table (rows of removed bills are dropped
+    by its ON DELETE CASCADE foreign key).
+
+    Args:
+        graph: Neighbour graph to write
+        bill_ids: Rows to write (default: every bill in the graph)
+        chunk_size: Rows per statement or request (default: 500)
+
+    Returns:
+        Number of rows written
+    """
+    from db import get_pg_pool, get_supabase_client
+
+    bill_ids = graph.bill_ids if bill_ids is None else bill_ids
+    if not bill_ids:
+        return 0
+    rows = [(bill_id, graph.neighbor_ids(bill_id), graph.scores[graph.rows[bill_id]].tolist()) for bill_id in bill_ids]
+
+    pool = get_pg_pool()
+    if pool is not None:
+        try:
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    for chunk_start in range(0, len(rows), chunk_size):
+                        chunk = rows[chunk_start:chunk_start + chunk_size]
+                        values = ", ".join(["(%s, %s::text[], %s::real[], NOW())"] * len(chunk))
+                        cur.execute(
+                            f"INSERT INTO bill_neighbors (bill_id, neighbor_ids, scores, updated_at) "
+                            f"VALUES {values} ON CONFLICT (bill_id) DO UPDATE SET "
+                            f"neighbor_ids = EXCLUDED.neighbor_ids, scores = EXCLUDED.scores, "
+                            f"updated_at = EXCLUDED.updated_at",
+                            [value for row in chunk for value in row],
+                        )
+            print(f"  Wrote {len(rows)} rows to bill_neighbors")
+            return len(rows)
+        except Exception as e:
+            print(f"  [WARNING] PostgreSQL neighbour upsert failed, falling back to Supabase: {e}")
+
+    supabase = get_supabase_client()
+    if supabase is None:
+        print(f"  [MOCK] Would write {len(rows)} rows to bill_neighbors")
+        return 0
+
+    written = 0
+    for chunk_start in range(0, len(rows), chunk_size):
+        chunk = rows[chunk_start:chunk_start + chunk_size]
+        try:
+            supabase.table("bill_neighbors").upsert([
+                {"bill_id": bill_id, "neighbor_ids": neighbor_ids, "scores": row_scores}
+                for bill_id, neighbor_ids, row_scores in chunk
+            ]).execute()
+            written += len(chunk)
+        except Exception as e:
+            print(f"  [ERROR] Failed to write {len(chunk)} rows to bill_neighbors: {e}")
+    print(f"  Wrote {written} rows to bill_neighbors")
+    return written
+
+
+# Shared graph for the lookup path, reloaded when the file is rewritten
+_neighbor_graph: Optional[NeighborGraph] = None
+_neighbor_graph_mtime: Optional[float] = None
+_neighbor_graph_lock = threading.Lock()
+
+
+def get_neighbor_graph() -> Optional[NeighborGraph]:
+    """Get the loaded neighbour graph, or None if it has not been built"""
+    global _neighbor_graph, _neighbor_graph_mtime
+    try:
+        mtime = os.path.getmtime(SIMILAR_BILLS_PATH)
+    except OSError:
+        return None
+    with _neighbor_graph_lock:
+        if _neighbor_graph is None or mtime != _neighbor_graph_mtime:
+            try:
+                _neighbor_graph = NeighborGraph.load(SIMILAR_BILLS_PATH)
+                _neighbor_graph_mtime = mtime
+            except (OSError, ValueError, KeyError) as e:
+                print(f"  [ERROR] Failed to load neighbour graph from {SIMILAR_BILLS_PATH}: {e}")
+                return None
+        return _neighbor_graph
+
+
+def similar_bills(bill_id: str, k: int = 10) -> List[Dict[str, Any]]:
+    """
+    Bills most similar to a bill, from the precomputed neighbour graph.
+
+    Args:
+        bill_id: Bill to find neighbours of
+        k: Number of neighbours (at most SIMILAR_BILLS_K)
+
+    Returns:
+        List of {"bill_id", "score"} dicts, best first (empty if the bill or graph is missing)
+    """
+    graph = get_neighbor_graph()
+    if graph is None:
+        print("  [WARNING] Neighbour graph not built yet, run: python src/similar_bills.py --build")
+        return []
+    if k > graph.k:
+        print(f"  [INFO] Neighbour graph stores {graph.k} neighbours per bill, returning {graph.k}")
+    results = graph.lookup(bill_id, k)
+    if results is None:
+        print(f"  [INFO] Bill {bill_id} is not in the neighbour graph")
+        return []
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query the precomputed similar-bills graph")
+    parser.add_argument("--build", action="store_true", help="Recompute the neighbours of every bill")
+    parser.add_argument("--k", type=int, default=SIMILAR_BILLS_K, help=f"Neighbours stored per bill (default: {SIMILAR_BILLS_K})")
+    parser.add_argument("--backend", choices=("milvus", "local"), help="Vector store to read embeddings from")
+    parser.add_argument("--to-database", action="store_true", help="Also write every row to the bill_neighbors table")
+    parser.add_argument("--bill", help="Print the neighbours of a bill")
+
+    args = parser.parse_args()
+
+    if args.build:
+        from vector_store import get_vector_store
+
+        graph = build_neighbor_graph(get_vector_store(args.backend), args.k)
+        if graph is None:
+            sys.exit(1)
+        if args.to_database and not SIMILAR_BILLS_DATABASE:
+            save_neighbors_to_database(graph)
+
+    if args.bill:
+        for result in similar_bills(args.bill, args.k):
+            print(f"{result['score']:.4f}  {result['bill_id']}")
@@ -0,0 +1,269 @@
+"""
+Nightly materialized feed recommendations for every user:
+- Each user's profile vector is built from the stored embeddings of their endorsed bills,
+  minus their opposed bills, plus a centroid per followed topic (the mean embedding of the
+  bills classified into it), so no model is loaded
+- Profiles are scored against the whole bill matrix one block of users at a time
+  (one matrix multiply per block)
+- The top-N unseen bills per user are written to user_feed_recommendations, so a feed page
+  load is one indexed read instead of per-topic queries or live vector math
+
+Run nightly after ingestion, e.g. from cron:
+    0 4 * * * cd /path/to/python && python src/user_feeds.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from db import fetch_all_rows, get_pg_pool, get_supabase_client
+
+USER_FEED_SIZE = int(os.getenv("USER_FEED_SIZE", "50"))  # Bills stored per user
+USER_FEED_BLOCK_SIZE = int(os.getenv("USER_FEED_BLOCK_SIZE", "256"))  # Users per matrix multiply
+# Profile weights: endorsed bills count +1 each, opposed bills -USER_FEED_OPPOSE_WEIGHT,
+# and each followed topic centroid +USER_FEED_TOPIC_WEIGHT
+USER_FEED_OPPOSE_WEIGHT = float(os.getenv("USER_FEED_OPPOSE_WEIGHT", "0.5"))
+USER_FEED_TOPIC_WEIGHT = float(os.getenv("USER_FEED_TOPIC_WEIGHT", "1.0"))
+
+
+def get_topic_centroids(bill_rows: Dict[str, int], matrix: np.ndarray, metadata: Dict[str, Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Normalized mean embedding of the bills in each category (from the stored categories field)"""
+    from vector_store import normalize_matrix
+
+    members: Dict[str, List[int]] = {}
+    for bill_id, values in metadata.items():
+        row = bill_rows.get(bill_id)
+        if row is None:
+            continue
+        for category in values.get("categories") or []:
+            members.setdefault(category, []).append(row)
+    if not members:
+        return {}
+    topics = sorted(members)
+    centroids = normalize_matrix(np.stack([matrix[members[topic]].mean(axis=0) for topic in topics]))
+    return dict(zip(topics, centroids))
+
+
+def build_user_profiles(
+    users: List[Dict[str, Any]],
+    saved_bills: List[Dict[str, Any]],
+    bill_rows: Dict[str, int],
+    matrix: np.ndarray,
+    topic_centroids: Dict[str, np.ndarray],
+) -> Tuple[List[str], np.ndarray, List[List[int]]]:
+    """
+    Profile vectors of the users with at least one endorsement, opposition or known topic.
+
+    Returns:
+        (user_ids, normalized profile matrix, rows of the bills each user already saved)
+    """
+    from vector_store import normalize_matrix
+
+    opinions: Dict[str, List[Tuple[int, bool]]] = {}
+    for saved in saved_bills:
+        row = bill_rows.get(saved.get("bill_id"))
+        if row is not None:
+            opinions.setdefault(str(saved["user_id"]), []).append((row, bool(saved.get("endorsed", True))))
+
+    user_ids, profiles, seen = [], [], []
+    for user in users:
+        user_id = str(user["id"])
+        user_opinions = opinions.get(user_id, [])
+        topics = [topic_centroids[topic] for topic in user.get("topics") or [] if topic in topic_centroids]
+        if not user_opinions and not topics:
+            continue
+        profile = np.zeros(matrix.shape[1], dtype=np.float32)
+        for row, endorsed in user_opinions:
+            profile += matrix[row] if endorsed else -USER_FEED_OPPOSE_WEIGHT * matrix[row]
+        for centroid in topics:
+            profile += USER_FEED_TOPIC_WEIGHT * centroid
+        user_ids.append(user_id)
+        profiles.append(profile)
+        seen.append([row for row, _ in user_opinions])
+
+    if not profiles:
+        return [], np.zeros((0, matrix.shape[1]), dtype=np.float32), []
+    return user_ids, normalize_matrix(np.stack(profiles)), seen
+
+
+def score_user_block(
+    profiles: np.ndarray,
+    seen: List[List[int]],
+    matrix: np.ndarray,
+    top_n: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-N bills for a block of profiles, skipping bills each user already saved.
+
+    Returns:
+        (bill rows, scores), each of shape (len(profiles), <= top_n), best first
+    """
+    scores = profiles @ matrix.T
+    for i, rows in enumerate(seen):
+        scores[i, rows] = -np.inf
+    n = min(top_n, matrix.shape[0])
+    if n == 0:
+        return np.zeros((len(profiles), 0), dtype=np.int64), np.zeros((len(profiles), 0), dtype=np.float32)
+    # Unordered top-N per user, then sort just those N
+    top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def write_user_feeds(
+    feeds: Dict[str, List[Tuple[str, float]]],
+    chunk_size: int = 1000,
+    id_chunk_size: int = 200,
+) -> int:
+    """
+    Replace the stored recommendations of the given users (an empty list clears a user's feed).
+
+    Args:
+        feeds: Mapping of user_id -> [(bill_id, score)], best first
+        chunk_size: Rows per insert statement or request (default: 1000)
+        id_chunk_size: Users per Supabase delete request (default: 200)
+
+    Returns:
+        Number of recommendation rows written
+    """
+    if not feeds:
+        return 0
+    user_ids = list(feeds)
+    rows = [
+        (user_id, rank, bill_id, score)
+        for user_id in user_ids
+        for rank, (bill_id, score) in enumerate(feeds[user_id], 1)
+    ]
+
+    pool = get_pg_pool()
+    if pool is not None:
+        try:
+            # One transaction, so readers see either the old or the new feed of each user
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM user_feed_recommendations WHERE user_id = ANY(%s::uuid[])", (user_ids,))
+                    for chunk_start in range(0, len(rows), chunk_size):
+                        chunk = rows[chunk_start:chunk_start + chunk_size]
+                        values = ", ".join(["(%s::uuid, %s, %s, %s)"] * len(chunk))
+                        cur.execute(
+                            f"INSERT INTO user_feed_recommendations (user_id, rank, bill_id, score) VALUES {values}",
+                            [value for row in chunk for value in row],
+                        )
+            return len(rows)
+        except Exception as e:
+            print(f"  [WARNING] PostgreSQL feed write failed, falling back to Supabase: {e}")
+
+    supabase = get_supabase_client()
+    if supabase is None:
+        print(f"  [MOCK] Would write {len(rows)} feed recommendations for {len(user_ids)} users")
+        return 0
+
+    # Replace feeds id_chunk_size users at a time: long `in` filters exceed URL limits
+    written = 0
+    for chunk_start in range(0, len(user_ids), id_chunk_size):
+        chunk_ids = user_ids[chunk_start:chunk_start + id_chunk_size]
+        try:
+            supabase.table("user_feed_recommendations").delete().in_("user_id", chunk_ids).execute()
+        except Exception as e:
+            print(f"  [ERROR] Failed to clear feeds of {len(chunk_ids)} users: {e}")
+            continue
+        chunk_rows = [
+            {"user_id": user_id, "rank": rank, "bill_id": bill_id, "score": score}
+            for user_id in chunk_ids
+            for rank, (bill_id, score) in enumerate(feeds[user_id], 1)
+        ]
+        for row_start in range(0, len(chunk_rows), chunk_size):
+            batch = chunk_rows[row_start:row_start + chunk_size]
+            try:
+                supabase.table("user_feed_recommendations").insert(batch).execute()
+                written += len(batch)
+            except Exception as e:
+                print(f"  [ERROR] Failed to write {len(batch)} feed recommendations: {e}")
+    return written
+
+
+def build_user_feeds(store=None, top_n: int = USER_FEED_SIZE, user_id: Optional[str] = None, dry_run: bool = False) -> bool:
+    """
+    Recompute and store the feed recommendations of every user (or one user).
+
+    Args:
+        store: Vector store to read bill embeddings from (default: the VECTOR_BACKEND store)
+        top_n: Bills stored per user (default: USER_FEED_SIZE)
+        user_id: Only rebuild this user's feed
+        dry_run: Print the first feeds instead of writing them
+
+    Returns:
+        True if feeds were computed
+    """
+    from vector_store import get_vector_store, normalize_matrix
+
+    store = store or get_vector_store()
+    start_time = time.perf_counter()
+
+    print(f"Reading bill embeddings from the {store.name} vector store...")
+    bill_ids, matrix = store.fetch_all()
+    if not bill_ids:
+        print("  No embeddings found, run vectors.py first")
+        return False
+    matrix = normalize_matrix(np.asarray(matrix, dtype=np.float32))
+    bill_rows = {bill_id: row for row, bill_id in enumerate(bill_ids)}
+    topic_centroids = get_topic_centroids(bill_rows, matrix, store.get_metadata())
+    print(f"  {len(bill_ids)} bills, {len(topic_centroids)} topic centroids")
+
+    print("Fetching users and saved bills...")
+    users = fetch_all_rows("users", "id, topics")
+    saved_bills = fetch_all_rows("saved_bills", "id, user_id, bill_id, endorsed")
+    if user_id is not None:
+        users = [user for user in users if str(user["id"]) == user_id]
+        saved_bills = [saved for saved in saved_bills if str(saved["user_id"]) == user_id]
+    if not users:
+        print("  No users found")
+        return False
+
+    profile_ids, profiles, seen = build_user_profiles(users, saved_bills, bill_rows, matrix, topic_centroids)
+    print(f"  {len(profile_ids)} of {len(users)} users have a profile")
+
+    # Users without any signal get an empty feed, so stale recommendations do not linger
+    feeds: Dict[str, List[Tuple[str, float]]] = {str(user["id"]): [] for user in users}
+    for block_start in range(0, len(profile_ids), USER_FEED_BLOCK_SIZE):
+        block = slice(block_start, block_start + USER_FEED_BLOCK_SIZE)
+        top_rows, top_scores = score_user_block(profiles[block], seen[block], matrix, top_n)
+        for block_user, rows, row_scores in zip(profile_ids[block], top_rows, top_scores):
+            feeds[block_user] = [
+                (bill_ids[row], float(score)) for row, score in zip(rows, row_scores) if np.isfinite(score)
+            ]
+
+    if dry_run:
+        for shown_user, feed in list(feeds.items())[:5]:
+            print(f"  {shown_user}: {[bill_id for bill_id, _ in feed[:10]]}")
+        return True
+
+    written = write_user_feeds(feeds)
+    elapsed = time.perf_counter() - start_time
+    print(f"  Wrote {written} recommendations for {len(feeds)} users ({elapsed:.1f}s)")
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the materialized per-user feed recommendations")
+    parser.add_argument("--top-n", type=int, default=USER_FEED_SIZE, help=f"Bills stored per user (default: {USER_FEED_SIZE})")
+    parser.add_argument("--user", help="Only rebuild this user's feed")
+    parser.add_argument("--backend", choices=("milvus", "local"), help="Vector store to read embeddings from")
+    parser.add_argument("--dry-run", action="store_true", help="Print sample feeds instead of writing them")
+
+    args = parser.parse_args()
+
+    from vector_store import get_vector_store
+
+    if not build_user_feeds(get_vector_store(args.backend), args.top_n, args.user, args.dry_run):
+        sys.exit(1)
@@ -1,21 +1,211 @@
 """
 Vector search functionality for bills.
-Provides semantic search capabilities using Milvus vector database.
+Provides semantic search capabilities over the configured vector store
+(Milvus, or the local in-process store; see vector_store.py).
 """
 
+import json
+import os
 import time
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from cache import EmbeddingCache, LRUCache, normalize_query
 
 # Import shared functions and config from vectors.py
 from vectors import (
-    generate_embedding,
-    get_milvus_collection,
+    generate_embeddings,
+    get_collection_version,
+    normalize_filters,
+    EMBED_MODEL_ID,
     SUPABASE_URL,
     SUPABASE_SERVICE_ROLE_KEY,
 )
+from vector_store import get_vector_store
+from lexical_index import get_lexical_index
+
+# Query embedding cache: in-memory LRU, optionally persisted to a SQLite file
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_EMBEDDING_CACHE_PATH = os.getenv("QUERY_EMBEDDING_CACHE_PATH")
+
+# Search result cache: LRU with TTL, keyed by (query, top_k, metric, filters, collection version)
+SEARCH_RESULT_CACHE_SIZE = int(os.getenv("SEARCH_RESULT_CACHE_SIZE", "512"))
+SEARCH_RESULT_CACHE_TTL = float(os.getenv("SEARCH_RESULT_CACHE_TTL", "300"))
+
+# Passage search: match queries against bill passages (see vectors.py --passages) and score
+# each bill by its best passage; PASSAGE_SEARCH_OVERFETCH passages are fetched per result slot
+PASSAGE_SEARCH = os.getenv("PASSAGE_SEARCH", "false").lower() in ("1", "true", "yes")
+PASSAGE_SEARCH_OVERFETCH = int(os.getenv("PASSAGE_SEARCH_OVERFETCH", "4"))
+
+# Hybrid search: BM25 (lexical_index.py) and vector retrieval run in parallel and are merged
+# with reciprocal rank fusion; each side contributes HYBRID_CANDIDATES_FACTOR * top_k candidates
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "false").lower() in ("1", "true", "yes")
+HYBRID_CANDIDATES_FACTOR = int(os.getenv("HYBRID_CANDIDATES_FACTOR", "2"))
+RRF_K = int(os.getenv("RRF_K", "60"))
 
+SIMILARITY_THRESHOLD = 0.4  # Minimum vector similarity score to include
 
-def search_bills(query: str, top_k: int = 10, metric: str = "L2") -> List[Dict[str, Any]]:
+_query_embedding_cache = EmbeddingCache(QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_PATH)
+_search_result_cache = LRUCache(SEARCH_RESULT_CACHE_SIZE, ttl_seconds=SEARCH_RESULT_CACHE_TTL)
+# Runs the lexical side of hybrid searches next to the vector side
+_hybrid_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-search")
+
+
+def get_query_embeddings(queries: List[str]) -> List[Optional[List[float]]]:
+    """
+    Embed search queries, reusing cached embeddings for repeated queries.
+    
+    Queries missing from the cache are encoded together in one model.encode call, once per
+    distinct normalized query (the cache key), and the result is shared by every position.
+    
+    Returns:
+        One embedding per query (None where encoding failed)
+    """
+    embeddings = [_query_embedding_cache.get(query, EMBED_MODEL_ID) for query in queries]
+    # Normalized query -> positions that need it
+    missing: Dict[str, List[int]] = {}
+    for i, embedding in enumerate(embeddings):
+        if embedding is None:
+            missing.setdefault(normalize_query(queries[i]), []).append(i)
+    if not missing:
+        return embeddings
+
+    positions = list(missing.values())
+    new_embeddings = generate_embeddings([queries[indices[0]] for indices in positions])
+    if len(new_embeddings) != len(positions):
+        return embeddings
+    for indices, embedding in zip(positions, new_embeddings):
+        _query_embedding_cache.set(queries[indices[0]], EMBED_MODEL_ID, embedding)
+        for i in indices:
+            embeddings[i] = embedding
+    return embeddings
+
+
+def get_query_embedding(query: str) -> Optional[List[float]]:
+    """Embed a search query, reusing cached embeddings for repeated queries"""
+    return get_query_embeddings([query])[0]
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the search caches"""
+    return {
+        "query_embeddings": _query_embedding_cache.stats(),
+        "search_results": _search_result_cache.stats(),
+    }
+
+
+def aggregate_passage_hits(hits: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """Collapse passage hits (best first) to one result per bill scored by its best passage (max-sim)"""
+    best: Dict[str, Dict[str, Any]] = {}
+    for hit in hits:
+        if hit["bill_id"] not in best:
+            best[hit["bill_id"]] = hit
+            if len(best) == top_k:
+                break
+    return list(best.values())
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: List[List[Dict[str, Any]]],
+    top_k: int,
+    k: int = RRF_K,
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal rank fusion (sum of 1 / (k + rank) per list).
+
+    The fused score goes in rrf_score, divided by the best possible fused score, so a bill
+    ranked first by every retriever scores 1.0. distance and score keep the vector side's
+    values (0.0 when only the lexical side found the bill).
+    """
+    fused: Dict[str, float] = {}
+    vector_hits: Dict[str, Dict[str, Any]] = {}
+    for ranked in ranked_lists:
+        for rank, result in enumerate(ranked, 1):
+            fused[result["bill_id"]] = fused.get(result["bill_id"], 0.0) + 1 / (k + rank)
+            if "distance" in result:
+                vector_hits.setdefault(result["bill_id"], result)
+    best_possible = len(ranked_lists) / (k + 1)
+    ordered = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return [
+        {
+            "bill_id": bill_id,
+            "distance": vector_hits.get(bill_id, {}).get("distance", 0.0),
+            "score": vector_hits.get(bill_id, {}).get("score", 0.0),
+            "rrf_score": rrf_score / best_possible,
+        }
+        for bill_id, rrf_score in ordered
+    ]
+
+
+def lexical_shortcut(lexical_index, query: str, top_k: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Answer queries that need no semantic search from the lexical index alone:
+    exact bill IDs ("H.R. 1234") and quoted keyword queries ('"clean water act"').
+
+    No vector similarity is computed, so score is 0.0; rrf_score ranks the results
+    (1.0 for exact bill IDs, BM25 relative to the best hit for quoted queries).
+
+    Returns:
+        Results, or None if the query should go through the regular search
+    """
+    bill_ids = lexical_index.lookup_bill_id(query)
+    if bill_ids:
+        return [{"bill_id": bill_id, "distance": 0.0, "score": 0.0, "rrf_score": 1.0} for bill_id in bill_ids[:top_k]]
+
+    stripped = query.strip()
+    if len(stripped) > 2 and stripped[0] == stripped[-1] == '"':
+        hits = lexical_index.search(stripped[1:-1], top_k)
+        if not hits:
+            return None
+        best = hits[0]["score"]
+        return [
+            {"bill_id": hit["bill_id"], "distance": 0.0, "score": 0.0, "rrf_score": hit["score"] / best}
+            for hit in hits
+        ]
+    return None
+
+
+def _vector_search(
+    queries: List[str],
+    top_k: int,
+    metric: str,
+    passages: bool,
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    Embed queries and search the vector store (restricted to bills matching normalized filters).
+
+    Returns:
+        One result list per query (None where the embedding or the search failed)
+    """
+    query_embeddings = get_query_embeddings(queries)
+    embedded = [i for i, embedding in enumerate(query_embeddings) if embedding is not None]
+    if len(embedded) < len(queries):
+        print(f"  [ERROR] Failed to generate embeddings for {len(queries) - len(embedded)} queries")
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+    if not embedded:
+        return results
+
+    store = get_vector_store(passages=passages)
+    # Several passages of one bill can match, so fetch extra hits before collapsing them
+    limit = min(top_k * PASSAGE_SEARCH_OVERFETCH, 16384) if passages else top_k
+    hits_per_query = store.search(
+        [query_embeddings[i] for i in embedded], limit, metric.upper(), SIMILARITY_THRESHOLD, filters
+    )
+    if hits_per_query is None:
+        print(f"  [ERROR] Vector store '{store.name}' is not available")
+        return results
+    for i, hits in zip(embedded, hits_per_query):
+        results[i] = aggregate_passage_hits(hits, top_k) if passages else hits
+    return results
+
+
+def search_bills(
+    query: str,
+    top_k: int = 10,
+    metric: str = "L2",
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
     """
     Search for bills using vector similarity search.
     
@@ -23,126 +213,153 @@ def search_bills(query: str, top_k: int = 10, metric: str = "L2") -> List[Dict[s
         query: User query text to search for
         top_k: Number of top results to return (default: 10)
         metric: Similarity metric to use - "L2", "COSINE", or "IP" (default: "L2")
+        filters: Optional metadata filters (see search_bills_batch)
     
     Returns:
         List of dictionaries containing bill_id and distance/score for each result
     """
+    print(f"Searching for: '{query}'")
+    return search_bills_batch([query], top_k, metric=metric, filters=filters)[0]
+
+
+def search_bills_batch(
+    queries: List[str],
+    top_k: int = 10,
+    metric: str = "L2",
+    passages: bool = PASSAGE_SEARCH,
+    hybrid: bool = HYBRID_SEARCH,
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search for bills for many queries at once.
+    
+    All uncached queries are encoded in one model.encode call and sent to the vector
+    store as one multi-vector search request. In hybrid mode the BM25 lexical index is
+    searched in parallel and both rankings are merged with reciprocal rank fusion; exact
+    bill IDs and quoted keyword queries are answered by the lexical index alone.
+    
+    Filters restrict results to bills whose stored metadata matches, inside the vector
+    search itself, so top_k results are returned even when few bills match. The lexical
+    index holds no metadata, so filtered searches use the vector ranking only.
+    
+    Args:
+        queries: User query texts to search for
+        top_k: Number of top results to return per query (default: 10)
+        metric: Similarity metric to use - "L2", "COSINE", or "IP" (default: "L2")
+        passages: Search the passage store and rank bills by their best passage (default: PASSAGE_SEARCH)
+        hybrid: Fuse BM25 lexical results with the vector results (default: HYBRID_SEARCH)
+        filters: Optional dict with categories / origin / status (any of the given values)
+            and date_from / date_to ("YYYY-MM-DD", inclusive)
+    
+    Returns:
+        One result list per query, each in the same shape as search_bills
+    
+    Raises:
+        ValueError: On invalid filters
+    """
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+    filters = normalize_filters(filters)
+    if filters:
+        hybrid = False
+    
+    # Serve repeated queries from the result cache; the collection version in the key
+    # changes whenever ingestion writes vectors, so stale results are never returned
+    version = get_collection_version()
+    filter_key = json.dumps(filters, sort_keys=True)
+    cache_keys = [
+        (normalize_query(query), top_k, metric.upper(), passages, hybrid, filter_key, version)
+        for query in queries
+    ]
+    for i, cache_key in enumerate(cache_keys):
+        cached_results = _search_result_cache.get(cache_key)
+        if cached_results is not None:
+            results[i] = [dict(result) for result in cached_results]
+    
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+    
     try:
-        # Generate embedding for the query
-        print(f"Searching for: '{query}'")
-        query_embedding = generate_embedding(query)
-        
-        if query_embedding is None:
-            print("  [ERROR] Failed to generate embedding for query")
-            return []
-        
-        # Get Milvus collection
-        collection = get_milvus_collection()
-        if collection is None:
-            return []
-        
-        # Get the index metric type (must match for search)
-        index_metric = "L2"  # Default
-        try:
-            indexes = collection.indexes
-            if indexes and len(indexes) > 0:
-                # Get the metric type from the first index on the embedding field
-                for idx in indexes:
-                    if idx.field_name == "embedding":
-                        index_metric = idx.params.get("metric_type", "L2")
-                        break
-        except Exception:
-            # If we can't get index info, default to L2
-            pass
-        
-        # Normalize vectors for cosine similarity (but still use index metric for search)
-        using_cosine = False
-        if metric == "COSINE":
-            import numpy as np
-            query_embedding = np.array(query_embedding)
-            norm = np.linalg.norm(query_embedding)
-            if norm > 0:
-                query_embedding = (query_embedding / norm).tolist()
-            using_cosine = True
-            # Use the index metric (likely L2) even for cosine similarity
-            # Note: For true cosine similarity, stored vectors should also be normalized
-            metric = index_metric
-            print(f"  [INFO] Using {index_metric} metric (index type) with normalized query for cosine-like similarity")
-        
-        # Ensure we use the index metric for search
-        search_metric = metric if metric == index_metric else index_metric
-        if metric != index_metric and not using_cosine:
-            print(f"  [WARNING] Index uses {index_metric} metric, switching from {metric} to {index_metric}")
-            metric = index_metric
-        
-        # Perform vector similarity search
-        search_params = {
-            "metric_type": search_metric,
-            "params": {"nprobe": 10}
-        }
+        lexical_index = get_lexical_index() if hybrid else None
+        if hybrid and lexical_index is None:
+            print("  [INFO] Lexical index not built yet, using vector search only")
         
-        results = collection.search(
-            data=[query_embedding],
-            anns_field="embedding",
-            param=search_params,
-            limit=top_k,
-            output_fields=["bill_id"]
-        )
+        if lexical_index is None:
+            searched = _vector_search([queries[i] for i in pending], top_k, metric, passages, filters)
+            cacheable = [True] * len(pending)
+            mode = f"above {SIMILARITY_THRESHOLD} similarity threshold"
+            if filters:
+                mode += f" matching {filter_key}"
+        else:
+            # Exact bill IDs and quoted keyword queries skip the transformer pass
+            for i in pending:
+                shortcut = lexical_shortcut(lexical_index, queries[i], top_k)
+                if shortcut is not None:
+                    print(f"Found {len(shortcut)} lexical results for '{queries[i]}'")
+                    _search_result_cache.set(cache_keys[i], [dict(result) for result in shortcut])
+                    results[i] = shortcut
+            pending = [i for i in pending if results[i] is None]
+            if not pending:
+                return results
+            
+            # BM25 on the executor while this thread embeds the queries and searches vectors
+            candidates = top_k * HYBRID_CANDIDATES_FACTOR
+            lexical_future = _hybrid_executor.submit(
+                lambda: [lexical_index.search(queries[i], candidates) for i in pending]
+            )
+            vector_results = _vector_search([queries[i] for i in pending], candidates, metric, passages)
+            lexical_results = lexical_future.result()
+            # Without vector hits (embedding or store failure) the lexical ranking is used alone
+            searched = [
+                reciprocal_rank_fusion([vector_hits, lexical_hits] if vector_hits is not None else [lexical_hits], top_k)
+                for vector_hits, lexical_hits in zip(vector_results, lexical_results)
+            ]
+            cacheable = [vector_hits is not None for vector_hits in vector_results]
+            mode = "with hybrid lexical + vector ranking"
         
-        # Format results and filter by similarity threshold
-        search_results = []
-        similarity_threshold = 0.4  # Minimum similarity score to include
+        for i, search_results, cache in zip(pending, searched, cacheable):
+            if search_results is None:
+                continue
+            print(f"Found {len(search_results)} results for '{queries[i]}' {mode}")
+            if cache:
+                _search_result_cache.set(cache_keys[i], [dict(result) for result in search_results])
+            results[i] = search_results
         
-        if results and len(results) > 0:
-            for hit in results[0]:
-                if using_cosine:
-                    # For cosine-like similarity with normalized query and L2 distance
-                    # The L2 distance on normalized vectors approximates cosine distance
-                    # Convert to similarity score (smaller distance = higher similarity)
-                    score = 1 / (1 + hit.distance)
-                elif search_metric == "IP":
-                    # For IP metric, distance is already similarity
-                    score = hit.distance
-                else:
-                    # For L2, convert distance to similarity score
-                    score = 1 / (1 + hit.distance)
-                
-                # Only include results above the similarity threshold
-                if score > similarity_threshold:
-                    search_results.append({
-                        "bill_id": hit.entity.get("bill_id"),
-                        "distance": hit.distance,
-                        "score": score
-                    })
-        
-        metric_display = "COSINE-like" if using_cosine else search_metric
-        print(f"Found {len(search_results)} results above {similarity_threshold} similarity threshold (using {metric_display} similarity)")
-        return search_results
+        return [result or [] for result in results]
         
     except Exception as e:
         print(f"  [ERROR] Search failed: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        return [result or [] for result in results]
 
 
 def _format_search_results_without_details(search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Format search results to match the expected structure when bill details are unavailable.
     Transforms bill_id -> id, score -> similarity_score, and adds title field.
+    Hybrid results also keep their fused rank score as rrf_score.
     """
     formatted_results = []
     for result in search_results:
-        formatted_results.append({
+        formatted = {
             "id": result.get("bill_id", "Unknown"),
             "title": f"Bill {result.get('bill_id', 'Unknown')} (details unavailable)",
             "similarity_score": result.get("score", 0.0),
             "distance": result.get("distance", 0.0)
-        })
+        }
+        if "rrf_score" in result:
+            formatted["rrf_score"] = result["rrf_score"]
+        formatted_results.append(formatted)
     return formatted_results
 
 
-def search_bills_with_details(query: str, top_k: int = 10, metric: str = "L2") -> List[Dict[str, Any]]:
+def search_bills_with_details(
+    query: str,
+    top_k: int = 10,
+    metric: str = "L2",
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
     """
     Search for bills and return full bill details from database.
     
@@ -150,21 +367,40 @@ def search_bills_with_details(query: str, top_k: int = 10, metric: str = "L2") -
         query: User query text to search for
         top_k: Number of top results to return (default: 10)
         metric: Similarity metric to use - "L2", "COSINE", or "IP" (default: "L2")
+        filters: Optional metadata filters (see search_bills_batch)
     
     Returns:
         List of dictionaries containing full bill information with similarity scores
     """
-    # Get search results from Milvus
-    search_results = search_bills(query, top_k, metric=metric)
+    # Get search results from the vector store
+    search_results = search_bills(query, top_k, metric=metric, filters=filters)
     
     if not search_results:
         return []
     
     # Return formatted search results directly (skip Supabase fetch due to connection issues)
-    # The search results from Milvus contain bill IDs and similarity scores, which is sufficient
+    # The search results from the vector store contain bill IDs and similarity scores, which is sufficient
     return _format_search_results_without_details(search_results)
 
 
+def search_bills_with_details_batch(
+    queries: List[str],
+    top_k: int = 10,
+    metric: str = "L2",
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search for bills for many queries at once (see search_bills_batch).
+    
+    Returns:
+        One result list per query, each in the same shape as search_bills_with_details
+    """
+    return [
+        _format_search_results_without_details(search_results)
+        for search_results in search_bills_batch(queries, top_k, metric=metric, filters=filters)
+    ]
+
+
 if __name__ == "__main__":
     """
     Example query for Climate Change related bills using cosine similarity.
@@ -0,0 +1,749 @@
+"""
+Pluggable vector stores for bill embeddings:
+- MilvusVectorStore: the Milvus collection managed by vectors.py
+- LocalVectorStore: an in-process store (memory-mapped NumPy matrix + bill ID list) with
+  exact top-k search, for development, CI without Docker, and as a fallback when Milvus is down
+
+VECTOR_BACKEND selects the store: "milvus" (default), "local", or "auto" (Milvus, falling
+back to the local store for searches when Milvus is unreachable). Each backend has a bill-level
+store (one vector per bill) and a passage store (one vector per bill_id / chunk_idx window).
+
+Run `python src/vector_store.py --export-local` to copy the Milvus vectors into the local store.
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from vectors import (
+    FILTER_FIELDS,
+    MILVUS_COLLECTION_NAME,
+    NORMALIZED_METRICS,
+    PASSAGE_COLLECTION_NAME,
+    python_dir,
+    build_filter_expr,
+    build_search_params,
+    bump_collection_version,
+    clear_milvus_database,
+    delete_bill_embeddings_milvus,
+    delete_stale_passages_milvus,
+    fetch_all_embeddings,
+    fetch_bill_rows_milvus,
+    filter_field_names,
+    get_collection_field_names,
+    get_collection_handle,
+    get_collection_version,
+    get_index_settings,
+    get_milvus_connection,
+    get_stored_vector_metadata,
+    invalidate_collection_handle,
+    matches_filters,
+    setup_milvus_collection,
+    upsert_bill_embeddings_milvus,
+)
+
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "milvus").lower()
+VECTOR_BACKENDS = ("milvus", "local", "auto")
+
+# Local store files live here as {collection}.npy / .ids.json / .meta.json
+LOCAL_VECTOR_STORE_DIR = os.getenv("LOCAL_VECTOR_STORE_DIR", str(python_dir / ".cache" / "vector_store"))
+# On-disk dtype: float16 halves the file size; searches always run on float32
+LOCAL_VECTOR_DTYPE = os.getenv("LOCAL_VECTOR_DTYPE", "float32").lower()
+
+
+def normalize_matrix(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row (zero rows are left unchanged)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+class VectorStore:
+    """
+    Interface shared by the vector stores.
+
+    Search results are one list per query of {"bill_id", "distance", "score"} dicts,
+    best first, keeping only hits with score > similarity_threshold and matching the
+    filters (normalized with vectors.normalize_filters). Passage stores are keyed by
+    vectors.passage_id() and return one hit per matching passage (several per bill).
+    """
+
+    name = "base"
+    passages = False
+
+    @property
+    def metric_type(self) -> str:
+        """Metric the stored vectors are indexed with (COSINE/IP stores hold normalized vectors)"""
+        raise NotImplementedError
+
+    def prepare(self, expected_rows: Optional[int] = None) -> bool:
+        """Create the store if needed and get it ready for writes"""
+        raise NotImplementedError
+
+    def warm_up(self) -> bool:
+        """Load the store for searching; returns False if it is not available"""
+        raise NotImplementedError
+
+    def count(self) -> Optional[int]:
+        """Number of stored vectors (None if the store cannot be reached)"""
+        raise NotImplementedError
+
+    def clear(self) -> bool:
+        """Delete every stored vector"""
+        raise NotImplementedError
+
+    def upsert(self, items: List[Tuple[str, List[float]]], metadata: Optional[Dict[str, Dict[str, Any]]] = None,
+               flush: bool = True) -> int:
+        """Insert or replace (bill_id, embedding) pairs; returns the number written"""
+        raise NotImplementedError
+
+    def delete(self, bill_ids: List[str]) -> int:
+        """Delete the vectors (all passages, in passage stores) of the given bills; returns the number deleted"""
+        raise NotImplementedError
+
+    def delete_stale_passages(self, passage_counts: Dict[str, int]) -> int:
+        """Delete the passages of each bill with chunk_idx >= its new passage count; returns the number deleted"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Persist buffered writes and bump the collection version stamp"""
+        raise NotImplementedError
+
+    def supports_metadata(self) -> bool:
+        """Whether content_hash / model_name are stored next to each vector"""
+        raise NotImplementedError
+
+    def get_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Mapping of bill_id -> {"content_hash": ..., "model_name": ..., plus stored filter fields}"""
+        raise NotImplementedError
+
+    def fetch_vectors(self, bill_ids: List[str]) -> List[Tuple[str, List[float], Dict[str, Any]]]:
+        """Stored (key, embedding, metadata) rows of the given bills"""
+        raise NotImplementedError
+
+    def fetch_all(self) -> Tuple[List[str], np.ndarray]:
+        """Every stored (bill_id, embedding) pair as (bill_ids, float32 matrix)"""
+        raise NotImplementedError
+
+    def search(self, query_embeddings: List[List[float]], top_k: int, metric: str = "COSINE",
+               similarity_threshold: float = 0.4,
+               filters: Optional[Dict[str, Any]] = None) -> Optional[List[List[Dict[str, Any]]]]:
+        """Top-k search for each query embedding; None if the store is not available"""
+        raise NotImplementedError
+
+
+class MilvusVectorStore(VectorStore):
+    """Bill embeddings in the Milvus collection (see vectors.py)"""
+
+    name = "milvus"
+
+    def __init__(self, collection_name: str = MILVUS_COLLECTION_NAME, passages: bool = False):
+        self.collection_name = collection_name
+        self.passages = passages
+        self._collection = None
+
+    def _write_collection(self):
+        if self._collection is None:
+            self._collection = setup_milvus_collection(
+                verbose=False, collection_name=self.collection_name, passages=self.passages
+            )
+        return self._collection
+
+    def _handle(self, refresh: bool = False):
+        return get_collection_handle(refresh=refresh, collection_name=self.collection_name)
+
+    @property
+    def metric_type(self) -> str:
+        if self._collection is not None:
+            return get_index_settings(self._collection)[1]
+        handle = self._handle()
+        return handle.metric_type if handle is not None else "L2"
+
+    def prepare(self, expected_rows: Optional[int] = None) -> bool:
+        self._collection = setup_milvus_collection(
+            expected_rows=expected_rows, collection_name=self.collection_name, passages=self.passages
+        )
+        if self._collection is None:
+            print("Make sure Milvus is running: docker-compose up -d milvus")
+        return self._collection is not None
+
+    def warm_up(self) -> bool:
+        return self._handle() is not None
+
+    def count(self) -> Optional[int]:
+        try:
+            from pymilvus import Collection, utility
+
+            if not get_milvus_connection():
+                return None
+            if not utility.has_collection(self.collection_name):
+                return 0
+            return Collection(self.collection_name).num_entities
+        except Exception as e:
+            print(f"  [WARNING] Could not count Milvus vectors: {e}")
+            return None
+
+    def clear(self) -> bool:
+        self._collection = None
+        invalidate_collection_handle(self.collection_name)
+        return clear_milvus_database(self.collection_name)
+
+    def upsert(self, items, metadata=None, flush=True) -> int:
+        return upsert_bill_embeddings_milvus(items, collection=self._write_collection(), flush=flush, metadata=metadata)
+
+    def delete(self, bill_ids: List[str]) -> int:
+        collection = self._write_collection()
+        return delete_bill_embeddings_milvus(bill_ids, collection) if collection is not None else 0
+
+    def delete_stale_passages(self, passage_counts: Dict[str, int]) -> int:
+        collection = self._write_collection()
+        return delete_stale_passages_milvus(passage_counts, collection) if collection is not None else 0
+
+    def flush(self):
+        if self._collection is not None:
+            try:
+                self._collection.flush()
+            except Exception as e:
+                print(f"  [ERROR] Failed to flush Milvus collection: {e}")
+        bump_collection_version()
+
+    def supports_metadata(self) -> bool:
+        collection = self._write_collection()
+        return collection is not None and "content_hash" in get_collection_field_names(collection)
+
+    def get_metadata(self) -> Dict[str, Dict[str, Any]]:
+        return get_stored_vector_metadata(self._write_collection()) if self.supports_metadata() else {}
+
+    def fetch_vectors(self, bill_ids: List[str]) -> List[Tuple[str, List[float], Dict[str, Any]]]:
+        collection = self._write_collection()
+        return fetch_bill_rows_milvus(bill_ids, collection) if collection is not None else []
+
+    def fetch_all(self) -> Tuple[List[str], np.ndarray]:
+        handle = self._handle()
+        if handle is None or self.passages:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return fetch_all_embeddings(handle.collection)
+
+    def search(self, query_embeddings, top_k, metric="COSINE", similarity_threshold=0.4, filters=None):
+        # Get the cached collection handle (index metric must match for search)
+        handle = self._handle()
+        if handle is None:
+            return None
+        index_metric = handle.metric_type
+
+        # Filters are evaluated by Milvus during the ANN search
+        filters = filters or {}
+        missing_fields = [name for name in filter_field_names(filters) if name not in handle.field_names]
+        if missing_fields:
+            print(f"  [ERROR] Collection '{self.collection_name}' has no {', '.join(missing_fields)} field(s) to filter on")
+            print("    Recreate it with: python src/vectors.py --force-recreate")
+            return None
+        filter_expr = build_filter_expr(filters)
+
+        # Normalize vectors for cosine similarity
+        using_cosine = False
+        native_similarity = index_metric in NORMALIZED_METRICS
+        if native_similarity:
+            # Stored vectors are L2-normalized at ingest, so the index scores are true cosine similarity
+            query_embeddings = normalize_matrix(np.asarray(query_embeddings, dtype=np.float32)).tolist()
+            if metric != index_metric:
+                print(f"  [INFO] Index uses {index_metric} metric on normalized vectors, using it for {metric} search")
+            metric = index_metric
+        elif metric == "COSINE":
+            query_embeddings = normalize_matrix(np.asarray(query_embeddings, dtype=np.float32)).tolist()
+            using_cosine = True
+            # Legacy L2 index: use the index metric even for cosine similarity
+            # Note: Stored vectors in L2 collections are not normalized, so this is only cosine-like
+            metric = index_metric
+            print(f"  [INFO] Using {index_metric} metric (index type) with normalized query for cosine-like similarity")
+
+        # Ensure we use the index metric for search
+        search_metric = metric if metric == index_metric else index_metric
+        if metric != index_metric and not using_cosine:
+            print(f"  [WARNING] Index uses {index_metric} metric, switching from {metric} to {index_metric}")
+            metric = index_metric
+
+        search_params = build_search_params(handle.index_type, handle.index_params, search_metric, top_k)
+        if native_similarity:
+            # Range search: Milvus drops hits below the threshold itself, so all top_k slots
+            # go to results that pass it instead of being filtered out afterwards
+            search_params["params"]["radius"] = similarity_threshold
+
+        def run_search(collection):
+            return collection.search(
+                data=query_embeddings,
+                anns_field="embedding",
+                param=search_params,
+                limit=top_k,
+                expr=filter_expr or None,
+                output_fields=["bill_id"]
+            )
+
+        try:
+            hits_per_query = run_search(handle.collection)
+        except Exception as e:
+            # The cached handle may be stale (collection dropped, released or reconnected)
+            print(f"  [WARNING] Search failed on cached collection, reloading: {e}")
+            handle = self._handle(refresh=True)
+            if handle is None:
+                return None
+            try:
+                hits_per_query = run_search(handle.collection)
+            except Exception as e:
+                print(f"  [ERROR] Milvus search failed: {e}")
+                return None
+
+        results = []
+        for hits in hits_per_query:
+            search_results = []
+            for hit in hits:
+                if native_similarity:
+                    # COSINE (or IP on normalized vectors): distance is the cosine similarity
+                    score = hit.distance
+                else:
+                    # For L2 (or cosine-like search on a legacy L2 index), convert distance to
+                    # a similarity score (smaller distance = higher similarity)
+                    score = 1 / (1 + hit.distance)
+
+                # Only include results above the similarity threshold
+                if score > similarity_threshold:
+                    search_results.append({
+                        "bill_id": hit.entity.get("bill_id"),
+                        "distance": hit.distance,
+                        "score": score
+                    })
+            results.append(search_results)
+        return results
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process store: a float32/float16 matrix saved as .npy (memory-mapped when float32),
+    a key list (bill IDs, or passage IDs) and per-key metadata as JSON.
+
+    Vectors are L2-normalized on write, so search is an exact cosine top-k: one matrix
+    product and an argpartition per batch of queries. Writes are buffered in memory until
+    flush(), which replaces the files atomically and bumps the collection version stamp;
+    other processes reload when they see the new version.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str = LOCAL_VECTOR_STORE_DIR, collection_name: str = MILVUS_COLLECTION_NAME,
+                 dtype: str = LOCAL_VECTOR_DTYPE, passages: bool = False):
+        self.passages = passages
+        base = Path(directory) / collection_name
+        self.matrix_path = Path(f"{base}.npy")
+        self.ids_path = Path(f"{base}.ids.json")
+        self.metadata_path = Path(f"{base}.meta.json")
+        self.dtype = np.float16 if dtype == "float16" else np.float32
+        self._matrix: Optional[np.ndarray] = None
+        self._bill_ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._owners: Optional[List[str]] = None  # Bill ID of each row, for passage stores
+        self._filter_masks: Dict[str, np.ndarray] = {}  # Row masks of recent filters
+        self._version: Optional[str] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def metric_type(self) -> str:
+        return "COSINE"
+
+    def _load(self):
+        """(Re)load the files when they changed on disk; unflushed local writes are kept"""
+        version = get_collection_version()
+        if self._dirty or (self._version == version and self._matrix is not None):
+            return
+        matrix = None
+        bill_ids: List[str] = []
+        metadata: Dict[str, Dict[str, Any]] = {}
+        if self.matrix_path.exists() and self.ids_path.exists():
+            try:
+                matrix = np.load(self.matrix_path, mmap_mode="r")
+                if matrix.dtype != np.float32:
+                    matrix = np.asarray(matrix, dtype=np.float32)
+                with open(self.ids_path, "r", encoding="utf-8") as f:
+                    bill_ids = json.load(f)
+                if self.metadata_path.exists():
+                    with open(self.metadata_path, "r", encoding="utf-8") as f:
+                        metadata = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"  [ERROR] Failed to load local vector store from {self.matrix_path}: {e}")
+                matrix, bill_ids, metadata = None, [], {}
+        if matrix is not None and len(matrix) != len(bill_ids):
+            print(f"  [ERROR] Local vector store is inconsistent ({len(matrix)} vectors, {len(bill_ids)} ids)")
+            matrix, bill_ids, metadata = None, [], {}
+        self._matrix = matrix
+        self._bill_ids = bill_ids
+        self._rows = {bill_id: row for row, bill_id in enumerate(bill_ids)}
+        self._metadata = metadata
+        self._owners = None
+        self._filter_masks = {}
+        self._version = version
+
+    def _writable_matrix(self, dim: int) -> np.ndarray:
+        """In-memory copy of the matrix that writes can modify (memmaps are read-only)"""
+        if self._matrix is None:
+            return np.zeros((0, dim), dtype=np.float32)
+        if isinstance(self._matrix, np.memmap) or not self._matrix.flags.writeable:
+            return np.array(self._matrix, dtype=np.float32)
+        return self._matrix
+
+    def prepare(self, expected_rows: Optional[int] = None) -> bool:
+        with self._lock:
+            self._load()
+        print(f"  Local vector store: {self.matrix_path} ({len(self._bill_ids)} vectors)")
+        return True
+
+    def warm_up(self) -> bool:
+        with self._lock:
+            self._load()
+            return self._matrix is not None
+
+    def count(self) -> Optional[int]:
+        with self._lock:
+            self._load()
+            return len(self._bill_ids)
+
+    def clear(self) -> bool:
+        with self._lock:
+            for path in (self.matrix_path, self.ids_path, self.metadata_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"  [ERROR] Failed to remove {path}: {e}")
+                    return False
+            self._matrix = None
+            self._bill_ids, self._rows, self._metadata = [], {}, {}
+            self._owners = None
+            self._filter_masks = {}
+            self._dirty = False
+            self._version = bump_collection_version()
+        return True
+
+    def upsert(self, items, metadata=None, flush=True) -> int:
+        if not items:
+            return 0
+        # Deduplicate by bill_id, keeping the last embedding for each bill
+        embeddings = dict(items)
+        bill_ids = list(embeddings.keys())
+        vectors = normalize_matrix(np.asarray([embeddings[bill_id] for bill_id in bill_ids], dtype=np.float32))
+        metadata = metadata or {}
+
+        with self._lock:
+            self._load()
+            matrix = self._writable_matrix(vectors.shape[1])
+            if matrix.shape[1] != vectors.shape[1]:
+                print(f"  [ERROR] Embedding dimension {vectors.shape[1]} does not match stored dimension {matrix.shape[1]}")
+                return 0
+
+            existing = [i for i, bill_id in enumerate(bill_ids) if bill_id in self._rows]
+            new = [i for i, bill_id in enumerate(bill_ids) if bill_id not in self._rows]
+            if existing:
+                matrix[[self._rows[bill_ids[i]] for i in existing]] = vectors[existing]
+            if new:
+                matrix = np.vstack([matrix, vectors[new]])
+                for i in new:
+                    self._rows[bill_ids[i]] = len(self._bill_ids)
+                    self._bill_ids.append(bill_ids[i])
+            for bill_id in bill_ids:
+                self._metadata[bill_id] = dict(metadata.get(bill_id, {}))
+            self._matrix = matrix
+            self._owners = None
+            self._filter_masks = {}
+            self._dirty = True
+
+        if flush:
+            self.flush()
+        return len(bill_ids)
+
+    def _bill_id(self, key: str) -> str:
+        """Bill a stored key belongs to (passage rows record it in their metadata)"""
+        return self._metadata.get(key, {}).get("bill_id", key)
+
+    def delete(self, bill_ids: List[str]) -> int:
+        with self._lock:
+            self._load()
+            targets = set(bill_ids)
+            return self._delete_rows([row for row, key in enumerate(self._bill_ids) if self._bill_id(key) in targets])
+
+    def delete_stale_passages(self, passage_counts: Dict[str, int]) -> int:
+        with self._lock:
+            self._load()
+            return self._delete_rows([
+                row for row, key in enumerate(self._bill_ids)
+                if self._bill_id(key) in passage_counts
+                and self._metadata.get(key, {}).get("chunk_idx", 0) >= passage_counts[self._bill_id(key)]
+            ])
+
+    def _delete_rows(self, rows: List[int]) -> int:
+        """Drop the given matrix rows and their metadata (caller holds the lock)"""
+        if not rows:
+            return 0
+        keep = np.ones(len(self._bill_ids), dtype=bool)
+        keep[rows] = False
+        removed = [self._bill_ids[row] for row in rows]
+        self._matrix = np.asarray(self._matrix, dtype=np.float32)[keep]
+        self._bill_ids = [key for key, kept in zip(self._bill_ids, keep) if kept]
+        self._rows = {key: row for row, key in enumerate(self._bill_ids)}
+        for key in removed:
+            self._metadata.pop(key, None)
+        self._owners = None
+        self._filter_masks = {}
+        self._dirty = True
+        return len(rows)
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.matrix_path.parent.mkdir(parents=True, exist_ok=True)
+                # Write every file next to its target first, then swap them in
+                matrix_tmp = Path(f"{self.matrix_path}.tmp")
+                with open(matrix_tmp, "wb") as f:
+                    np.save(f, self._matrix.astype(self.dtype, copy=False))
+                for path, payload in ((self.ids_path, self._bill_ids), (self.metadata_path, self._metadata)):
+                    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                        json.dump(payload, f)
+                os.replace(matrix_tmp, self.matrix_path)
+                os.replace(f"{self.ids_path}.tmp", self.ids_path)
+                os.replace(f"{self.metadata_path}.tmp", self.metadata_path)
+            except OSError as e:
+                print(f"  [ERROR] Failed to write local vector store: {e}")
+                return
+            self._dirty = False
+            self._version = bump_collection_version()
+
+    def supports_metadata(self) -> bool:
+        return True
+
+    def get_metadata(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._load()
+            return {
+                self._bill_id(key): {
+                    "content_hash": values.get("content_hash", ""),
+                    "model_name": values.get("model_name", ""),
+                    **{name: values[name] for name in FILTER_FIELDS if name in values},
+                }
+                for key, values in self._metadata.items()
+            }
+
+    def fetch_vectors(self, bill_ids: List[str]) -> List[Tuple[str, List[float], Dict[str, Any]]]:
+        with self._lock:
+            self._load()
+            targets = set(bill_ids)
+            return [
+                (key, self._matrix[row].tolist(), dict(self._metadata.get(key, {})))
+                for row, key in enumerate(self._bill_ids)
+                if self._bill_id(key) in targets
+            ]
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Boolean mask of the rows matching normalized filters (cached until the next write)"""
+        cache_key = json.dumps(filters, sort_keys=True)
+        mask = self._filter_masks.get(cache_key)
+        if mask is None:
+            mask = np.fromiter(
+                (matches_filters(self._metadata.get(key, {}), filters) for key in self._bill_ids),
+                dtype=bool,
+                count=len(self._bill_ids),
+            )
+            if len(self._filter_masks) >= 64:
+                self._filter_masks.clear()
+            self._filter_masks[cache_key] = mask
+        return mask
+
+    def fetch_all(self) -> Tuple[List[str], np.ndarray]:
+        with self._lock:
+            self._load()
+            if self._matrix is None or self.passages:
+                return [], np.zeros((0, 0), dtype=np.float32)
+            return list(self._bill_ids), np.asarray(self._matrix, dtype=np.float32)
+
+    def search(self, query_embeddings, top_k, metric="COSINE", similarity_threshold=0.4, filters=None):
+        with self._lock:
+            self._load()
+            matrix, bill_ids = self._matrix, self._bill_ids
+            if self.passages:
+                if self._owners is None:
+                    self._owners = [self._bill_id(key) for key in self._bill_ids]
+                bill_ids = self._owners
+            mask = self._filter_mask(filters) if filters and matrix is not None else None
+        if matrix is None or not bill_ids or top_k <= 0:
+            return [[] for _ in query_embeddings]
+        if metric != "COSINE":
+            print(f"  [INFO] Local vector store holds normalized vectors, using COSINE for {metric} search")
+
+        queries = normalize_matrix(np.asarray(query_embeddings, dtype=np.float32))
+        scores = queries @ matrix.T
+        if mask is not None:
+            # Filtered-out rows can never pass the similarity threshold
+            scores[:, ~mask] = -np.inf
+        k = min(top_k, len(bill_ids))
+        # Unordered top-k per query, then sort just those k
+        top_rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top_rows, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_rows = np.take_along_axis(top_rows, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for rows, row_scores in zip(top_rows, top_scores):
+            results.append([
+                {"bill_id": bill_ids[row], "distance": float(score), "score": float(score)}
+                for row, score in zip(rows, row_scores)
+                if score > similarity_threshold
+            ])
+        return results
+
+
+class FallbackVectorStore(VectorStore):
+    """Writes go to the primary store; searches fall back to the secondary store when it is unavailable"""
+
+    def __init__(self, primary: VectorStore, fallback: VectorStore):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+        self.passages = primary.passages
+
+    @property
+    def metric_type(self) -> str:
+        return self.primary.metric_type
+
+    def prepare(self, expected_rows=None) -> bool:
+        return self.primary.prepare(expected_rows)
+
+    def warm_up(self) -> bool:
+        if self.primary.warm_up():
+            return True
+        print(f"  [WARNING] {self.primary.name} store not available, warming up {self.fallback.name} store")
+        return self.fallback.warm_up()
+
+    def count(self) -> Optional[int]:
+        return self.primary.count()
+
+    def clear(self) -> bool:
+        return self.primary.clear()
+
+    def upsert(self, items, metadata=None, flush=True) -> int:
+        return self.primary.upsert(items, metadata=metadata, flush=flush)
+
+    def delete(self, bill_ids: List[str]) -> int:
+        return self.primary.delete(bill_ids)
+
+    def delete_stale_passages(self, passage_counts: Dict[str, int]) -> int:
+        return self.primary.delete_stale_passages(passage_counts)
+
+    def flush(self):
+        self.primary.flush()
+
+    def supports_metadata(self) -> bool:
+        return self.primary.supports_metadata()
+
+    def get_metadata(self) -> Dict[str, Dict[str, Any]]:
+        return self.primary.get_metadata()
+
+    def fetch_vectors(self, bill_ids: List[str]) -> List[Tuple[str, List[float], Dict[str, Any]]]:
+        return self.primary.fetch_vectors(bill_ids)
+
+    def fetch_all(self) -> Tuple[List[str], np.ndarray]:
+        return self.primary.fetch_all()
+
+    def search(self, query_embeddings, top_k, metric="COSINE", similarity_threshold=0.4, filters=None):
+        results = self.primary.search(query_embeddings, top_k, metric, similarity_threshold, filters)
+        if results is None:
+            print(f"  [WARNING] {self.primary.name} store not available, searching {self.fallback.name} store")
+            results = self.fallback.search(query_embeddings, top_k, metric, similarity_threshold, filters)
+        return results
+
+
+# Shared stores (one per backend and granularity, created on first use)
+_vector_stores: Dict[Tuple[str, bool], VectorStore] = {}
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store(backend: Optional[str] = None, passages: bool = False) -> VectorStore:
+    """
+    Get the shared vector store for a backend ("milvus", "local" or "auto"; default VECTOR_BACKEND).
+
+    With passages=True, returns the backend's passage store (PASSAGE_COLLECTION_NAME).
+    """
+    backend = (backend or VECTOR_BACKEND).lower()
+    if backend not in VECTOR_BACKENDS:
+        print(f"  [WARNING] Unknown VECTOR_BACKEND '{backend}', using milvus")
+        backend = "milvus"
+    collection_name = PASSAGE_COLLECTION_NAME if passages else MILVUS_COLLECTION_NAME
+    key = (backend, passages)
+    with _vector_store_lock:
+        if key not in _vector_stores:
+            if backend == "local":
+                store = LocalVectorStore(collection_name=collection_name, passages=passages)
+            elif backend == "auto":
+                store = FallbackVectorStore(
+                    MilvusVectorStore(collection_name, passages),
+                    LocalVectorStore(collection_name=collection_name, passages=passages),
+                )
+            else:
+                store = MilvusVectorStore(collection_name, passages)
+            _vector_stores[key] = store
+        return _vector_stores[key]
+
+
+def export_to_local_store(source: Optional[VectorStore] = None, target: Optional[LocalVectorStore] = None) -> int:
+    """Replace the local store's contents with every vector (and metadata) from the source store"""
+    source = source or MilvusVectorStore()
+    target = target or LocalVectorStore()
+    print(f"Reading vectors from {source.name} store...")
+    bill_ids, embeddings = source.fetch_all()
+    if not bill_ids:
+        print("No vectors to export")
+        return 0
+    metadata = source.get_metadata() if source.supports_metadata() else {}
+    print(f"  {len(bill_ids)} vectors, dim {embeddings.shape[1]}")
+
+    if not target.clear():
+        return 0
+    written = target.upsert(list(zip(bill_ids, embeddings)), metadata=metadata)
+    print(f"  Wrote {written} vectors to {target.matrix_path}")
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the bill vector stores")
+    parser.add_argument(
+        "--export-local",
+        action="store_true",
+        help="Copy every vector from Milvus into the local vector store"
+    )
+    parser.add_argument(
+        "--count",
+        action="store_true",
+        help="Print the number of vectors in the configured store"
+    )
+
+    args = parser.parse_args()
+
+    if args.export_local:
+        if not export_to_local_store():
+            sys.exit(1)
+        print("    Export complete!")
+    elif args.count:
+        store = get_vector_store()
+        print(f"{store.name}: {store.count()}")
+    else:
+        parser.print_help()
@@ -5,16 +5,26 @@ Bill ingestion and vector creation script:
 - Manages Milvus collection setup and vector storage
 """
 
+import hashlib
+import math
 import os
 import sys
+import time
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from db import (
+    SUPABASE_URL,
+    SUPABASE_SERVICE_ROLE_KEY,
+    get_supabase_client,
+    fetch_all_bills,
+)
+
 # Load environment variables
 # Look for .env file in the python directory (parent of src)
 python_dir = Path(__file__).parent.parent
@@ -23,10 +33,20 @@ load_dotenv(dotenv_path=env_path)
 # Also try loading from current directory (for backwards compatibility)
 load_dotenv()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-mpnet-base-v2")
-DATABASE_URL = os.getenv("DATABASE_URL")
+# Inference backend: torch (fp32), torch-int8 (dynamically quantized Linear layers) or
+# onnx (ONNX Runtime export with O3 graph optimizations, built once into EMBED_ONNX_DIR)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").lower()
+EMBED_BACKENDS = ("torch", "torch-int8", "onnx")
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))  # CPU threads for inference (0: library default)
+EMBED_ONNX_DIR = os.getenv(
+    "EMBED_ONNX_DIR",
+    str(python_dir / ".cache" / "onnx" / EMBED_MODEL.replace("/", "--")),
+)
+ONNX_OPTIMIZED_FILE = "onnx/model_O3.onnx"
+# Model name recorded with stored vectors and cached query embeddings. Other backends give
+# slightly different embeddings, so switching backends re-embeds on the next incremental run
+EMBED_MODEL_ID = EMBED_MODEL if EMBED_BACKEND == "torch" else f"{EMBED_MODEL}@{EMBED_BACKEND}"
 
 # Milvus configuration
 MILVUS_HOST = os.getenv("MILVUS_HOST", "localhost")
@@ -36,42 +56,41 @@ MILVUS_USER = os.getenv("MILVUS_USER")  # Username for authentication
 MILVUS_PASSWORD = os.getenv("MILVUS_PASSWORD")  # Password for authentication
 MILVUS_TOKEN = os.getenv("MILVUS_TOKEN")  # API token for authentication (alternative to user/password)
 MILVUS_COLLECTION_NAME = os.getenv("MILVUS_COLLECTION_NAME", "bill_embeddings")
+# Passage-level index: one row per (bill_id, chunk_idx) token window of the bill text
+PASSAGE_COLLECTION_NAME = os.getenv("PASSAGE_COLLECTION_NAME", f"{MILVUS_COLLECTION_NAME}_chunks")
+PASSAGE_WINDOW_TOKENS = int(os.getenv("PASSAGE_WINDOW_TOKENS", "256"))  # all-mpnet-base-v2 truncates at 384
+PASSAGE_OVERLAP_TOKENS = int(os.getenv("PASSAGE_OVERLAP_TOKENS", "32"))
+PASSAGE_MAX_CHUNKS = int(os.getenv("PASSAGE_MAX_CHUNKS", "16"))  # Per-bill cap that bounds ingest cost
 
-# Check if required env vars are set
-if not SUPABASE_URL or SUPABASE_URL == "replace_me":
-    print("!!SUPABASE_URL not configured. Using mock mode.!!")
-    SUPABASE_URL = None
+# Ingestion keeps the BM25 lexical index (lexical_index.py) current only when hybrid search
+# uses it, unless --lexical / --no-lexical says otherwise
+BUILD_LEXICAL_INDEX = os.getenv("HYBRID_SEARCH", "false").lower() in ("1", "true", "yes")
 
-if not SUPABASE_SERVICE_ROLE_KEY or SUPABASE_SERVICE_ROLE_KEY == "replace_me":
-    print("!!SUPABASE_SERVICE_ROLE_KEY not configured. Using mock mode.!!")
-    SUPABASE_SERVICE_ROLE_KEY = None
+# Metric for new collections. COSINE and IP collections store L2-normalized embeddings
+MILVUS_METRIC_TYPE = os.getenv("MILVUS_METRIC_TYPE", "COSINE").upper()
+NORMALIZED_METRICS = ("COSINE", "IP")
 
-# Initialize sentence transformer model (lazy loading)
-_embedding_model = None
+# ANN index profile for new collections: IVF_FLAT, IVF_SQ8, IVF_PQ or HNSW
+MILVUS_INDEX_PROFILE = os.getenv("MILVUS_INDEX_PROFILE", "IVF_FLAT").upper()
+INDEX_PROFILES = ("IVF_FLAT", "IVF_SQ8", "IVF_PQ", "HNSW")
+MILVUS_NPROBE = os.getenv("MILVUS_NPROBE")  # Overrides the nprobe derived from nlist
+MILVUS_HNSW_M = int(os.getenv("MILVUS_HNSW_M", "16"))
+MILVUS_HNSW_EF_CONSTRUCTION = int(os.getenv("MILVUS_HNSW_EF_CONSTRUCTION", "200"))
+MILVUS_HNSW_EF = int(os.getenv("MILVUS_HNSW_EF", "64"))
+MILVUS_PQ_M = int(os.getenv("MILVUS_PQ_M", "48"))  # Sub-quantizers; must divide the embedding dimension
 
+# Scalar fields stored next to each vector so searches can filter inside the ANN search
+FILTER_FIELDS = ("categories", "origin", "status", "date")
+MAX_VECTOR_CATEGORIES = 16  # Capacity of the categories ARRAY field
 
-def get_bills_from_database(limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
-    """Fetch bills from the database"""
-    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-        print("  [MOCK] Would fetch bills from database")
-        return []
-    
-    try:
-        from supabase import create_client, Client
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-        
-        query = supabase.table("bills").select("*")
-        
-        if limit:
-            query = query.limit(limit)
-        if offset:
-            query = query.offset(offset)
-        
-        result = query.execute()
-        return result.data if result.data else []
-    except Exception as e:
-        print(f"  [ERROR] Failed to fetch bills: {e}")
-        return []
+# Version stamp bumped whenever vectors are written, so search result caches can be invalidated
+VECTOR_VERSION_PATH = os.getenv(
+    "VECTOR_VERSION_PATH",
+    str(python_dir / ".cache" / f"{MILVUS_COLLECTION_NAME}.version"),
+)
+
+# Initialize sentence transformer model (lazy loading)
+_embedding_model = None
 
 
 def get_mock_bills() -> List[Dict[str, Any]]:
@@ -100,15 +119,64 @@ def get_mock_bills() -> List[Dict[str, Any]]:
     ]
 
 
+def _load_onnx_model(threads: int):
+    """Load the ONNX Runtime model, exporting and optimizing it on first use"""
+    import onnxruntime
+    from sentence_transformers import SentenceTransformer, export_optimized_onnx_model
+
+    model_dir = Path(EMBED_ONNX_DIR)
+    if not (model_dir / ONNX_OPTIMIZED_FILE).exists():
+        print(f"  Exporting {EMBED_MODEL} to ONNX with O3 graph optimizations in {model_dir}...")
+        exported = SentenceTransformer(EMBED_MODEL, backend="onnx")
+        exported.save(str(model_dir))
+        export_optimized_onnx_model(exported, "O3", str(model_dir))
+
+    session_options = onnxruntime.SessionOptions()
+    if threads > 0:
+        session_options.intra_op_num_threads = threads
+    return SentenceTransformer(
+        str(model_dir),
+        backend="onnx",
+        model_kwargs={
+            "file_name": ONNX_OPTIMIZED_FILE,
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options,
+        },
+    )
+
+
+def load_embedding_model(backend: str = EMBED_BACKEND, threads: int = EMBED_THREADS):
+    """
+    Load a new instance of the sentence transformer model.
+
+    Args:
+        backend: "torch", "torch-int8" or "onnx" (see EMBED_BACKEND)
+        threads: CPU threads for inference (0 keeps the library default)
+    """
+    if backend not in EMBED_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {', '.join(EMBED_BACKENDS)}")
+    from sentence_transformers import SentenceTransformer
+
+    print(f"  Loading embedding model: {EMBED_MODEL} ({backend})")
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
+    if backend == "onnx":
+        return _load_onnx_model(threads)
+
+    model = SentenceTransformer(EMBED_MODEL, device="cpu" if backend == "torch-int8" else None)
+    if backend == "torch-int8":
+        import torch
+        # int8 weights for every Linear layer; activations are quantized on the fly
+        torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
 def get_embedding_model():
-    """Get or initialize the sentence transformer model"""
+    """Get or initialize the sentence transformer model (with the EMBED_BACKEND backend)"""
     global _embedding_model
     if _embedding_model is None:
-        from sentence_transformers import SentenceTransformer
-        
-        model_name = "sentence-transformers/all-mpnet-base-v2"
-        print(f"  Loading embedding model: {model_name}")
-        _embedding_model = SentenceTransformer(model_name)
+        _embedding_model = load_embedding_model()
     return _embedding_model
 
 
@@ -128,6 +196,196 @@ def generate_embedding(text: str) -> List[float]:
         return [random.random() for _ in range(768)]
 
 
+def generate_embeddings(texts: List[str], batch_size: int = 64, normalize: bool = False) -> List[List[float]]:
+    """
+    Generate embeddings for many texts with batched model.encode calls.
+
+    Args:
+        texts: Texts to embed
+        batch_size: Number of texts per forward pass (default: 64)
+        normalize: L2-normalize the embeddings (for COSINE / IP collections)
+
+    Returns:
+        List of embeddings in the same order as texts, or an empty list on failure
+    """
+    if not texts:
+        return []
+    try:
+        model = get_embedding_model()
+        embeddings = model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            normalize_embeddings=normalize,
+        )
+        return [embedding.tolist() for embedding in embeddings]
+    except Exception as e:
+        print(f"  [ERROR] Failed to generate embeddings for batch of {len(texts)}: {e}")
+        return []
+
+
+def get_embedding_text(bill: Dict[str, Any], summary_text: Optional[str] = None) -> str:
+    """Choose the text to embed for a bill (priority: bill_text > title + summary_text > title + summary_key)"""
+    bill_title = bill.get("title", "Unknown")
+    bill_text = bill.get("bill_text")
+    if bill_text:
+        return bill_text
+    if summary_text:
+        return f"{bill_title} {summary_text}"
+    return f"{bill_title} {bill.get('summary_key', '')}".strip() or bill_title
+
+
+def compute_content_hash(text: str) -> str:
+    """Hash of the embedding text, stored next to each vector to detect changed bills"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_bill_date(value: Any) -> int:
+    """Bill date as an int YYYYMMDD (0 if missing or unparseable); accepts dates and ISO strings"""
+    text = str(value or "")[:10].replace("-", "")
+    return int(text) if len(text) == 8 and text.isdigit() else 0
+
+
+def get_filter_metadata(bill: Dict[str, Any]) -> Dict[str, Any]:
+    """Filterable scalar field values for a bill row"""
+    return {
+        "categories": [str(category)[:100] for category in (bill.get("categories") or [])][:MAX_VECTOR_CATEGORIES],
+        "origin": str(bill.get("origin") or "")[:50],
+        "status": str(bill.get("status") or "")[:200],
+        "date": parse_bill_date(bill.get("date")),
+    }
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Validate search filters.
+
+    Accepted keys: categories / origin / status (a value or a list of values; a bill matches
+    if it has any of them) and date_from / date_to (inclusive, "YYYY-MM-DD" or YYYYMMDD).
+
+    Returns:
+        Filters with list values and int dates (empty dict for no filters)
+
+    Raises:
+        ValueError: On unknown keys or unparseable dates
+    """
+    normalized: Dict[str, Any] = {}
+    for key, value in (filters or {}).items():
+        if value is None or value == "" or value == []:
+            continue
+        if key in ("categories", "origin", "status"):
+            values = value if isinstance(value, (list, tuple)) else [value]
+            normalized[key] = sorted({str(item) for item in values})
+        elif key in ("date_from", "date_to"):
+            date = parse_bill_date(value)
+            if not date:
+                raise ValueError(f"{key} must be a date like 2024-01-31, got {value!r}")
+            normalized[key] = date
+        else:
+            raise ValueError(f"Unknown search filter '{key}'")
+    return normalized
+
+
+def build_filter_expr(filters: Dict[str, Any]) -> str:
+    """Milvus boolean expression for normalized filters (empty string for no filters)"""
+    parts = []
+    if "categories" in filters:
+        parts.append(f"ARRAY_CONTAINS_ANY(categories, {json.dumps(filters['categories'])})")
+    for field in ("origin", "status"):
+        if field in filters:
+            parts.append(f"{field} in {json.dumps(filters[field])}")
+    if "date_from" in filters:
+        parts.append(f"date >= {filters['date_from']}")
+    if "date_to" in filters:
+        parts.append(f"date <= {filters['date_to']}")
+    return " and ".join(parts)
+
+
+def filter_field_names(filters: Dict[str, Any]) -> List[str]:
+    """Scalar fields that normalized filters read"""
+    return sorted({"date" if key.startswith("date_") else key for key in filters})
+
+
+def matches_filters(metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Evaluate normalized filters against one row's scalar fields (same semantics as build_filter_expr)"""
+    if "categories" in filters and not set(metadata.get("categories") or []) & set(filters["categories"]):
+        return False
+    for field in ("origin", "status"):
+        if field in filters and metadata.get(field, "") not in filters[field]:
+            return False
+    date = metadata.get("date", 0)
+    if "date_from" in filters and date < filters["date_from"]:
+        return False
+    if "date_to" in filters and date > filters["date_to"]:
+        return False
+    return True
+
+
+def passage_id(bill_id: str, chunk_idx: int) -> str:
+    """Primary key of a passage row"""
+    return f"{bill_id}#{chunk_idx}"
+
+
+def split_into_passages(
+    text: str,
+    window_tokens: int = PASSAGE_WINDOW_TOKENS,
+    overlap_tokens: int = PASSAGE_OVERLAP_TOKENS,
+    max_chunks: int = PASSAGE_MAX_CHUNKS,
+) -> List[str]:
+    """
+    Split text into overlapping windows of the embedding model's tokens.
+
+    Args:
+        text: Text to split
+        window_tokens: Tokens per passage (keep below the model's max_seq_length)
+        overlap_tokens: Tokens shared by consecutive passages
+        max_chunks: Maximum passages per text. Longer texts keep evenly spaced windows
+            so the whole bill is covered while ingest cost stays bounded
+
+    Returns:
+        List of passage texts (a single passage for short texts)
+    """
+    import numpy as np
+
+    tokenizer = get_embedding_model().tokenizer
+    token_ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+    if len(token_ids) <= window_tokens:
+        return [text]
+
+    step = max(window_tokens - overlap_tokens, 1)
+    starts = [0]
+    while starts[-1] + window_tokens < len(token_ids):
+        starts.append(starts[-1] + step)
+    if len(starts) > max_chunks:
+        picks = np.linspace(0, len(starts) - 1, max_chunks).round().astype(int)
+        starts = [starts[i] for i in picks]
+
+    return [tokenizer.decode(token_ids[start:start + window_tokens]) for start in starts]
+
+
+def get_collection_version() -> str:
+    """Current vector collection version stamp ("0" if vectors were never written)"""
+    try:
+        with open(VECTOR_VERSION_PATH, "r", encoding="utf-8") as f:
+            return f.read().strip() or "0"
+    except OSError:
+        return "0"
+
+
+def bump_collection_version() -> str:
+    """Record that the stored vectors changed; returns the new version stamp"""
+    version = str(time.time_ns())
+    try:
+        Path(VECTOR_VERSION_PATH).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{VECTOR_VERSION_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, VECTOR_VERSION_PATH)
+    except OSError as e:
+        print(f"  [WARNING] Could not update collection version stamp: {e}")
+    return version
+
+
 def upsert_bill(bill: Dict[str, Any], categories: Optional[List[str]] = None, bill_text: Optional[str] = None) -> bool:
     """Upsert bill data to Supabase"""
     if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
@@ -137,9 +395,7 @@ def upsert_bill(bill: Dict[str, Any], categories: Optional[List[str]] = None, bi
         return False
 
     try:
-        from supabase import create_client, Client
-
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        supabase = get_supabase_client()
 
         # Prepare bill data
         bill_data = {
@@ -228,8 +484,29 @@ def get_milvus_connection():
         return False
 
 
-def setup_milvus_collection(verbose: bool = True):
-    """Create or get Milvus collection for bill embeddings"""
+def setup_milvus_collection(
+    verbose: bool = True,
+    metric_type: str = MILVUS_METRIC_TYPE,
+    index_profile: str = MILVUS_INDEX_PROFILE,
+    expected_rows: Optional[int] = None,
+    collection_name: str = MILVUS_COLLECTION_NAME,
+    passages: bool = False,
+):
+    """
+    Create or get Milvus collection for bill embeddings.
+
+    Args:
+        verbose: Print progress messages
+        metric_type: Index metric for a new collection - "COSINE", "IP" or "L2" (default: MILVUS_METRIC_TYPE).
+            With COSINE or IP, embeddings are L2-normalized at ingest so scores are true cosine similarity.
+            Existing collections keep the metric they were created with.
+        index_profile: ANN index for a new collection - "IVF_FLAT", "IVF_SQ8", "IVF_PQ" or "HNSW"
+            (default: MILVUS_INDEX_PROFILE)
+        expected_rows: Expected number of rows, used to size nlist for IVF profiles
+        collection_name: Collection to create or get (default: MILVUS_COLLECTION_NAME)
+        passages: Create a passage collection keyed by chunk_id with bill_id / chunk_idx fields
+            instead of one row per bill
+    """
     try:
         from pymilvus import Collection, FieldSchema, CollectionSchema, DataType, utility, connections
         
@@ -250,38 +527,56 @@ def setup_milvus_collection(verbose: bool = True):
                 return None
         
         # Check if collection exists
-        if utility.has_collection(MILVUS_COLLECTION_NAME):
+        if utility.has_collection(collection_name):
             if verbose:
-                print(f"  Collection '{MILVUS_COLLECTION_NAME}' already exists")
-            collection = Collection(MILVUS_COLLECTION_NAME)
+                print(f"  Collection '{collection_name}' already exists")
+            collection = Collection(collection_name)
             collection.load()
             return collection
         
         # Define schema
         # bill_id: primary key (VARCHAR)
         # embedding: vector field (768 dimensions for all-mpnet-base-v2)
-        fields = [
-            FieldSchema(name="bill_id", dtype=DataType.VARCHAR, is_primary=True, max_length=100),
-            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=768)
+        # content_hash / model_name: what the embedding was computed from (for incremental ingestion)
+        # Passage collections add chunk_id (primary key, "{bill_id}#{chunk_idx}") and chunk_idx
+        if passages:
+            key_fields = [
+                FieldSchema(name="chunk_id", dtype=DataType.VARCHAR, is_primary=True, max_length=120),
+                FieldSchema(name="bill_id", dtype=DataType.VARCHAR, max_length=100),
+                FieldSchema(name="chunk_idx", dtype=DataType.INT64),
+            ]
+        else:
+            key_fields = [FieldSchema(name="bill_id", dtype=DataType.VARCHAR, is_primary=True, max_length=100)]
+        # categories / origin / status / date: bill fields that searches can filter on
+        fields = key_fields + [
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=768),
+            FieldSchema(name="content_hash", dtype=DataType.VARCHAR, max_length=64),
+            FieldSchema(name="model_name", dtype=DataType.VARCHAR, max_length=200),
+            FieldSchema(
+                name="categories",
+                dtype=DataType.ARRAY,
+                element_type=DataType.VARCHAR,
+                max_capacity=MAX_VECTOR_CATEGORIES,
+                max_length=100,
+            ),
+            FieldSchema(name="origin", dtype=DataType.VARCHAR, max_length=50),
+            FieldSchema(name="status", dtype=DataType.VARCHAR, max_length=200),
+            FieldSchema(name="date", dtype=DataType.INT64),  # YYYYMMDD
         ]
         
         schema = CollectionSchema(
             fields=fields,
-            description="Bill embeddings for semantic search"
+            description="Bill passage embeddings for semantic search" if passages else "Bill embeddings for semantic search"
         )
         
         # Create collection
         collection = Collection(
-            name=MILVUS_COLLECTION_NAME,
+            name=collection_name,
             schema=schema
         )
         
         # Create index for vector field
-        index_params = {
-            "metric_type": "L2",  # L2 distance for similarity search
-            "index_type": "IVF_FLAT",
-            "params": {"nlist": 128}
-        }
+        index_params = build_index_params(index_profile, metric_type, expected_rows)
         collection.create_index(
             field_name="embedding",
             index_params=index_params
@@ -291,7 +586,7 @@ def setup_milvus_collection(verbose: bool = True):
         collection.load()
         
         if verbose:
-            print(f"  Created and loaded collection '{MILVUS_COLLECTION_NAME}'")
+            print(f"  Created and loaded collection '{collection_name}' ({index_params['index_type']} {index_params['params']})")
         return collection
         
     except Exception as e:
@@ -299,35 +594,271 @@ def setup_milvus_collection(verbose: bool = True):
         return None
 
 
+def derive_nlist(num_rows: Optional[int]) -> int:
+    """IVF cluster count for a corpus size (~4 * sqrt(rows), 128 when the size is unknown)"""
+    if not num_rows:
+        return 128
+    return int(min(65536, max(16, round(4 * math.sqrt(num_rows)))))
+
+
+def build_index_params(index_profile: str, metric_type: str, num_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Index parameters for an index profile.
+
+    Args:
+        index_profile: "IVF_FLAT", "IVF_SQ8", "IVF_PQ" or "HNSW"
+        metric_type: "COSINE", "IP" or "L2"
+        num_rows: Expected number of vectors, used to size nlist for IVF profiles
+    """
+    index_profile = index_profile.upper()
+    if index_profile not in INDEX_PROFILES:
+        raise ValueError(f"Unknown index profile '{index_profile}', expected one of {INDEX_PROFILES}")
+
+    if index_profile == "HNSW":
+        params = {"M": MILVUS_HNSW_M, "efConstruction": MILVUS_HNSW_EF_CONSTRUCTION}
+    else:
+        params = {"nlist": derive_nlist(num_rows)}
+        if index_profile == "IVF_PQ":
+            params.update({"m": MILVUS_PQ_M, "nbits": 8})
+
+    return {"metric_type": metric_type, "index_type": index_profile, "params": params}
+
+
+def build_search_params(index_type: Optional[str], index_params: Dict[str, Any], metric_type: str, top_k: int) -> Dict[str, Any]:
+    """
+    Search parameters matching an index: nprobe ~ sqrt(nlist) for IVF indexes, ef >= top_k for HNSW.
+    """
+    if index_type == "HNSW":
+        params = {"ef": max(top_k, MILVUS_HNSW_EF)}
+    elif index_type and index_type.startswith("IVF"):
+        nlist = int(index_params.get("nlist", 128))
+        nprobe = int(MILVUS_NPROBE) if MILVUS_NPROBE else max(1, round(math.sqrt(nlist)))
+        params = {"nprobe": min(nlist, nprobe)}
+    else:
+        params = {"nprobe": 10}
+    return {"metric_type": metric_type, "params": params}
+
+
+def rebuild_milvus_index(collection, index_profile: str, metric_type: Optional[str] = None) -> bool:
+    """
+    Replace the embedding index of a collection with a new index profile.
+
+    nlist is sized from the current row count. The collection is unavailable for search
+    while the index is rebuilt.
+    """
+    try:
+        _, current_metric, _ = get_index_settings(collection)
+        metric_type = metric_type or current_metric
+        index_params = build_index_params(index_profile, metric_type, collection.num_entities)
+        print(f"  Rebuilding index as {index_params['index_type']} {index_params['params']} ({metric_type})")
+        collection.release()
+        collection.drop_index()
+        collection.create_index(field_name="embedding", index_params=index_params)
+        collection.load()
+        bump_collection_version()
+        return True
+    except Exception as e:
+        print(f"  [ERROR] Failed to rebuild Milvus index: {e}")
+        return False
+
+
+def get_collection_field_names(collection) -> List[str]:
+    """Names of the fields in a Milvus collection's schema"""
+    return [field.name for field in collection.schema.fields]
+
+
+def upsert_bill_embeddings_milvus(
+    items: List[Tuple[str, List[float]]],
+    collection=None,
+    chunk_size: int = 1000,
+    flush: bool = True,
+    metadata: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> int:
+    """
+    Bulk upsert bill embeddings to Milvus vector database.
+
+    Rows are written in chunks with one batched upsert (or delete-by-`in` plus insert on
+    clients without native upsert) per chunk, and a single flush at the end.
+
+    Args:
+        items: (key, embedding) pairs, keyed by the collection's primary key (bill_id, or
+            chunk_id for passage collections); later duplicates of a key win
+        collection: Milvus collection to write to (set up if not provided)
+        chunk_size: Number of rows per write request (default: 1000)
+        flush: Whether to flush once all chunks are written (default: True)
+        metadata: Optional scalar field values per key (e.g. content_hash, model_name, and
+            bill_id / chunk_idx for passages). Only fields present in the collection schema are written.
+
+    Returns:
+        Number of embeddings written
+    """
+    if not items:
+        return 0
+
+    # Use provided collection or setup if not provided
+    if collection is None:
+        collection = setup_milvus_collection(verbose=False)
+    if collection is None:
+        print(f"  [MOCK] Would upsert {len(items)} embeddings to Milvus")
+        return 0
+
+    # Deduplicate by key, keeping the last embedding for each key
+    embeddings = dict(items)
+    keys = list(embeddings.keys())
+    metadata = metadata or {}
+    from pymilvus import DataType
+
+    key_field = collection.schema.primary_field.name
+    # Fields missing from a row's metadata get an empty value of the field's type
+    scalar_defaults = {
+        field.name: [] if field.dtype == DataType.ARRAY else 0 if field.dtype == DataType.INT64 else ""
+        for field in collection.schema.fields
+        if field.name not in (key_field, "embedding")
+    }
+
+    def build_row(key: str) -> Dict[str, Any]:
+        row = {key_field: key, "embedding": embeddings[key]}
+        row_metadata = metadata.get(key, {})
+        for name, default in scalar_defaults.items():
+            row[name] = row_metadata.get(name, default)
+        return row
+
+    written = 0
+    for chunk_start in range(0, len(keys), chunk_size):
+        chunk_ids = keys[chunk_start:chunk_start + chunk_size]
+        rows = [build_row(key) for key in chunk_ids]
+        try:
+            if hasattr(collection, "upsert"):
+                collection.upsert(rows)
+            else:
+                collection.delete(expr=f"{key_field} in {json.dumps(chunk_ids)}")
+                collection.insert(rows)
+            written += len(chunk_ids)
+        except Exception as e:
+            print(f"  [ERROR] Failed to upsert {len(chunk_ids)} embeddings to Milvus: {e}")
+
+    if flush and written:
+        try:
+            collection.flush()  # Seal segments once for the whole batch
+        except Exception as e:
+            print(f"  [ERROR] Failed to flush Milvus collection: {e}")
+        bump_collection_version()
+
+    return written
+
+
+def delete_bill_embeddings_milvus(bill_ids: List[str], collection, chunk_size: int = 1000) -> int:
+    """Delete embeddings (every passage, in passage collections) for the given bill IDs with batched `in` expressions"""
+    deleted = 0
+    for chunk_start in range(0, len(bill_ids), chunk_size):
+        chunk_ids = bill_ids[chunk_start:chunk_start + chunk_size]
+        try:
+            collection.delete(expr=f"bill_id in {json.dumps(chunk_ids)}")
+            deleted += len(chunk_ids)
+        except Exception as e:
+            print(f"  [ERROR] Failed to delete {len(chunk_ids)} embeddings from Milvus: {e}")
+    return deleted
+
+
+def delete_stale_passages_milvus(passage_counts: Dict[str, int], collection, chunk_size: int = 1000) -> int:
+    """
+    Delete the passages of each bill with chunk_idx >= its new passage count (left over from a
+    longer previous text), with one batched `in` expression per distinct passage count.
+
+    Returns:
+        Number of passages deleted
+    """
+    bills_by_count: Dict[int, List[str]] = {}
+    for bill_id, count in passage_counts.items():
+        bills_by_count.setdefault(count, []).append(bill_id)
+    deleted = 0
+    for count, bill_ids in sorted(bills_by_count.items()):
+        for chunk_start in range(0, len(bill_ids), chunk_size):
+            chunk_ids = bill_ids[chunk_start:chunk_start + chunk_size]
+            try:
+                result = collection.delete(expr=f"bill_id in {json.dumps(chunk_ids)} and chunk_idx >= {count}")
+                deleted += getattr(result, "delete_count", 0)
+            except Exception as e:
+                print(f"  [ERROR] Failed to delete stale passages of {len(chunk_ids)} bills from Milvus: {e}")
+    return deleted
+
+
+def fetch_all_embeddings(collection, batch_size: int = 1000):
+    """
+    Read every stored (bill_id, embedding) pair.
+
+    Returns:
+        Tuple (bill_ids, embeddings) with embeddings as a float32 NumPy matrix (one row per bill)
+    """
+    import numpy as np
+
+    bill_ids: List[str] = []
+    embeddings: List[List[float]] = []
+    iterator = collection.query_iterator(batch_size=batch_size, expr='bill_id != ""', output_fields=["bill_id", "embedding"])
+    try:
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+            for row in rows:
+                bill_ids.append(row["bill_id"])
+                embeddings.append(row["embedding"])
+    finally:
+        iterator.close()
+    return bill_ids, np.asarray(embeddings, dtype=np.float32).reshape(len(bill_ids), -1)
+
+
+def get_stored_vector_metadata(collection, batch_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+    """
+    Read content_hash, model_name and the filter fields (where present) for every stored vector.
+
+    Returns:
+        Mapping of bill_id -> {"content_hash": ..., "model_name": ..., "categories": ..., ...}
+        (one entry per bill, also for passage collections)
+    """
+    field_names = get_collection_field_names(collection)
+    filter_fields = [name for name in FILTER_FIELDS if name in field_names]
+    output_fields = ["bill_id", "content_hash", "model_name"] + filter_fields
+    stored = {}
+    iterator = collection.query_iterator(batch_size=batch_size, expr='bill_id != ""', output_fields=output_fields)
+    try:
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+            for row in rows:
+                stored[row["bill_id"]] = {
+                    "content_hash": row.get("content_hash", ""),
+                    "model_name": row.get("model_name", ""),
+                    **{name: row.get(name) for name in filter_fields},
+                }
+    finally:
+        iterator.close()
+    return stored
+
+
+def fetch_bill_rows_milvus(bill_ids: List[str], collection, chunk_size: int = 200) -> List[Tuple[str, List[float], Dict[str, Any]]]:
+    """
+    Read the stored rows (every passage, in passage collections) of the given bills.
+
+    Returns:
+        (key, embedding, scalar fields) per row, keyed by the collection's primary key
+    """
+    key_field = collection.schema.primary_field.name
+    field_names = get_collection_field_names(collection)
+    rows = []
+    for chunk_start in range(0, len(bill_ids), chunk_size):
+        chunk_ids = bill_ids[chunk_start:chunk_start + chunk_size]
+        for row in collection.query(expr=f"bill_id in {json.dumps(chunk_ids)}", output_fields=field_names):
+            scalars = {name: row[name] for name in field_names if name not in (key_field, "embedding") and name in row}
+            rows.append((row[key_field], list(row["embedding"]), scalars))
+    return rows
+
+
 def upsert_bill_embedding_milvus(bill_id: str, embedding: List[float], collection=None) -> bool:
     """Upsert bill embedding to Milvus vector database"""
     try:
-        from pymilvus import Collection, utility
-        
-        # Use provided collection or setup if not provided
-        if collection is None:
-            collection = setup_milvus_collection(verbose=False)
-        if collection is None:
-            print(f"  [MOCK] Would upsert embedding for bill {bill_id} to Milvus")
-            return False
-        
-        # Check if bill_id already exists - if so, delete it first (upsert behavior)
-        expr = f'bill_id == "{bill_id}"'
-        existing = collection.query(expr=expr, output_fields=["bill_id"])
-        if existing:
-            collection.delete(expr=expr)
-        
-        # Prepare data for insertion
-        data = [
-            [bill_id],  # bill_id
-            [embedding]  # embedding vector
-        ]
-        
-        # Insert into collection
-        collection.insert(data)
-        collection.flush()  # Ensure data is written
-        
-        return True
+        return upsert_bill_embeddings_milvus([(bill_id, embedding)], collection=collection) == 1
     except Exception as e:
         print(f"  [ERROR] Failed to upsert embedding to Milvus: {e}")
         return False
@@ -357,7 +888,7 @@ def check_vectors_exist() -> bool:
         return False
 
 
-def clear_milvus_database() -> bool:
+def clear_milvus_database(collection_name: str = MILVUS_COLLECTION_NAME) -> bool:
     """Clear all data from the Milvus database by dropping the collection"""
     try:
         from pymilvus import utility
@@ -368,13 +899,14 @@ def clear_milvus_database() -> bool:
             return False
         
         # Check if collection exists
-        if not utility.has_collection(MILVUS_COLLECTION_NAME):
-            print(f"  Collection '{MILVUS_COLLECTION_NAME}' does not exist. Nothing to clear.")
+        if not utility.has_collection(collection_name):
+            print(f"  Collection '{collection_name}' does not exist. Nothing to clear.")
             return True
         
         # Drop the collection
-        utility.drop_collection(MILVUS_COLLECTION_NAME)
-        print(f"   Successfully dropped collection '{MILVUS_COLLECTION_NAME}'")
+        utility.drop_collection(collection_name)
+        bump_collection_version()
+        print(f"   Successfully dropped collection '{collection_name}'")
         return True
         
     except Exception as e:
@@ -388,8 +920,7 @@ def get_bill_summary_text(bill_id: str) -> Optional[str]:
         return None
     
     try:
-        from supabase import create_client, Client
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        supabase = get_supabase_client()
         
         result = supabase.table("bill_summaries").select("summary_text").eq("bill_id", bill_id).limit(1).execute()
         
@@ -401,6 +932,59 @@ def get_bill_summary_text(bill_id: str) -> Optional[str]:
         return None
 
 
+def get_bill_summaries(bill_ids: Optional[List[str]] = None, page_size: int = 1000, id_chunk_size: int = 200) -> Dict[str, str]:
+    """
+    Prefetch bill summary texts in bulk.
+
+    Args:
+        bill_ids: Only fetch summaries for these bills (chunked `in` filters). If None,
+            page through the whole bill_summaries table.
+        page_size: Rows per request when paging through the table (default: 1000)
+        id_chunk_size: Bill IDs per `in` filter request (default: 200)
+
+    Returns:
+        Mapping of bill_id -> summary_text (first summary found for each bill)
+    """
+    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+        return {}
+
+    summaries: Dict[str, str] = {}
+
+    def collect(rows: List[Dict[str, Any]]):
+        for row in rows:
+            if row.get("summary_text"):
+                summaries.setdefault(row["bill_id"], row["summary_text"])
+
+    try:
+        supabase = get_supabase_client()
+
+        if bill_ids is not None:
+            for chunk_start in range(0, len(bill_ids), id_chunk_size):
+                chunk_ids = bill_ids[chunk_start:chunk_start + id_chunk_size]
+                result = supabase.table("bill_summaries").select("bill_id, summary_text").in_("bill_id", chunk_ids).execute()
+                collect(result.data or [])
+            return summaries
+
+        offset = 0
+        while True:
+            result = (
+                supabase.table("bill_summaries")
+                .select("bill_id, summary_text")
+                .order("id")
+                .range(offset, offset + page_size - 1)
+                .execute()
+            )
+            rows = result.data or []
+            collect(rows)
+            if len(rows) < page_size:
+                break
+            offset += page_size
+        return summaries
+    except Exception as e:
+        print(f"  [WARNING] Could not prefetch bill summaries: {e}")
+        return summaries
+
+
 def get_bill_full_text(bill_id: str) -> Optional[str]:
     """
     Fetch full bill text from database or file system.
@@ -410,8 +994,7 @@ def get_bill_full_text(bill_id: str) -> Optional[str]:
     # (This would require adding a full_text column to bills table or a separate table)
     if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
         try:
-            from supabase import create_client, Client
-            supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+            supabase = get_supabase_client()
             
             # Try to get from bills table if full_text column exists
             result = supabase.table("bills").select("full_text").eq("id", bill_id).limit(1).execute()
@@ -441,34 +1024,60 @@ def get_bill_full_text(bill_id: str) -> Optional[str]:
     return None
 
 
-def ingest_bills(force_recreate: bool = False) -> bool:
+def ingest_bills(
+    force_recreate: bool = False,
+    batch_size: int = 64,
+    incremental: bool = False,
+    store=None,
+    passages: bool = False,
+    lexical: Optional[bool] = None,
+    neighbors: bool = True,
+) -> bool:
     """
     Main ingestion function - fetches all bills from database and creates embeddings.
     
     Args:
         force_recreate: If True, clear existing vectors and recreate. If False, skip if vectors already exist.
+        batch_size: Number of bills embedded per model.encode call (default: 64)
+        incremental: If True, keep the collection online and only re-embed bills whose embedding
+            text or model changed (or which are new), and delete vectors of removed bills
+        store: Vector store to write to (default: the VECTOR_BACKEND store, see vector_store.py)
+        passages: Index overlapping token windows of each bill (at most PASSAGE_MAX_CHUNKS per bill)
+            in the passage store instead of one truncated embedding per bill
+        lexical: Also rebuild the BM25 lexical index (see lexical_index.py) when bills were
+            embedded or removed, or the index file is missing (default: BUILD_LEXICAL_INDEX)
+        neighbors: Also update the precomputed similar-bills graph (see similar_bills.py); incremental
+            runs refresh only the rows of changed, new and removed bills
     
     Returns:
         True if vectors were created/updated, False if skipped or failed
     """
-    print("Starting bill ingestion...")
+    from vector_store import get_vector_store
+
+    store = store or get_vector_store(passages=passages)
+    passages = store.passages
+    if lexical is None:
+        lexical = BUILD_LEXICAL_INDEX
+    print(f"Starting {'passage' if passages else 'bill'} ingestion ({store.name} vector store)...")
     print()
 
     # Check if vectors already exist
     print("Checking if vectors already exist...")
-    vectors_exist = check_vectors_exist()
+    vectors_exist = bool(store.count())
     
-    if vectors_exist:
+    if incremental:
+        print("Incremental mode: only changed, new and removed bills will be updated")
+        print()
+    elif vectors_exist:
         if force_recreate:
             print("Vectors found, but force_recreate=True. Clearing existing vectors...")
-            print("Clearing Milvus database...")
-            if clear_milvus_database():
-                print("Milvus database cleared")
+            if store.clear():
+                print("Vector store cleared")
             else:
-                print("Failed to clear Milvus database!!")
+                print("Failed to clear vector store!!")
             print()
         else:
-            print("Vectors already exist in Milvus collection")
+            print("Vectors already exist in the vector store")
             print("Skipping ingestion. Use force_recreate=True to recreate vectors.")
             print()
             return False  # Vectors exist, skipped ingestion
@@ -476,33 +1085,9 @@ def ingest_bills(force_recreate: bool = False) -> bool:
         print("No existing vectors found. Proceeding with ingestion...")
         print()
 
-    # Setup Milvus collection once
-    print("📦 Setting up Milvus collection...")
-    collection = setup_milvus_collection()
-    if collection is None:
-        print("Failed to setup Milvus collection")
-        print("Make sure Milvus is running: docker-compose up -d milvus")
-        return False
-    print("Milvus collection ready")
-    print()
-
     # Fetch all bills from database (with pagination to handle >1000 bills)
     print("Fetching bills from database...")
-    all_bills = []
-    page_size = 1000
-    offset = 0
-    
-    while True:
-        bills = get_bills_from_database(limit=page_size, offset=offset)
-        if not bills:
-            break
-        all_bills.extend(bills)
-        print(f"  Fetched {len(bills)} bills (total: {len(all_bills)})...")
-        
-        # If we got fewer than page_size, we've reached the end
-        if len(bills) < page_size:
-            break
-        offset += page_size
+    all_bills = fetch_all_bills()
     
     if not all_bills:
         print("No bills found in database")
@@ -512,72 +1097,328 @@ def ingest_bills(force_recreate: bool = False) -> bool:
     print(f"  Found {len(all_bills)} bills total")
     print()
 
-    # Process each bill
+    # Setup the vector store once
+    print("📦 Setting up vector store...")
+    # A new Milvus collection's IVF index is sized for the number of rows (roughly, for passages)
+    expected_rows = len(all_bills) * min(PASSAGE_MAX_CHUNKS, 4) if passages else len(all_bills)
+    if not store.prepare(expected_rows=expected_rows):
+        print("Failed to setup vector store")
+        return False
+    print("Vector store ready")
+    print()
+
+    # Prefetch summaries for bills without bill_text in a handful of bulk requests
+    print("Prefetching bill summaries...")
+    ids_without_text = [bill.get("id", "unknown") for bill in all_bills if not bill.get("bill_text")]
+    if not ids_without_text:
+        summaries = {}
+    elif len(ids_without_text) > 1000:
+        summaries = get_bill_summaries()
+    else:
+        summaries = get_bill_summaries(ids_without_text)
+    print(f"  Loaded {len(summaries)} summaries ({len(ids_without_text)} bills without bill_text)")
+
+    def update_lexical_index():
+        """Rebuild the BM25 index, which also needs the summaries of bills with bill_text"""
+        from lexical_index import build_lexical_index, get_lexical_text
+
+        print("Building lexical index...")
+        ids_with_text = [bill.get("id", "unknown") for bill in all_bills if bill.get("bill_text")]
+        if len(ids_with_text) > 1000:
+            summaries.update(get_bill_summaries())
+        elif ids_with_text:
+            summaries.update(get_bill_summaries(ids_with_text))
+        build_lexical_index({
+            bill.get("id", "unknown"): get_lexical_text(bill, summaries.get(bill.get("id", "unknown")))
+            for bill in all_bills
+        })
+
+    # Determine the embedding text for each bill
+    print("Preparing embedding text...")
+    embedding_texts = {}
+    for bill in all_bills:
+        bill_id = bill.get("id", "unknown")
+        embedding_texts[bill_id] = get_embedding_text(bill, summaries.get(bill_id))
+    # Passage hashes include the window settings, so changing them re-chunks every bill
+    hash_suffix = f"\n{PASSAGE_WINDOW_TOKENS}:{PASSAGE_OVERLAP_TOKENS}:{PASSAGE_MAX_CHUNKS}" if passages else ""
+    content_hashes = {bill_id: compute_content_hash(text + hash_suffix) for bill_id, text in embedding_texts.items()}
+    filter_metadata = {bill.get("id", "unknown"): get_filter_metadata(bill) for bill in all_bills}
+
+    bills_to_embed = all_bills
+    removed_ids: List[str] = []
+    # Changed bills whose old passages may outnumber the new ones (incremental passage runs)
+    changed_ids: set = set()
+    refreshed = 0
+    if incremental:
+        if not store.supports_metadata():
+            print("Collection was created without content hashes, so changes cannot be detected")
+            print("Run once with --force-recreate to rebuild it with the current schema")
+            return False
+
+        print("Comparing content hashes with stored vectors...")
+        stored = store.get_metadata()
+
+        def needs_embedding(bill_id: str) -> bool:
+            entry = stored.get(bill_id)
+            return entry is None or (entry.get("content_hash"), entry.get("model_name")) != (content_hashes[bill_id], EMBED_MODEL_ID)
+
+        def filters_changed(bill_id: str) -> bool:
+            entry = stored[bill_id]
+            return any(name in entry and entry[name] != filter_metadata[bill_id][name] for name in FILTER_FIELDS)
+
+        bills_to_embed = [bill for bill in all_bills if needs_embedding(bill.get("id", "unknown"))]
+        embed_ids = {bill.get("id", "unknown") for bill in bills_to_embed}
+        # Bills whose text is unchanged but whose categories/status/... changed keep their vectors
+        metadata_only_ids = [bill_id for bill_id in embedding_texts if bill_id not in embed_ids and filters_changed(bill_id)]
+        removed_ids = [bill_id for bill_id in stored if bill_id not in embedding_texts]
+        if passages:
+            changed_ids = embed_ids & stored.keys()
+        print(
+            f"  {len(stored)} stored vectors, {len(bills_to_embed)} new or changed bills, "
+            f"{len(metadata_only_ids)} bills with changed filter fields, {len(removed_ids)} removed bills"
+        )
+
+        if metadata_only_ids:
+            rows = store.fetch_vectors(metadata_only_ids)
+            refreshed = store.upsert(
+                [(key, embedding) for key, embedding, _ in rows],
+                flush=False,
+                metadata={
+                    key: {**scalars, **filter_metadata[scalars.get("bill_id", key)]}
+                    for key, _, scalars in rows
+                },
+            )
+            print(f"  Rewrote filter fields of {refreshed} stored vectors")
+
+        if removed_ids:
+            # A partially failed bill fetch looks like mass removal; refuse rather than wipe the index
+            if len(removed_ids) > len(stored) // 2:
+                print(f"  [WARNING] Refusing to delete {len(removed_ids)} of {len(stored)} vectors in incremental mode")
+                print("  Use --force-recreate if this many bills were really removed")
+                # Nothing was deleted, so there is nothing to flush or drop from the neighbour graph
+                removed_ids = []
+            else:
+                deleted = store.delete(removed_ids)
+                print(f"  Deleted {deleted} vectors for removed bills")
+        print()
+
+        if lexical:
+            from lexical_index import LEXICAL_INDEX_PATH
+
+            # Unchanged runs skip the corpus-wide summary fetch and re-tokenization
+            if bills_to_embed or removed_ids or not os.path.exists(LEXICAL_INDEX_PATH):
+                update_lexical_index()
+
+        if not bills_to_embed:
+            if removed_ids or refreshed:
+                store.flush()
+            if removed_ids and neighbors and not passages:
+                from similar_bills import refresh_neighbor_graph
+                print("Refreshing neighbour graph...")
+                refresh_neighbor_graph([], removed_ids, store)
+            print("All vectors are up to date")
+            return True
+    elif lexical:
+        update_lexical_index()
+
+    # COSINE / IP collections store unit-length vectors
+    index_metric = store.metric_type
+    normalize = index_metric in NORMALIZED_METRICS
+    print(f"  Collection metric: {index_metric}{' (normalized embeddings)' if normalize else ''}")
+
+    # Sort by text length so each encode batch pads to a similar length
+    ordered_bills = sorted(bills_to_embed, key=lambda b: len(embedding_texts[b.get("id", "unknown")]), reverse=True)
+    print(f"  Embedding in batches of {batch_size}")
+    print()
+
+    # Process bills batch by batch
     successful = 0
     failed = 0
-    
-    for i, bill in enumerate(all_bills, 1):
-        bill_id = bill.get("id", "unknown")
-        bill_title = bill.get("title", "Unknown")
-        print(f"[{i}/{len(all_bills)}] Processing: {bill_title} ({bill_id})")
+    processed = 0
+    pending: List[Tuple[str, List[float]]] = []
+    pending_metadata: Dict[str, Dict[str, Any]] = {}
+    # New passage count of each buffered changed bill, and of each changed bill fully written
+    pending_counts: Dict[str, int] = {}
+    passage_counts: Dict[str, int] = {}
+    write_chunk_size = 1000
+    start_time = time.perf_counter()
 
-        # Get bill text for embedding (priority: bill_text > summary_text > title + summary_key)
-        bill_text = bill.get("bill_text")
-        summary_text = get_bill_summary_text(bill_id)
-        
-        # Determine embedding text
-        if bill_text:
-            embedding_text = bill_text
-            print("  Using bill_text field for embedding")
-        elif summary_text:
-            embedding_text = f"{bill_title} {summary_text}"
-            print("  Using summary_text for embedding (bill_text not available)")
+    def write_pending() -> int:
+        """Write buffered embeddings to the vector store and return how many were stored"""
+        written = store.upsert(pending, flush=False, metadata=pending_metadata)
+        if written != len(pending):
+            print(f"   Failed to store {len(pending) - written} embeddings in the vector store")
         else:
-            embedding_text = f"{bill_title} {bill.get('summary_key', '')}".strip()
-            if not embedding_text:
-                embedding_text = bill_title
-            print("  Using title + summary_key for embedding (bill_text and summary not available)")
-
-        # Generate embedding using sentence-transformers
-        print("  Generating embedding...")
-        try:
-            embedding = generate_embedding(embedding_text)
-            print(f"  Embedding dimension: {len(embedding)}")
+            passage_counts.update(pending_counts)
+        pending.clear()
+        pending_metadata.clear()
+        pending_counts.clear()
+        return written
 
-            # Upsert embedding to Milvus vector database
-            print("  Storing embedding in Milvus...")
-            success = upsert_bill_embedding_milvus(bill_id, embedding, collection=collection)
+    for batch_start in range(0, len(ordered_bills), batch_size):
+        batch = ordered_bills[batch_start:batch_start + batch_size]
+        batch_ids = [bill.get("id", "unknown") for bill in batch]
 
-            if success:
-                print(f"    Successfully processed {bill_id}")
-                successful += 1
+        # One row per bill, or one row per passage window of each bill
+        keys, texts, rows_metadata = [], [], []
+        for bill_id in batch_ids:
+            row_metadata = {"content_hash": content_hashes[bill_id], "model_name": EMBED_MODEL_ID, **filter_metadata[bill_id]}
+            if passages:
+                for chunk_idx, passage in enumerate(split_into_passages(embedding_texts[bill_id])):
+                    keys.append(passage_id(bill_id, chunk_idx))
+                    texts.append(passage)
+                    rows_metadata.append({"bill_id": bill_id, "chunk_idx": chunk_idx, **row_metadata})
             else:
-                print(f"   Failed to store embedding for {bill_id}")
-                failed += 1
-        except Exception as e:
-            print(f"    Error processing {bill_id}: {e}")
-            failed += 1
+                keys.append(bill_id)
+                texts.append(embedding_texts[bill_id])
+                rows_metadata.append(row_metadata)
+
+        # Generate embeddings using sentence-transformers
+        embeddings = generate_embeddings(texts, batch_size=batch_size, normalize=normalize)
+        if len(embeddings) != len(keys):
+            print(f"   Failed to generate embeddings for bills {batch_ids[0]}..{batch_ids[-1]}")
+            failed += len(batch_ids)
+            processed += len(batch_ids)
+            continue
+
+        # Buffer embeddings and write them to the vector store in large chunks
+        pending.extend(zip(keys, embeddings))
+        pending_metadata.update(zip(keys, rows_metadata))
+        if changed_ids:
+            for row_metadata in rows_metadata:
+                if row_metadata["bill_id"] in changed_ids:
+                    pending_counts[row_metadata["bill_id"]] = row_metadata["chunk_idx"] + 1
+        if len(pending) >= write_chunk_size:
+            pending_count = len(pending)
+            written = write_pending()
+            successful += written
+            failed += pending_count - written
+
+        processed += len(batch_ids)
+        elapsed = time.perf_counter() - start_time
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        print(f"[{processed}/{len(ordered_bills)}] Embedded batch ({rate:.1f} bills/sec)")
+
+    if pending:
+        pending_count = len(pending)
+        written = write_pending()
+        successful += written
+        failed += pending_count - written
+
+    # Old passages are dropped only once a bill's new ones are stored, so a failed batch
+    # leaves the bill searchable; only windows past its new passage count are stale
+    if passage_counts:
+        deleted = store.delete_stale_passages(passage_counts)
+        print(f"  Deleted {deleted} stale passages of {len(passage_counts)} changed bills")
+
+    # Flush once after all chunks are written
+    if successful or removed_ids or refreshed:
+        store.flush()
 
+    if neighbors and not passages and (successful or removed_ids):
+        from similar_bills import build_neighbor_graph, refresh_neighbor_graph
         print()
+        print("Updating neighbour graph...")
+        if incremental:
+            refresh_neighbor_graph([bill.get("id", "unknown") for bill in bills_to_embed], removed_ids, store)
+        else:
+            build_neighbor_graph(store)
+
+    elapsed = time.perf_counter() - start_time
+    print()
 
     print("  Ingestion complete!")
     print()
     print(f"  Summary:")
     print(f"   - Total bills: {len(all_bills)}")
-    print(f"   - Successfully processed: {successful}")
+    print(f"   - Embedded: {len(ordered_bills)}")
+    print(f"   - {'Passages' if passages else 'Vectors'} stored: {successful}")
     print(f"   - Failed: {failed}")
+    print(f"   - Throughput: {processed / elapsed if elapsed > 0 else 0.0:.1f} bills/sec ({elapsed:.1f}s)")
     print()
     print("  Next steps:")
-    print("   - Verify embeddings in Milvus vector database")
+    print(f"   - Verify embeddings in the {store.name} vector store")
     print("   - Bills are linked between databases via bill_id")
-    print("   - Use bill_id to join SQL metadata with Milvus vectors for search")
+    print("   - Use bill_id to join SQL metadata with stored vectors for search")
     
     # Return True if at least some vectors were successfully created
     return successful > 0
 
 
+def get_index_settings(collection) -> Tuple[Optional[str], str, Dict[str, Any]]:
+    """
+    Read the embedding index of a collection.
+
+    Returns:
+        Tuple (index_type, metric_type, params); metric defaults to L2 if the index cannot be inspected
+    """
+    try:
+        for idx in collection.indexes:
+            if idx.field_name == "embedding":
+                return (
+                    idx.params.get("index_type"),
+                    idx.params.get("metric_type", "L2"),
+                    idx.params.get("params", {}) or {},
+                )
+    except Exception:
+        # If we can't get index info, default to L2
+        pass
+    return None, "L2", {}
+
+
+class MilvusCollectionHandle:
+    """A loaded Milvus collection with its schema and index settings resolved once"""
+
+    def __init__(self, collection, version: str):
+        self.collection = collection
+        self.version = version
+        self.field_names = get_collection_field_names(collection)
+        self.index_type, self.metric_type, self.index_params = get_index_settings(collection)
+
+
+# Cached collection handles for the search path, by collection name
+# (resolved once, refreshed on failure or new version)
+_collection_handles: Dict[str, MilvusCollectionHandle] = {}
+
+
+def get_collection_handle(refresh: bool = False, collection_name: str = MILVUS_COLLECTION_NAME) -> Optional[MilvusCollectionHandle]:
+    """
+    Get the cached handle for a bill embeddings collection (default: MILVUS_COLLECTION_NAME).
+
+    The collection is connected to, checked and loaded only when there is no handle yet,
+    when refresh=True (e.g. after a failed search), or when the collection version stamp
+    changed because ingestion wrote new vectors.
+    """
+    version = get_collection_version()
+    handle = _collection_handles.get(collection_name)
+    if not refresh and handle is not None and handle.version == version:
+        return handle
+
+    collection = _load_milvus_collection(collection_name)
+    if collection is None:
+        _collection_handles.pop(collection_name, None)
+        return None
+    handle = MilvusCollectionHandle(collection, version)
+    _collection_handles[collection_name] = handle
+    return handle
+
+
+def invalidate_collection_handle(collection_name: Optional[str] = None):
+    """Drop a cached collection handle (all of them by default) so the next lookup reconnects and reloads"""
+    if collection_name is None:
+        _collection_handles.clear()
+    else:
+        _collection_handles.pop(collection_name, None)
+
+
 def get_milvus_collection():
     """Get Milvus collection for bill embeddings (does not create if it doesn't exist)"""
+    handle = get_collection_handle()
+    return handle.collection if handle is not None else None
+
+
+def _load_milvus_collection(collection_name: str = MILVUS_COLLECTION_NAME):
+    """Connect to Milvus and load a bill embeddings collection"""
     try:
         from pymilvus import Collection, utility
         
@@ -586,13 +1427,13 @@ def get_milvus_collection():
             return None
         
         # Check if collection exists
-        if not utility.has_collection(MILVUS_COLLECTION_NAME):
-            print(f"  [ERROR] Collection '{MILVUS_COLLECTION_NAME}' does not exist")
+        if not utility.has_collection(collection_name):
+            print(f"  [ERROR] Collection '{collection_name}' does not exist")
             print(f"    Run setup_milvus.py or ingest.py to create the collection")
             return None
         
         # Get and load collection
-        collection = Collection(MILVUS_COLLECTION_NAME)
+        collection = Collection(collection_name)
         collection.load()
         return collection
     except Exception as e:
@@ -603,21 +1444,88 @@ def get_milvus_collection():
 if __name__ == "__main__":
     import argparse
     
-    parser = argparse.ArgumentParser(description="Ingest bills and create embeddings in Milvus")
+    parser = argparse.ArgumentParser(description="Ingest bills and create embeddings in the vector store")
     parser.add_argument(
         "--force-recreate",
         action="store_true",
         help="Force recreation of vectors even if they already exist"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Number of bills embedded per model.encode call (default: 64)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-embed new or changed bills and delete vectors of removed bills"
+    )
+    
+    parser.add_argument(
+        "--rebuild-index",
+        choices=INDEX_PROFILES,
+        help="Rebuild the existing collection's index (the passage collection with --passages) with this profile (nlist sized from the row count) and exit"
+    )
+    parser.add_argument(
+        "--passages",
+        action="store_true",
+        help="Index overlapping token windows of each bill in the passage collection (PASSAGE_COLLECTION_NAME)"
+    )
+    parser.add_argument(
+        "--lexical",
+        action="store_true",
+        help="Rebuild the BM25 lexical index used by hybrid search (default: only when HYBRID_SEARCH is set)"
+    )
+    parser.add_argument(
+        "--no-lexical",
+        action="store_true",
+        help="Skip rebuilding the BM25 lexical index, even when HYBRID_SEARCH is set"
+    )
+    parser.add_argument(
+        "--no-neighbors",
+        action="store_true",
+        help="Skip updating the precomputed similar-bills graph (similar_bills.py)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("milvus", "local"),
+        help="Vector store to write to (default: VECTOR_BACKEND, milvus if unset)"
+    )
     
     args = parser.parse_args()
+
+    from vector_store import get_vector_store
+    store = get_vector_store(args.backend, passages=args.passages)
+    lexical = True if args.lexical else False if args.no_lexical else None
     
+    if args.rebuild_index:
+        if store.name == "local":
+            print("  [ERROR] --rebuild-index needs the Milvus backend, the local store has no index to rebuild")
+            sys.exit(1)
+        handle = get_collection_handle(collection_name=PASSAGE_COLLECTION_NAME if args.passages else MILVUS_COLLECTION_NAME)
+        if handle is None or not rebuild_milvus_index(handle.collection, args.rebuild_index):
+            sys.exit(1)
+        print("    Index rebuilt!")
+        sys.exit(0)
+
+    if args.incremental:
+        if ingest_bills(
+            batch_size=args.batch_size, incremental=True, store=store,
+            lexical=lexical, neighbors=not args.no_neighbors,
+        ):
+            print("    Incremental update complete!")
+        else:
+            print("     Incremental update failed!!!!")
+        print()
+        sys.exit(0)
+
     # Check if vectors already exist
     print("  Checking if vectors already exist...")
-    vectors_exist = check_vectors_exist()
+    vectors_exist = bool(store.count())
     
     if vectors_exist and not args.force_recreate:
-        print("    Vectors already exist in Milvus collection")
+        print(f"    Vectors already exist in the {store.name} vector store")
         print("    Use --force-recreate to recreate vectors")
         print()
     else:
@@ -627,7 +1535,10 @@ if __name__ == "__main__":
             print()
         
         # Run ingestion
-        vectors_created = ingest_bills(force_recreate=args.force_recreate)
+        vectors_created = ingest_bills(
+            force_recreate=args.force_recreate, batch_size=args.batch_size, store=store,
+            lexical=lexical, neighbors=not args.no_neighbors,
+        )
         
         if vectors_created:
             print("    Vector creation complete!")